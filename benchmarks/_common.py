@@ -0,0 +1,70 @@
+"""Shared helpers for the benchmark scripts.
+
+Run the scripts from the repository root, e.g.
+`python benchmarks/bench_extractors.py`, with Home Assistant installed.
+"""
+from __future__ import annotations
+
+import argparse
+import copy
+import json
+from pathlib import Path
+import sys
+import timeit
+from typing import Any, Callable
+
+ROOT = Path(__file__).resolve().parent.parent
+FIXTURES = Path(__file__).resolve().parent / "fixtures"
+
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+
+def load_fixture(name: str) -> dict[str, Any]:
+    """Return a recorded payload from benchmarks/fixtures."""
+    return json.loads((FIXTURES / f"{name}.json").read_text(encoding="utf-8"))
+
+
+def load_payloads() -> dict[str, dict[str, Any]]:
+    """Return every recorded endpoint payload keyed by endpoint name."""
+    return {
+        name: load_fixture(name)
+        for name in ("battery_info", "motor_index_info", "overall_tally", "track_list", "vehicles_info")
+    }
+
+
+def scaled_track_list(size: int) -> dict[str, Any]:
+    """Return the recorded track list grown to `size` rides."""
+    payload = load_fixture("track_list")
+    rides = payload["data"]
+    grown = []
+    for index in range(size):
+        ride = copy.deepcopy(rides[index % len(rides)])
+        ride["trackId"] = f"{index:016d}"
+        ride["startTime"] -= index * 3_600_000
+        ride["endTime"] -= index * 3_600_000
+        grown.append(ride)
+    payload["data"] = grown
+    return payload
+
+
+def measure(func: Callable[[], Any], repeat: int = 5) -> float:
+    """Return the best time per call of `func` in microseconds."""
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=repeat, number=number)) / number * 1e6
+
+
+def parse_args(description: str) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument("--json", type=Path, help="also write the results to this JSON file")
+    return parser.parse_args()
+
+
+def report(results: dict[str, float], args: argparse.Namespace) -> None:
+    """Print `name: µs per call` lines and optionally dump them as JSON."""
+    width = max(len(name) for name in results)
+    for name, usec in results.items():
+        print(f"{name:<{width}}  {usec:12.2f} us")
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2, sort_keys=True), encoding="utf-8")
@@ -0,0 +1,88 @@
+"""Backfill three years of rides: one page at a time vs the concurrent backfill.
+
+The track list API is simulated with a fixed latency per page (--latency,
+seconds). Also times turning the stored rides into hourly statistics.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import copy
+import json
+from pathlib import Path
+import tempfile
+import time
+
+from _common import scaled_track_list
+
+from custom_components.niu.const import BACKFILL_PAGE_SIZE
+from custom_components.niu.history import RideHistory
+from custom_components.niu.statistics import HOUR_MS, async_backfill_rides, build_statistics
+
+RIDES = 3 * 365 * 2
+
+
+class ExecutorlessHass:
+    """Just enough of HomeAssistant for the backfill helpers."""
+
+    async def async_add_executor_job(self, target, *args):
+        return target(*args)
+
+
+def make_fetch(rides: list[dict], latency: float):
+    async def fetch_page(index: int, size: int) -> dict:
+        await asyncio.sleep(latency)
+        return {"status": 0, "data": copy.deepcopy(rides[index * size : (index + 1) * size])}
+
+    return fetch_page
+
+
+async def sequential(history: RideHistory, fetch_page) -> float:
+    start = time.perf_counter()
+    index = 0
+    while True:
+        page = await fetch_page(index, BACKFILL_PAGE_SIZE)
+        history.add_rides("SN", page["data"])
+        index += 1
+        if len(page["data"]) < BACKFILL_PAGE_SIZE:
+            return time.perf_counter() - start
+
+
+async def concurrent(history: RideHistory, fetch_page) -> float:
+    start = time.perf_counter()
+    await async_backfill_rides(ExecutorlessHass(), history, "SN", fetch_page)
+    return time.perf_counter() - start
+
+
+async def run(latency: float) -> dict[str, float]:
+    rides = scaled_track_list(RIDES)["data"]
+    fetch_page = make_fetch(rides, latency)
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        results["sequential pages (s)"] = await sequential(RideHistory(Path(tmp, "a.db")), fetch_page)
+        history = RideHistory(Path(tmp, "b.db"))
+        results["concurrent backfill (s)"] = await concurrent(history, fetch_page)
+        start = time.perf_counter()
+        buckets = history.hourly_totals("SN", HOUR_MS)
+        build_statistics(buckets)
+        results["hourly statistics (s)"] = time.perf_counter() - start
+        history.close()
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--latency", type=float, default=0.3, help="simulated seconds per page")
+    parser.add_argument("--json", type=Path, help="also write the results to this JSON file")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args.latency))
+    print(f"{RIDES} rides, {BACKFILL_PAGE_SIZE} per page, {args.latency}s per page")
+    for name, seconds in results.items():
+        print(f"{name:<26}{seconds:8.2f}")
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2, sort_keys=True), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,31 @@
+"""Compare decoding the recorded responses via str + json with decode_json."""
+from __future__ import annotations
+
+import json
+
+from _common import load_payloads, measure, parse_args, report, scaled_track_list
+
+from custom_components.niu.models import JSON_BACKEND, SchemaMonitor, decode_json
+
+
+def main() -> None:
+    args = parse_args(__doc__)
+    payloads = load_payloads()
+    payloads["track_list (100 rides)"] = scaled_track_list(100)
+    bodies = {name: json.dumps(payload).encode() for name, payload in payloads.items()}
+    monitor = SchemaMonitor()
+
+    results: dict[str, float] = {}
+    for name, body in bodies.items():
+        assert decode_json(body) == json.loads(body.decode())
+        results[f"{name}: text + json.loads"] = measure(lambda: json.loads(body.decode("utf-8")))
+        results[f"{name}: decode_json ({JSON_BACKEND})"] = measure(lambda: decode_json(body))
+        endpoint = name.split(" ")[0]
+        payload = decode_json(body)
+        assert not monitor.check(endpoint, payload), monitor.drift
+        results[f"{name}: schema check"] = measure(lambda: monitor.check(endpoint, payload))
+    report(results, args)
+
+
+if __name__ == "__main__":
+    main()
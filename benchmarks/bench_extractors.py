@@ -0,0 +1,129 @@
+"""Compare the compiled field extractors with the former getData* accessors."""
+from __future__ import annotations
+
+from datetime import datetime
+from time import gmtime, strftime
+from typing import Any
+
+from _common import load_payloads, measure, parse_args, report, scaled_track_list
+
+from custom_components.niu.const import AVAILABLE_SENSORS
+from custom_components.niu.extractors import GROUP_CONTAINERS, NiuFieldExtractor
+from custom_components.niu.plan import build_fetch_plan
+
+
+class LegacyAccessors:
+    """The accessor chain NiuApi used before the extractors (verbatim)."""
+
+    def __init__(self, payloads: dict[str, Any]) -> None:
+        self.dataBat = payloads["battery_info"]
+        self.dataMoto = payloads["motor_index_info"]
+        self.dataMotoInfo = payloads["overall_tally"]
+        self.dataTrackInfo = payloads["track_list"]
+
+    def getDataBat(self, id_field):
+        if not isinstance(self.dataBat, dict):
+            return None
+        try:
+            data = self.dataBat.get("data", {})
+            compartment_a = data.get("batteries", {}).get("compartmentA", {})
+            if isinstance(compartment_a, dict) and id_field in compartment_a:
+                return compartment_a.get(id_field)
+            if isinstance(data, dict):
+                return data.get(id_field)
+            return None
+        except (KeyError, TypeError):
+            return None
+
+    def getDataMoto(self, id_field):
+        if not isinstance(self.dataMoto, dict):
+            return None
+        try:
+            return self.dataMoto.get("data", {}).get(id_field)
+        except (KeyError, TypeError):
+            return None
+
+    def getDataDist(self, id_field):
+        if not isinstance(self.dataMoto, dict):
+            return None
+        try:
+            return self.dataMoto.get("data", {}).get("lastTrack", {}).get(id_field)
+        except (KeyError, TypeError):
+            return None
+
+    def getDataPos(self, id_field):
+        if not isinstance(self.dataMoto, dict):
+            return None
+        try:
+            return self.dataMoto.get("data", {}).get("postion", {}).get(id_field)
+        except (KeyError, TypeError):
+            return None
+
+    def getDataOverall(self, id_field):
+        if not isinstance(self.dataMotoInfo, dict):
+            return None
+        try:
+            return self.dataMotoInfo.get("data", {}).get(id_field)
+        except (KeyError, TypeError):
+            return None
+
+    def getDataTrack(self, id_field):
+        if not isinstance(self.dataTrackInfo, dict):
+            return None
+        try:
+            if id_field == "startTime" or id_field == "endTime":
+                timestamp = self.dataTrackInfo.get("data", [{}])[0].get(id_field, 0)
+                if timestamp:
+                    return datetime.fromtimestamp(timestamp / 1000).strftime("%Y-%m-%d %H:%M:%S")
+                return None
+            if id_field == "ridingtime":
+                seconds = self.dataTrackInfo.get("data", [{}])[0].get(id_field, 0)
+                if seconds:
+                    return strftime("%H:%M:%S", gmtime(seconds))
+                return None
+            if id_field == "track_thumb":
+                thumburl = self.dataTrackInfo.get("data", [{}])[0].get(id_field, "")
+                if thumburl:
+                    thumburl = thumburl.replace("app-api.niucache.com", "app-api.niu.com")
+                    return thumburl.replace("/track/thumb/", "/track/overseas/thumb/")
+                return None
+            return self.dataTrackInfo.get("data", [{}])[0].get(id_field)
+        except (KeyError, TypeError, IndexError):
+            return None
+
+    def parse(self, fields: dict[str, tuple[str, ...]]) -> dict[str, dict[str, Any]]:
+        getters = {
+            "BAT": self.getDataBat,
+            "MOTO": self.getDataMoto,
+            "POSITION": self.getDataPos,
+            "DIST": self.getDataDist,
+            "TOTAL": self.getDataOverall,
+            "TRACK": self.getDataTrack,
+        }
+        return {group: {field: getters[group](field) for field in names} for group, names in fields.items()}
+
+
+def main() -> None:
+    args = parse_args(__doc__)
+    payloads = load_payloads()
+    payloads["track_list"] = scaled_track_list(100)
+    fields = build_fetch_plan(AVAILABLE_SENSORS, ["sensor", "image", "device_tracker"]).fields
+    # The ride history aggregates do not come from the payloads
+    fields = {group: names for group, names in fields.items() if group in GROUP_CONTAINERS}
+
+    legacy = LegacyAccessors(payloads)
+    extractor = NiuFieldExtractor(fields)
+    assert legacy.parse(fields) == extractor.extract(payloads), "extractors disagree with getData*"
+
+    report(
+        {
+            "legacy getData* accessors": measure(lambda: legacy.parse(fields)),
+            "compiled extractors": measure(lambda: extractor.extract(payloads)),
+            "compile extractors (once per setup)": measure(lambda: NiuFieldExtractor(fields)),
+        },
+        args,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""Per-request latency against a local HTTPS stand-in of the NIU API.
+
+"reconnect" opens a new connection per request, which is what a poll every
+minute got from Home Assistant's shared session (idle connections closed
+after 15 s). "pooled" is the account client, reusing its TLS connection.
+"""
+from __future__ import annotations
+
+import asyncio
+import datetime
+import ssl
+import tempfile
+import time
+from pathlib import Path
+
+import aiohttp
+from aiohttp import web
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+from cryptography.x509.oid import NameOID
+
+from _common import load_fixture, parse_args, report
+
+from custom_components.niu.client import create_session
+
+REQUESTS = 200
+
+
+def server_context(directory: Path) -> ssl.SSLContext:
+    """Return a TLS context with a fresh self-signed certificate."""
+    key = ec.generate_private_key(ec.SECP256R1())
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "localhost")])
+    now = datetime.datetime.now(datetime.timezone.utc)
+    cert = (
+        x509.CertificateBuilder()
+        .subject_name(name)
+        .issuer_name(name)
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now)
+        .not_valid_after(now + datetime.timedelta(days=1))
+        .sign(key, hashes.SHA256())
+    )
+    cert_path, key_path = directory / "cert.pem", directory / "key.pem"
+    cert_path.write_bytes(cert.public_bytes(serialization.Encoding.PEM))
+    key_path.write_bytes(
+        key.private_bytes(
+            serialization.Encoding.PEM,
+            serialization.PrivateFormat.PKCS8,
+            serialization.NoEncryption(),
+        )
+    )
+    context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+    context.load_cert_chain(cert_path, key_path)
+    return context
+
+
+async def per_request(session: aiohttp.ClientSession, url: str) -> float:
+    """Return the mean latency of a GET in microseconds."""
+    start = time.perf_counter()
+    for _ in range(REQUESTS):
+        async with session.get(url, params={"sn": "SN0000000000"}) as response:
+            await response.read()
+    return (time.perf_counter() - start) / REQUESTS * 1e6
+
+
+async def run() -> dict[str, float]:
+    payload = load_fixture("battery_info")
+
+    async def battery_info(request: web.Request) -> web.Response:
+        response = web.json_response(payload)
+        response.enable_compression()
+        return response
+
+    app = web.Application()
+    app.router.add_get("/v3/motor_data/battery_info", battery_info)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    with tempfile.TemporaryDirectory() as directory:
+        site = web.TCPSite(runner, "127.0.0.1", 0, ssl_context=server_context(Path(directory)))
+        await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    url = f"https://127.0.0.1:{port}/v3/motor_data/battery_info"
+
+    no_verify = ssl.create_default_context()
+    no_verify.check_hostname = False
+    no_verify.verify_mode = ssl.CERT_NONE
+
+    results = {}
+    async with aiohttp.ClientSession(
+        connector=aiohttp.TCPConnector(ssl=no_verify, force_close=True)
+    ) as session:
+        results["reconnect"] = await per_request(session, url)
+    async with create_session(no_verify) as session:
+        await per_request(session, url)  # warm up the pool
+        results["pooled"] = await per_request(session, url)
+    await runner.cleanup()
+    return results
+
+
+def main() -> None:
+    args = parse_args(__doc__)
+    report(asyncio.run(run()), args)
+
+
+if __name__ == "__main__":
+    main()
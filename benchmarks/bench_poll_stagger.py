@@ -0,0 +1,168 @@
+"""Event loop lag and server concurrency of many scooters polling at once.
+
+SCOOTERS simulated entries poll the four endpoints of a local stand-in of the
+NIU API (served from its own thread, with LATENCY per request) for CYCLES
+intervals. Time is compressed: INTERVAL seconds stand for a poll interval.
+"aligned" starts every entry together and polls at the fixed interval, as
+before; "staggered" delays the first poll by the entry's phase and schedules
+the others with NiuPollScheduler.stagger.
+
+Reported: p99 and max lag of a 5 ms timer on the polling loop (us), and the
+peak number of requests (connections) the server handled at once.
+"""
+from __future__ import annotations
+
+import asyncio
+from datetime import timedelta
+import json
+import statistics
+import threading
+import time
+
+import aiohttp
+from aiohttp import web
+
+from _common import load_payloads, parse_args, report
+
+from custom_components.niu.const import (
+    MOTOINFO_ALL_API_URI,
+    MOTOR_BATTERY_API_URI,
+    MOTOR_INDEX_API_URI,
+    TRACK_LIST_API_URI,
+)
+from custom_components.niu.models import decode_json
+from custom_components.niu.scheduler import NiuPollScheduler, poll_phase
+
+SCOOTERS = 60
+INTERVAL = 2.0
+CYCLES = 5
+LATENCY = 0.05
+TICK = 0.005
+
+PATHS = {
+    MOTOR_BATTERY_API_URI: "battery_info",
+    MOTOR_INDEX_API_URI: "motor_index_info",
+    MOTOINFO_ALL_API_URI: "overall_tally",
+    TRACK_LIST_API_URI: "track_list",
+}
+
+
+class StandIn:
+    """The NIU API on a loop of its own, counting concurrent requests."""
+
+    def __init__(self) -> None:
+        self.active = 0
+        self.peak = 0
+        self.port = 0
+        self._ready = threading.Event()
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+        self._ready.wait()
+
+    def reset(self) -> None:
+        self.peak = 0
+
+    def stop(self) -> None:
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+
+    def _run(self) -> None:
+        asyncio.set_event_loop(self._loop)
+        self._loop.run_until_complete(self._serve())
+        self._ready.set()
+        self._loop.run_forever()
+
+    async def _serve(self) -> None:
+        bodies = self._bodies()
+
+        async def handle(request: web.Request) -> web.Response:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+            try:
+                await asyncio.sleep(LATENCY)
+                return web.Response(body=bodies[request.path], content_type="application/json")
+            finally:
+                self.active -= 1
+
+        app = web.Application()
+        for path in bodies:
+            app.router.add_route("*", path, handle)
+        runner = web.AppRunner(app, access_log=None)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0, backlog=1024)
+        await site.start()
+        self.port = site._server.sockets[0].getsockname()[1]
+
+    @staticmethod
+    def _bodies() -> dict[str, bytes]:
+        payloads = load_payloads()
+        return {path: json.dumps(payloads[name]).encode() for path, name in PATHS.items()}
+
+
+async def poll(session: aiohttp.ClientSession, base: str, sn: str) -> None:
+    """One coordinator update: the four endpoints in parallel."""
+
+    async def fetch(path: str) -> None:
+        async with session.get(base + path, params={"sn": sn}) as response:
+            decode_json(await response.read())
+
+    await asyncio.gather(*(fetch(path) for path in PATHS))
+
+
+async def scooter(base: str, index: int, staggered: bool, deadline: float) -> None:
+    sn = f"SN{index:010d}"
+    scheduler = NiuPollScheduler(INTERVAL, INTERVAL, poll_phase(sn))
+    interval = timedelta(seconds=INTERVAL)
+    # One client per account, as in the integration
+    async with aiohttp.ClientSession() as session:
+        if staggered:
+            await asyncio.sleep(scheduler.phase * INTERVAL)
+        while time.monotonic() < deadline:
+            await poll(session, base, sn)
+            delay = scheduler.stagger(interval) if staggered else interval
+            await asyncio.sleep(delay.total_seconds())
+
+
+async def monitor(lags: list[float], done: asyncio.Event) -> None:
+    """Record how late a TICK timer fires."""
+    while not done.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(TICK)
+        lags.append(time.perf_counter() - start - TICK)
+
+
+async def scenario(server: StandIn, staggered: bool) -> tuple[float, float, int]:
+    base = f"http://127.0.0.1:{server.port}"
+    server.reset()
+    lags: list[float] = []
+    done = asyncio.Event()
+    watcher = asyncio.create_task(monitor(lags, done))
+    deadline = time.monotonic() + INTERVAL * CYCLES
+    await asyncio.gather(*(scooter(base, index, staggered, deadline) for index in range(SCOOTERS)))
+    done.set()
+    await watcher
+    p99 = statistics.quantiles(lags, n=100)[98]
+    return p99 * 1e6, max(lags) * 1e6, server.peak
+
+
+def main() -> None:
+    args = parse_args(__doc__)
+    server = StandIn()
+    server.start()
+    results: dict[str, float] = {}
+    try:
+        for name, staggered in (("aligned", False), ("staggered", True)):
+            p99, worst, peak = asyncio.run(scenario(server, staggered))
+            print(f"{name}: peak {peak} concurrent requests")
+            results[f"{name} loop lag p99"] = p99
+            results[f"{name} loop lag max"] = worst
+    finally:
+        server.stop()
+    report(results, args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+"""Compare the compiled redaction plans with the generic recursive walk."""
+from __future__ import annotations
+
+from _common import load_payloads, measure, parse_args, report, scaled_track_list
+
+from custom_components.niu.redact import REDACTED, RedactionEngine, _redact_sensitive
+
+SIZES = (10, 100, 1000, 5000)
+
+
+def snapshot_for(size: int) -> dict:
+    payloads = load_payloads()
+    payloads["track_list"] = scaled_track_list(size)
+    return {"sn": "SN0000000000", "sensor_prefix": "bench", "parsed": {}, "raw": payloads}
+
+
+def main() -> None:
+    args = parse_args(__doc__)
+    results: dict[str, float] = {}
+    for size in SIZES:
+        snapshot = snapshot_for(size)
+        engine = RedactionEngine()
+        # First call learns the shapes; the steady state is what is measured.
+        compiled = engine.redact_snapshot(snapshot)
+        assert compiled == _redact_sensitive(snapshot)
+        assert compiled["raw"]["vehicles_info"]["data"]["items"][0]["token"] == REDACTED
+        assert snapshot["raw"]["vehicles_info"]["data"]["items"][0]["token"] != REDACTED
+
+        results[f"generic walk, {size} rides"] = measure(lambda: _redact_sensitive(snapshot))
+        results[f"compiled plan, {size} rides"] = measure(lambda: engine.redact_snapshot(snapshot))
+    report(results, args)
+
+
+if __name__ == "__main__":
+    main()
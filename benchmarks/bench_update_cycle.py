@@ -0,0 +1,210 @@
+"""What one poll costs, end to end and step by step.
+
+The coordinators of 1, 10 and 100 scooters (one account) poll the NIU
+emulator of tools/niu_emulator.py, in process and without latency: "full
+poll" refetches every endpoint, "steady poll" only the ones due with the default TTLs
+(battery and motor index). Times
+are per poll of the whole fleet. The sensor fan-out writes the states of
+every sensor of the fleet ("all fields") or of the position sensors only.
+
+Parsing, redaction and the response log write run on the recorded payloads
+with track lists of 10 to 1000 rides.
+"""
+from __future__ import annotations
+
+import asyncio
+from datetime import timedelta
+import logging
+from pathlib import Path
+import sys
+import tempfile
+import time
+from typing import Any, Awaitable, Callable
+
+from aiohttp import web
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import device_registry as dr, entity, entity_registry as er
+from homeassistant.helpers.entity_platform import EntityPlatform
+
+from _common import ROOT, load_payloads, measure, parse_args, report, scaled_track_list
+
+from custom_components.niu import NiuDataUpdateCoordinator
+from custom_components.niu.account import NiuAccount
+from custom_components.niu.api import NiuApi
+from custom_components.niu.client import NiuHttpClient
+from custom_components.niu.const import (
+    AVAILABLE_SENSORS,
+    DATA_LIMITER,
+    DEFAULT_ENDPOINT_TTLS,
+    DEFAULT_POLL_MAX_INTERVAL,
+    DEFAULT_POLL_MIN_INTERVAL,
+    DOMAIN,
+    SENSOR_TYPE_POS,
+    SENSOR_TYPES,
+)
+from custom_components.niu.extractors import NiuFieldExtractor
+from custom_components.niu.journal import _atomic_write_json
+from custom_components.niu.limiter import NiuRequestLimiter
+from custom_components.niu.plan import build_fetch_plan
+from custom_components.niu.redact import RedactionEngine, _redact_sensitive
+from custom_components.niu.scheduler import NiuPollScheduler
+from custom_components.niu.sensor import NiuSensor, _generate_entity_id
+
+sys.path.insert(0, str(ROOT / "tools"))
+from niu_emulator import FleetConfig, NiuEmulator  # noqa: E402
+
+SCALES = (1, 10, 100)
+RIDES = (10, 100, 1000)
+PLATFORMS = ["sensor", "image", "device_tracker"]
+USERNAME = "bench@example.com"
+PASSWORD = "niu"
+SENSORS = [sensor for sensor in AVAILABLE_SENSORS if sensor != "LastTrackThumb"]
+
+
+async def ameasure(func: Callable[[], Awaitable[Any]], number: int = 5, repeat: int = 3) -> float:
+    """Return the best time per call of a coroutine function in microseconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            await func()
+        best = min(best, (time.perf_counter() - start) / number)
+    return best * 1e6
+
+
+async def create_fleet(hass: HomeAssistant, url: str, size: int) -> list[NiuDataUpdateCoordinator]:
+    account = NiuAccount(hass, USERNAME, PASSWORD, NiuHttpClient(hass), url, url)
+    plan = build_fetch_plan(AVAILABLE_SENSORS, PLATFORMS)
+    coordinators = []
+    for index in range(size):
+        api = NiuApi(hass, USERNAME, PASSWORD, index, account=account)
+        await api.async_init()
+        coordinators.append(
+            NiuDataUpdateCoordinator(
+                hass,
+                api=api,
+                scheduler=NiuPollScheduler(DEFAULT_POLL_MIN_INTERVAL, DEFAULT_POLL_MAX_INTERVAL),
+                ttls=dict(DEFAULT_ENDPOINT_TTLS),
+                plan=plan,
+            )
+        )
+    return coordinators
+
+
+async def add_sensors(platform: EntityPlatform, coordinator: NiuDataUpdateCoordinator) -> None:
+    """Add a sensor entity per selected sensor, as the sensor platform does."""
+    api = coordinator.api
+    entities = []
+    for sensor in SENSORS:
+        config = SENSOR_TYPES[sensor]
+        entities.append(
+            NiuSensor(
+                coordinator, api, "bench", sensor, config[0], config[1], config[2], config[3],
+                api.sensor_prefix, config[4], api.sn, config[5],
+            )
+        )
+    await platform.async_add_entities(entities)
+
+
+async def poll(coordinators: list[NiuDataUpdateCoordinator], force: bool) -> None:
+    for coordinator in coordinators:
+        coordinator._force_refresh = force
+    results = await asyncio.gather(*(coordinator._async_update_data() for coordinator in coordinators))
+    for coordinator, data in zip(coordinators, results):
+        coordinator.data = data
+
+
+def fan_out(coordinators: list[NiuDataUpdateCoordinator], changed: set[tuple[str, str]] | None) -> None:
+    for coordinator in coordinators:
+        coordinator._changed = None if changed is None else set(changed)
+        coordinator.async_update_listeners()
+
+
+async def run_cycle() -> dict[str, float]:
+    results: dict[str, float] = {}
+    emulator = NiuEmulator(FleetConfig(scooters=max(SCALES)))
+    runner = web.AppRunner(emulator.create_app(), access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    url = f"http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}"
+
+    with tempfile.TemporaryDirectory() as config_dir:
+        hass = HomeAssistant(config_dir)
+        # The shared request budget would pace 100 scooters to a few
+        # requests per second; measure the work instead of the waiting.
+        hass.data.setdefault(DOMAIN, {})[DATA_LIMITER] = NiuRequestLimiter(1e9, 10**9)
+        entity.async_setup(hass)
+        await er.async_load(hass)
+        await dr.async_load(hass)
+        for size in SCALES:
+            coordinators = await create_fleet(hass, url, size)
+            await poll(coordinators, force=True)
+            results[f"full poll, {size} scooters"] = await ameasure(lambda: poll(coordinators, True))
+            results[f"steady poll, {size} scooters"] = await ameasure(lambda: poll(coordinators, False))
+
+            platform = EntityPlatform(
+                hass=hass,
+                logger=logging.getLogger(__name__),
+                domain="sensor",
+                platform_name=DOMAIN,
+                platform=None,
+                scan_interval=timedelta(seconds=30),
+                entity_namespace=None,
+            )
+            for coordinator in coordinators:
+                await add_sensors(platform, coordinator)
+            assert len(hass.states.async_entity_ids("sensor")) == size * len(SENSORS)
+            position = {(SENSOR_TYPE_POS, "lat"), (SENSOR_TYPE_POS, "lng")}
+            results[f"sensor fan-out, all fields, {size} scooters"] = measure(
+                lambda: fan_out(coordinators, None), repeat=3
+            )
+            results[f"sensor fan-out, position, {size} scooters"] = measure(
+                lambda: fan_out(coordinators, position), repeat=3
+            )
+            await platform.async_reset()
+            await coordinators[0].api.account.client.async_close()
+        await hass.async_stop(force=True)
+    await runner.cleanup()
+    return results
+
+
+def run_steps() -> dict[str, float]:
+    results: dict[str, float] = {}
+    fields = build_fetch_plan(AVAILABLE_SENSORS, PLATFORMS).fields
+    extractor = NiuFieldExtractor(fields)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp, "last_response.json")
+        for rides in RIDES:
+            payloads = load_payloads()
+            payloads["track_list"] = scaled_track_list(rides)
+            parsed = extractor.extract(payloads)
+            snapshot = {"sn": "SN0000000000", "sensor_prefix": "bench", "parsed": parsed, "raw": payloads}
+            engine = RedactionEngine()
+            redacted = engine.redact_snapshot(snapshot)
+
+            results[f"parse, {rides} rides"] = measure(lambda: extractor.extract(payloads))
+            results[f"_redact_sensitive, {rides} rides"] = measure(lambda: _redact_sensitive(snapshot))
+            results[f"compiled redaction, {rides} rides"] = measure(lambda: engine.redact_snapshot(snapshot))
+            results[f"_atomic_write_json, {rides} rides"] = measure(
+                lambda: _atomic_write_json(path, redacted), repeat=3
+            )
+
+    results["_generate_entity_id, per scooter"] = measure(
+        lambda: [
+            _generate_entity_id("Blue NQi", "SN0000000000", sensor, SENSOR_TYPES[sensor][0])
+            for sensor in SENSORS
+        ]
+    )
+    return results
+
+
+def main() -> None:
+    args = parse_args(__doc__)
+    results = asyncio.run(run_cycle())
+    results.update(run_steps())
+    report(results, args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,33 @@
+"""Time the resize/transcode of a rendered track and report variant sizes."""
+from __future__ import annotations
+
+from _common import load_fixture, measure, parse_args, report
+
+from custom_components.niu.render import render_track
+from custom_components.niu.variants import FORMAT_JPEG, FORMAT_WEBP, make_variant
+
+SIZES = ((None, None), (320, None), (160, 120))
+
+
+def main() -> None:
+    args = parse_args(__doc__)
+    ride = load_fixture("track_list")["data"][0]
+    # A synthetic zig-zag ride around the recorded start point
+    lat, lng = float(ride["startPoint"]["lat"]), float(ride["startPoint"]["lng"])
+    points = [
+        (lat + index * 1e-4, lng + (index % 7) * 2e-4, 1_700_000_000_000 + index * 5000)
+        for index in range(600)
+    ]
+    source = render_track(points, 1280, 960)
+    print(f"source PNG 1280x960: {len(source)} bytes")
+    results: dict[str, float] = {}
+    for width, height in SIZES:
+        for fmt in (FORMAT_JPEG, FORMAT_WEBP):
+            name = f"{fmt} {width or 'full'}x{height or 'auto'}"
+            print(f"{name}: {len(make_variant(source, width, height, fmt))} bytes")
+            results[name] = measure(lambda: make_variant(source, width, height, fmt), repeat=3)
+    report(results, args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""Run every benchmark and store the results of this version in one JSON file.
+
+    python benchmarks/run_all.py
+    python benchmarks/run_all.py --compare benchmarks/results/2.2.0.json
+
+Each bench_*.py runs in a process of its own with --json. The combined file
+(benchmarks/results/<version>.json by default) also records the integration
+version, the git revision and the Python version. With --compare, every
+result is shown next to the same result of an earlier file, and the ones
+slower by more than --threshold are flagged.
+"""
+from __future__ import annotations
+
+import argparse
+from datetime import datetime, timezone
+import json
+from pathlib import Path
+import platform
+import subprocess
+import sys
+import tempfile
+
+from _common import ROOT
+
+BENCHMARKS = Path(__file__).resolve().parent
+MANIFEST = ROOT / "custom_components" / "niu" / "manifest.json"
+
+
+def git_revision() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmark(script: Path) -> dict[str, float] | str:
+    """Return the results of one script, or its error output."""
+    with tempfile.TemporaryDirectory() as tmp:
+        output = Path(tmp, "results.json")
+        process = subprocess.run(
+            [sys.executable, str(script), "--json", str(output)],
+            cwd=ROOT,
+            capture_output=True,
+            text=True,
+        )
+        if process.returncode != 0 or not output.exists():
+            return process.stderr.strip().splitlines()[-1] if process.stderr.strip() else "failed"
+        return json.loads(output.read_text(encoding="utf-8"))
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> int:
+    """Print the change of every result; return the number of regressions."""
+    regressions = 0
+    print(f"\nagainst {baseline.get('version')} ({baseline.get('revision')}):")
+    for name, results in current["benchmarks"].items():
+        before = baseline.get("benchmarks", {}).get(name)
+        if not isinstance(results, dict) or not isinstance(before, dict):
+            continue
+        for key, value in results.items():
+            if key not in before or not before[key]:
+                continue
+            change = value / before[key] - 1
+            flag = ""
+            if change > threshold:
+                flag = "  <- slower"
+                regressions += 1
+            print(f"  {name}: {key}: {before[key]:.2f} -> {value:.2f} ({change:+.0%}){flag}")
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--output", type=Path, help="results file (default: benchmarks/results/<version>.json)")
+    parser.add_argument("--only", nargs="+", metavar="NAME", help="run these benchmarks only, e.g. update_cycle")
+    parser.add_argument("--compare", type=Path, help="results file of an earlier version")
+    parser.add_argument("--threshold", type=float, default=0.1, help="slowdown flagged by --compare")
+    args = parser.parse_args()
+
+    version = json.loads(MANIFEST.read_text(encoding="utf-8"))["version"]
+    scripts = sorted(BENCHMARKS.glob("bench_*.py"))
+    if args.only:
+        unknown = set(args.only) - {script.stem.removeprefix("bench_") for script in scripts}
+        if unknown:
+            parser.error(f"unknown benchmarks: {', '.join(sorted(unknown))}")
+        scripts = [script for script in scripts if script.stem.removeprefix("bench_") in args.only]
+
+    current = {
+        "version": version,
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "date": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "benchmarks": {},
+    }
+    for script in scripts:
+        name = script.stem.removeprefix("bench_")
+        print(f"{name} ...", flush=True)
+        current["benchmarks"][name] = result = run_benchmark(script)
+        if isinstance(result, str):
+            print(f"  failed: {result}")
+
+    output = args.output or BENCHMARKS / "results" / f"{version}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(current, indent=2, sort_keys=True), encoding="utf-8")
+    print(f"results written to {output}")
+
+    if args.compare:
+        baseline = json.loads(args.compare.read_text(encoding="utf-8"))
+        if compare(current, baseline, args.threshold):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,63 +1,206 @@
 """niu component."""
 from __future__ import annotations
 
-import json
-import logging
+import asyncio
 from datetime import timedelta
+import logging
 from pathlib import Path
-from typing import Any
+import sqlite3
+import time
+from typing import Any, Awaitable, Callable
 
-from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
-from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
+import voluptuous as vol
 
-from .const import CONF_AUTH, CONF_SENSORS, DOMAIN, SENSOR_TYPE_BAT, SENSOR_TYPE_MOTO, SENSOR_TYPE_POS, SENSOR_TYPE_DIST, SENSOR_TYPE_OVERALL, SENSOR_TYPE_TRACK
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import EVENT_HOMEASSISTANT_STOP
+from homeassistant.core import (
+    CALLBACK_TYPE,
+    CoreState,
+    Event,
+    HomeAssistant,
+    ServiceCall,
+    ServiceResponse,
+    SupportsResponse,
+    callback,
+)
+from homeassistant.exceptions import HomeAssistantError, ServiceValidationError
+import homeassistant.helpers.config_validation as cv
+from homeassistant.helpers.event import async_call_later
+from homeassistant.helpers.typing import ConfigType
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+from homeassistant.util import dt as dt_util
+
+from .account import async_acquire_account, async_release_account, request_deadline
 from .api import NiuApi
+from .const import (
+    ACCOUNT_BASE_URL,
+    API_BASE_URL,
+    CONF_ACCOUNT_URL,
+    CONF_API_URL,
+    CONF_AUTH,
+    CONF_POLL_MAX_INTERVAL,
+    CONF_POLL_MIN_INTERVAL,
+    CONF_RESPONSE_LOG,
+    CONF_SENSORS,
+    CONF_TTL_PREFIX,
+    DATA_HISTORY,
+    DEFAULT_ENDPOINT_TTLS,
+    DEFAULT_POLL_INTERVAL,
+    DEFAULT_POLL_MAX_INTERVAL,
+    DEFAULT_POLL_MIN_INTERVAL,
+    DEFAULT_RESPONSE_LOG,
+    DOMAIN,
+    ENDPOINT_BATTERY,
+    ENDPOINT_MOTOR_INDEX,
+    ENDPOINT_OVERALL_TALLY,
+    ENDPOINT_TRACK_LIST,
+    ENDPOINT_URIS,
+    ENDPOINT_VEHICLES,
+    JOURNAL_BACKUPS,
+    JOURNAL_MAX_BYTES,
+    POLL_STARTUP_SPREAD,
+    PRIORITY_LOW,
+    RESPONSE_LOG_JOURNAL,
+    RESPONSE_LOG_LAST,
+    SENSOR_TYPE_HISTORY,
+    SERVICE_BACKFILL_STATISTICS,
+    SERVICE_GET_RIDES,
+    SERVICE_REFRESH,
+    UPDATE_MAX_PARALLEL,
+    UPDATE_TIMEOUT,
+)
+from .extractors import NiuFieldExtractor
+from .history import (
+    RideHistory,
+    async_acquire_history,
+    async_release_history,
+    async_sync_rides,
+)
+from .journal import LastResponseWriter, ResponseJournal
+from .limiter import async_get_limiter, path_priority
+from .models import SchemaMonitor
+from .plan import NiuFetchPlan, build_fetch_plan
+from .redact import RedactionEngine
+from .scheduler import NiuPollScheduler, poll_phase
+from .statistics import async_backfill_rides, async_import_statistics, is_backfilled
 
 _LOGGER = logging.getLogger(__name__)
 
 
-def _atomic_write_json(path: Path, payload: object) -> None:
-    path.parent.mkdir(parents=True, exist_ok=True)
-    tmp_path = path.with_suffix(path.suffix + ".tmp")
-    with open(tmp_path, "w", encoding="utf-8") as f:
-        json.dump(payload, f, ensure_ascii=False, indent=2)
-    tmp_path.replace(path)
-
-
-_SENSITIVE_KEYS = {
-    "token",
-    "access_token",
-    "refresh_token",
-    "password",
-    "passwd",
-    "secret",
-    "authorization",
-    "auth",
-}
-
-
-def _redact_sensitive(value: Any) -> Any:
-    """Recursively redact sensitive fields before persisting to disk."""
-    if isinstance(value, dict):
-        redacted: dict[str, Any] = {}
-        for k, v in value.items():
-            key = str(k).lower()
-            if key in _SENSITIVE_KEYS:
-                redacted[k] = "***REDACTED***"
-            else:
-                redacted[k] = _redact_sensitive(v)
-        return redacted
-    if isinstance(value, list):
-        return [_redact_sensitive(v) for v in value]
-    return value
+def _create_response_log(
+    hass: HomeAssistant, entry: ConfigEntry, sn: str
+) -> LastResponseWriter | ResponseJournal | None:
+    """Create the raw response writer selected in the entry options."""
+    mode = entry.options.get(CONF_RESPONSE_LOG, DEFAULT_RESPONSE_LOG)
+    if mode == RESPONSE_LOG_LAST:
+        return LastResponseWriter(Path(hass.config.path("niu_last_response.json")))
+    if mode == RESPONSE_LOG_JOURNAL:
+        return ResponseJournal(
+            Path(hass.config.path("niu_journal", f"{sn or entry.entry_id}.ndjson.gz")),
+            JOURNAL_MAX_BYTES,
+            JOURNAL_BACKUPS,
+        )
+    return None
+
+
+CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
+
+GET_RIDES_SCHEMA = vol.Schema(
+    {
+        vol.Optional("sn"): cv.string,
+        vol.Optional("start"): cv.datetime,
+        vol.Optional("end"): cv.datetime,
+        vol.Optional("limit", default=100): vol.All(vol.Coerce(int), vol.Range(min=1, max=10000)),
+    }
+)
+
+REFRESH_SCHEMA = vol.Schema({vol.Optional("sn"): cv.string})
+
+BACKFILL_STATISTICS_SCHEMA = vol.Schema(
+    {
+        vol.Optional("sn"): cv.string,
+        vol.Optional("restart", default=False): cv.boolean,
+    }
+)
 
 # Platforms that this integration supports
 PLATFORMS_SENSOR = ["sensor"]
-PLATFORMS_CAMERA = ["camera"]
+PLATFORMS_IMAGE = ["image"]
 PLATFORMS_DEVICE_TRACKER = ["device_tracker"]
 
 
+async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
+    """Register the integration services."""
+
+    async def _async_get_rides(call: ServiceCall) -> ServiceResponse:
+        history: RideHistory | None = hass.data.get(DOMAIN, {}).get(DATA_HISTORY)
+        if history is None:
+            raise ServiceValidationError("No NIU scooter with ride history is set up")
+
+        def _ms(moment) -> int | None:
+            if moment is None:
+                return None
+            return int(dt_util.as_utc(moment).timestamp() * 1000)
+
+        rides = await hass.async_add_executor_job(
+            history.rides,
+            call.data.get("sn"),
+            _ms(call.data.get("start")),
+            _ms(call.data.get("end")),
+            call.data["limit"],
+        )
+        for ride in rides:
+            for key in ("start_time", "end_time"):
+                if ride[key] is not None:
+                    ride[key] = dt_util.as_local(dt_util.utc_from_timestamp(ride[key] / 1000)).isoformat()
+        return {"rides": rides}
+
+    async def _async_backfill_statistics(call: ServiceCall) -> ServiceResponse:
+        coordinators = [
+            entry_data["coordinator"]
+            for entry_data in hass.data.get(DOMAIN, {}).values()
+            if isinstance(entry_data, dict)
+            and "coordinator" in entry_data
+            and entry_data["coordinator"].history is not None
+            and call.data.get("sn") in (None, entry_data["api"].sn)
+        ]
+        if not coordinators:
+            raise ServiceValidationError("No matching NIU scooter with ride history is set up")
+        hours = {}
+        for coordinator in coordinators:
+            hours[coordinator.api.sn] = await coordinator.async_backfill_statistics(call.data["restart"])
+        return {"hours": hours}
+
+    async def _async_refresh(call: ServiceCall) -> None:
+        coordinators = [
+            entry_data["coordinator"]
+            for entry_data in hass.data.get(DOMAIN, {}).values()
+            if isinstance(entry_data, dict)
+            and "coordinator" in entry_data
+            and call.data.get("sn") in (None, entry_data["api"].sn)
+        ]
+        if not coordinators:
+            raise ServiceValidationError("No matching NIU scooter is set up")
+        await asyncio.gather(*(coordinator.async_request_full_refresh() for coordinator in coordinators))
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_GET_RIDES,
+        _async_get_rides,
+        schema=GET_RIDES_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_BACKFILL_STATISTICS,
+        _async_backfill_statistics,
+        schema=BACKFILL_STATISTICS_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+    hass.services.async_register(DOMAIN, SERVICE_REFRESH, _async_refresh, schema=REFRESH_SCHEMA)
+    return True
+
+
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up Niu Smart Plug from a config entry."""
 
@@ -73,7 +216,7 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     # Build platform list dynamically based on selected sensors
     platforms = list(PLATFORMS_SENSOR)
     if "LastTrackThumb" in sensors_selected:
-        platforms.extend(PLATFORMS_CAMERA)
+        platforms.extend(PLATFORMS_IMAGE)
 
     # Add map entity when we have either live coordinates or track-derived location.
     if {
@@ -92,16 +235,48 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     username = niu_auth["username"]
     password = niu_auth["password"]
     scooter_id = niu_auth["scooter_id"]
-
-    # Create API instance
-    api = NiuApi(hass, username, password, scooter_id)
-
-    # Initialize API asynchronously
-    await api.async_init()
-
-    # Create data update coordinator
-    coordinator = NiuDataUpdateCoordinator(hass, api=api)
-    await coordinator.async_config_entry_first_refresh()
+    account_url = niu_auth.get(CONF_ACCOUNT_URL, ACCOUNT_BASE_URL)
+    api_url = niu_auth.get(CONF_API_URL, API_BASE_URL)
+
+    # Create API instance on the account session shared with other entries
+    account = async_acquire_account(hass, username, password, account_url, api_url)
+    api = NiuApi(hass, username, password, scooter_id, account=account)
+    history = None
+
+    try:
+        # Initialize API asynchronously
+        await api.async_init()
+
+        # Create data update coordinator
+        scheduler = NiuPollScheduler(
+            entry.options.get(CONF_POLL_MIN_INTERVAL, DEFAULT_POLL_MIN_INTERVAL),
+            entry.options.get(CONF_POLL_MAX_INTERVAL, DEFAULT_POLL_MAX_INTERVAL),
+            poll_phase(api.sn or entry.entry_id),
+        )
+        ttls = {
+            endpoint: entry.options.get(CONF_TTL_PREFIX + endpoint, default)
+            for endpoint, default in DEFAULT_ENDPOINT_TTLS.items()
+        }
+        plan = build_fetch_plan(sensors_selected, platforms)
+        _LOGGER.debug("Fetch plan for %s: %s", entry.title, sorted(plan.endpoints))
+        if ENDPOINT_TRACK_LIST in plan.endpoints:
+            history = async_acquire_history(hass)
+        coordinator = NiuDataUpdateCoordinator(
+            hass,
+            api=api,
+            scheduler=scheduler,
+            ttls=ttls,
+            plan=plan,
+            response_log=_create_response_log(hass, entry, api.sn),
+            history=history,
+        )
+        if hass.state is CoreState.running:
+            await coordinator.async_config_entry_first_refresh()
+    except Exception:
+        async_release_account(hass, account)
+        if history is not None:
+            await async_release_history(hass, history)
+        raise
 
     # Store coordinator in hass.data
     hass.data.setdefault(DOMAIN, {})
@@ -114,110 +289,481 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
 
     await hass.config_entries.async_forward_entry_setups(entry, platforms)
 
+    entry.async_on_unload(entry.add_update_listener(_async_update_listener))
+
+    if coordinator.data is None:
+        # While Home Assistant starts, the first polls of all scooters are
+        # spread out instead of holding up the setup of the entries. Until
+        # its first poll, a scooter's entities have no state yet.
+        @callback
+        def _async_first_refresh(_now: Any) -> None:
+            entry.async_create_background_task(
+                hass, coordinator.async_refresh(), f"niu_first_refresh_{api.sn}"
+            )
+
+        entry.async_on_unload(
+            async_call_later(hass, scheduler.phase * POLL_STARTUP_SPREAD, _async_first_refresh)
+        )
+
+    if coordinator.response_log is not None:
+        # Entries are not unloaded at shutdown; finish the journal file so
+        # the next start can append to it.
+        async def _async_close_response_log(event: Event) -> None:
+            await hass.async_add_executor_job(coordinator.response_log.close)
+
+        entry.async_on_unload(
+            hass.bus.async_listen(EVENT_HOMEASSISTANT_STOP, _async_close_response_log)
+        )
+
+    if history is not None and "recorder" in hass.config.components:
+        if await hass.async_add_executor_job(is_backfilled, history, api.sn):
+            coordinator.statistics_enabled = True
+        else:
+            # First setup (or an interrupted backfill): pull the whole track
+            # list into the long-term statistics in the background.
+            entry.async_create_background_task(
+                hass, coordinator.async_backfill_statistics(), f"niu_backfill_{api.sn}"
+            )
+
     return True
 
 
+async def _async_update_listener(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Reload the entry when its options change."""
+    await hass.config_entries.async_reload(entry.entry_id)
+
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
     if DOMAIN in hass.data and entry.entry_id in hass.data[DOMAIN]:
         platforms = hass.data[DOMAIN][entry.entry_id].get("platforms", PLATFORMS_SENSOR)
         unload_ok = await hass.config_entries.async_unload_platforms(entry, platforms)
         if unload_ok:
-            hass.data[DOMAIN].pop(entry.entry_id)
+            entry_data = hass.data[DOMAIN].pop(entry.entry_id)
+            async_release_account(hass, entry_data["api"].account)
+            if entry_data["coordinator"].response_log is not None:
+                await hass.async_add_executor_job(entry_data["coordinator"].response_log.close)
+            if entry_data["coordinator"].history is not None:
+                await async_release_history(hass, entry_data["coordinator"].history)
             if not hass.data[DOMAIN]:
                 hass.data.pop(DOMAIN)
         return unload_ok
     return False
 
 
-class NiuDataUpdateCoordinator(DataUpdateCoordinator):
-    """Data update coordinator for Niu Scooters."""
+def _changed_fields(previous: Any, parsed: dict[str, Any]) -> set[tuple[str, str]] | None:
+    """Return the (group, field) keys whose value differs between snapshots.
+
+    None means "everything": there is no previous snapshot or a non-field
+    entry (sn, sensor_prefix) changed.
+    """
+    if not isinstance(previous, dict):
+        return None
+    changed: set[tuple[str, str]] = set()
+    for group, values in parsed.items():
+        old_values = previous.get(group)
+        if not isinstance(values, dict):
+            if values != old_values:
+                return None
+            continue
+        if not isinstance(old_values, dict):
+            changed.update((group, field) for field in values)
+            continue
+        for field, value in values.items():
+            if field not in old_values or old_values[field] != value:
+                changed.add((group, field))
+    return changed
 
-    def __init__(self, hass: HomeAssistant, api: NiuApi) -> None:
+
+class NiuDataUpdateCoordinator(DataUpdateCoordinator):
+    """Data update coordinator for Niu Scooters.
+
+    Listeners registered with a frozenset of (group, field) keys as context
+    are only called when one of those fields changed; other listeners are
+    called on every update.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        api: NiuApi,
+        scheduler: NiuPollScheduler,
+        ttls: dict[str, float],
+        plan: NiuFetchPlan,
+        response_log: LastResponseWriter | ResponseJournal | None = None,
+        history: RideHistory | None = None,
+    ) -> None:
         """Initialize the coordinator."""
         self.api = api
+        self.scheduler = scheduler
+        self.ttls = ttls
+        self.plan = plan
+        self.response_log = response_log
+        self.history = history
+        self._redaction = RedactionEngine()
+        self._schema = SchemaMonitor()
+        self._limiter = async_get_limiter(hass)
+        self._extractor = NiuFieldExtractor(plan.fields)
+        updaters: dict[str, Callable[[], Awaitable[bool]]] = {
+            ENDPOINT_BATTERY: api.async_update_bat,
+            ENDPOINT_MOTOR_INDEX: api.async_update_moto,
+            ENDPOINT_OVERALL_TALLY: api.async_update_moto_info,
+            ENDPOINT_TRACK_LIST: (
+                self._async_sync_history if history is not None else api.async_update_track_info
+            ),
+            ENDPOINT_VEHICLES: api.async_update_vehicles,
+        }
+        # Only the endpoints the selected sensors and platforms read from
+        self._updaters = {
+            endpoint: updater for endpoint, updater in updaters.items() if endpoint in plan.endpoints
+        }
+        # Monotonic time of the last successful fetch per endpoint. The
+        # vehicles list was just loaded by NiuApi.async_init.
+        self._fetched_at: dict[str, float] = {ENDPOINT_VEHICLES: time.monotonic()}
+        self._track_marker: tuple[Any, ...] | None = None
+        # Set by a manual refresh: the next update refetches every endpoint
+        self._force_refresh = False
+        # Ride history aggregates, recomputed when rides were added or the
+        # local day changed
+        self._history_summary: dict[str, Any] = {}
+        self._history_key: tuple[Any, ...] | None = None
+        self._history_revision = 0
+        # Set once the track list was fully backfilled into the statistics
+        self.statistics_enabled = False
+        self._backfill_lock = asyncio.Lock()
+        # (group, field) -> listeners subscribed to it
+        self._field_index: dict[tuple[str, str], set[CALLBACK_TYPE]] = {}
+        self._changed: set[tuple[str, str]] | None = None
+        self._dispatched_success = True
+        self.state_writes = 0
+        self.suppressed_writes = 0
         super().__init__(
             hass,
             _LOGGER,
             name=DOMAIN,
-            update_interval=timedelta(seconds=60),
+            update_interval=timedelta(seconds=DEFAULT_POLL_INTERVAL),
+        )
+
+    @property
+    def schema_drift(self) -> dict[str, str]:
+        """Keys the payloads stopped carrying, per endpoint and path."""
+        return self._schema.drift
+
+    @property
+    def request_budget(self) -> dict[str, Any]:
+        """State of the domain-wide request budget."""
+        return self._limiter.as_dict()
+
+    @property
+    def redaction_fallbacks(self) -> int:
+        """Number of payloads redacted with the generic walk."""
+        return self._redaction.fallbacks
+
+    @callback
+    def async_add_listener(
+        self, update_callback: CALLBACK_TYPE, context: Any = None
+    ) -> Callable[[], None]:
+        """Listen for data updates, indexing field-scoped listeners."""
+        remove_listener = super().async_add_listener(update_callback, context)
+        if not isinstance(context, frozenset):
+            return remove_listener
+
+        for key in context:
+            self._field_index.setdefault(key, set()).add(remove_listener)
+
+        @callback
+        def remove_field_listener() -> None:
+            for key in context:
+                listeners = self._field_index.get(key)
+                if listeners is not None:
+                    listeners.discard(remove_listener)
+                    if not listeners:
+                        del self._field_index[key]
+            remove_listener()
+
+        return remove_field_listener
+
+    @callback
+    def async_update_listeners(self) -> None:
+        """Call the listeners whose fields changed since the last update."""
+        changed, self._changed = self._changed, None
+        if changed is None or self.last_update_success != self._dispatched_success:
+            self._dispatched_success = self.last_update_success
+            self.state_writes += len(self._listeners)
+            super().async_update_listeners()
+            return
+
+        notify: set[CALLBACK_TYPE] = set()
+        for key in changed:
+            notify |= self._field_index.get(key, set())
+        for remove_listener, (update_callback, context) in list(self._listeners.items()):
+            if isinstance(context, frozenset) and remove_listener not in notify:
+                self.suppressed_writes += 1
+                continue
+            self.state_writes += 1
+            update_callback()
+
+    def _write_response_log(self, snapshot: dict[str, Any]) -> None:
+        """Redact and persist a snapshot (runs in the executor)."""
+        self.response_log.write(self._redaction.redact_snapshot(snapshot))
+
+    async def _async_sync_history(self) -> bool:
+        """Refresh the track list by syncing the new rides into the history."""
+        page, added, oldest_new = await async_sync_rides(
+            self.hass,
+            self.history,
+            self.api.sn,
+            self.api.async_get_track_page,
+            deadline=request_deadline.get(),
         )
+        self._history_revision += added
+        if added and self.statistics_enabled and not self._backfill_lock.locked():
+            # Keep the long-term statistics current once they were backfilled
+            try:
+                await async_import_statistics(
+                    self.hass, self.history, self.api.sn, self._statistics_name, oldest_new
+                )
+            except (HomeAssistantError, sqlite3.Error) as err:
+                _LOGGER.debug("Failed to import the new rides into statistics: %s", err)
+        if page is None:
+            return False
+        self.api.dataTrackInfo = page
+        return True
+
+    @property
+    def _statistics_name(self) -> str:
+        return self.api.sensor_prefix or f"Niu Scooter {self.api.sn}"
+
+    async def async_request_full_refresh(self) -> None:
+        """Refetch every endpoint regardless of its TTL.
+
+        Goes through the coordinator's refresh debouncer, so repeated calls
+        within its cooldown lead to a single update.
+        """
+        self._force_refresh = True
+        await self.async_request_refresh()
+
+    async def async_backfill_statistics(self, restart: bool = False) -> int:
+        """Backfill the whole track list and import it as long-term statistics.
+
+        Returns the number of hours imported.
+        """
+        if self.history is None:
+            raise HomeAssistantError("The ride history is not enabled for this scooter")
+        async with self._backfill_lock:
+            added = await async_backfill_rides(
+                self.hass, self.history, self.api.sn, self.api.async_get_track_page, restart
+            )
+            self._history_revision += added
+            if "recorder" not in self.hass.config.components:
+                _LOGGER.warning("The recorder is not loaded; ride statistics were not imported")
+                return 0
+            hours = await async_import_statistics(
+                self.hass, self.history, self.api.sn, self._statistics_name
+            )
+            self.statistics_enabled = await self.hass.async_add_executor_job(
+                is_backfilled, self.history, self.api.sn
+            )
+        _LOGGER.debug("Imported %d hours of ride statistics for %s", hours, self.api.sn)
+        return hours
+
+    async def _async_history_summary(self) -> dict[str, Any]:
+        """Return the ride history aggregates of the HISTORY sensor group."""
+        now = dt_util.now()
+        today = dt_util.start_of_local_day(now)
+        key = (today, self._history_revision)
+        if key == self._history_key:
+            return self._history_summary
+
+        def _ms(moment) -> int:
+            return int(moment.timestamp() * 1000)
+
+        def _query() -> dict[str, Any]:
+            sn = self.api.sn
+            day = self.history.summary(sn, _ms(today))
+            week = self.history.summary(sn, _ms(today - timedelta(days=today.weekday())))
+            month = self.history.summary(sn, _ms(today.replace(day=1)))
+            return {
+                "distance_today": round(day["distance"] / 1000, 2),
+                "distance_week": round(week["distance"] / 1000, 2),
+                "distance_month": round(month["distance"] / 1000, 2),
+                "rides_today": day["rides"],
+            }
+
+        self._history_summary = await self.hass.async_add_executor_job(_query)
+        self._history_key = key
+        return self._history_summary
+
+    def _raw_payloads(self) -> dict[str, Any]:
+        """Return the cached payload of every polled data endpoint."""
+        return {
+            ENDPOINT_BATTERY: self.api.dataBat,
+            ENDPOINT_MOTOR_INDEX: self.api.dataMoto,
+            ENDPOINT_OVERALL_TALLY: self.api.dataMotoInfo,
+            ENDPOINT_TRACK_LIST: self.api.dataTrackInfo,
+        }
+
+    def _last_track_marker(self) -> tuple[Any, ...] | None:
+        """Return the motor index lastTrack (time, distance, ridingTime)."""
+        last_track = (self.api.dataMoto or {}).get("data", {}).get("lastTrack")
+        if not isinstance(last_track, dict):
+            return None
+        return (last_track.get("time"), last_track.get("distance"), last_track.get("ridingTime"))
+
+    def _due_endpoints(self, now: float) -> list[str]:
+        """Return the endpoints whose cached payload has outlived its TTL."""
+        return [
+            endpoint
+            for endpoint in self._updaters
+            if endpoint not in self._fetched_at
+            or now - self._fetched_at[endpoint] >= self.ttls.get(endpoint, 0)
+        ]
+
+    def _endpoint_available(self, endpoint: str) -> bool:
+        """Return False while the circuit breaker of the endpoint is open."""
+        return self.api.account.breaker(ENDPOINT_URIS[endpoint]).available()
+
+    @property
+    def breakers(self) -> dict[str, dict[str, Any]]:
+        """Circuit breaker state of the polled endpoints."""
+        return {
+            endpoint: self.api.account.breaker(ENDPOINT_URIS[endpoint]).as_dict()
+            for endpoint in self._updaters
+        }
+
+    async def _async_fetch_endpoints(
+        self, jobs: dict[str, Callable[[], Awaitable[bool]]], deadline: float
+    ) -> set[str]:
+        """Run endpoint updates concurrently until `deadline` (loop time).
+
+        A failing or slow endpoint is logged and left with its previous data;
+        it never holds back the results of the other endpoints. Returns the
+        endpoints that delivered a fresh payload.
+        """
+        if not jobs:
+            return set()
+        semaphore = asyncio.Semaphore(UPDATE_MAX_PARALLEL)
+
+        async def _run(job) -> bool:
+            async with semaphore:
+                return await job()
+
+        # The requests (and their retries) started by the tasks end by the
+        # deadline themselves, so none keeps running once the update gave up.
+        deadline_token = request_deadline.set(deadline)
+        try:
+            tasks = {asyncio.create_task(_run(job)): name for name, job in jobs.items()}
+        finally:
+            request_deadline.reset(deadline_token)
+        timeout = max(0.0, deadline - asyncio.get_running_loop().time())
+        done, pending = await asyncio.wait(tasks, timeout=timeout)
+
+        for task in pending:
+            task.cancel()
+            _LOGGER.debug("Endpoint %s did not answer before the update deadline", tasks[task])
+        if pending:
+            await asyncio.wait(pending)
+
+        fetched: set[str] = set()
+        for task in done:
+            err = task.exception()
+            if err is not None:
+                _LOGGER.debug("Endpoint %s update failed: %s", tasks[task], err)
+            elif task.result():
+                fetched.add(tasks[task])
+        return fetched
 
     async def _async_update_data(self):
         """Fetch data from API."""
         _LOGGER.debug("Updating Niu Scooter data")
 
-        # Update all data from API
-        await self.api.async_update_bat()
-        await self.api.async_update_moto()
-        await self.api.async_update_moto_info()
-        await self.api.async_update_track_info()
-
-        parsed = {
-            SENSOR_TYPE_BAT: {
-                "batteryCharging": self.api.getDataBat("batteryCharging"),
-                "isConnected": self.api.getDataBat("isConnected"),
-                "chargedTimes": self.api.getDataBat("chargedTimes"),
-                "temperatureDesc": self.api.getDataBat("temperatureDesc"),
-                "temperature": self.api.getDataBat("temperature"),
-                "gradeBattery": self.api.getDataBat("gradeBattery"),
-                "bmsId": self.api.getDataBat("bmsId"),
-                "isCharging": self.api.getDataBat("isCharging"),
-                "estimatedMileage": self.api.getDataBat("estimatedMileage"),
-                "centreCtrlBattery": self.api.getDataBat("centreCtrlBattery"),
-            },
-            SENSOR_TYPE_MOTO: {
-                "nowSpeed": self.api.getDataMoto("nowSpeed"),
-                "isConnected": self.api.getDataMoto("isConnected"),
-                "lockStatus": self.api.getDataMoto("lockStatus"),
-                "leftTime": self.api.getDataMoto("leftTime"),
-                "hdop": self.api.getDataMoto("hdop"),
-            },
-            SENSOR_TYPE_POS: {
-                "lat": self.api.getDataPos("lat"),
-                "lng": self.api.getDataPos("lng"),
-            },
-            SENSOR_TYPE_DIST: {
-                "distance": self.api.getDataDist("distance"),
-                "ridingTime": self.api.getDataDist("ridingTime"),
-                "time": self.api.getDataDist("time"),
-            },
-            SENSOR_TYPE_OVERALL: {
-                "totalMileage": self.api.getDataOverall("totalMileage"),
-                "bindDaysCount": self.api.getDataOverall("bindDaysCount"),
-            },
-            SENSOR_TYPE_TRACK: {
-                "startTime": self.api.getDataTrack("startTime"),
-                "endTime": self.api.getDataTrack("endTime"),
-                "distance": self.api.getDataTrack("distance"),
-                "avespeed": self.api.getDataTrack("avespeed"),
-                "ridingtime": self.api.getDataTrack("ridingtime"),
-                "track_thumb": self.api.getDataTrack("track_thumb"),
-            },
-            "sn": self.api.sn,
-            "sensor_prefix": self.api.sensor_prefix,
-        }
+        # Refresh the endpoints that are due in one concurrent batch; the
+        # others keep serving their cached payload.
+        # Endpoints whose circuit breaker is open are not even attempted.
+        # Both batches and the ride history sync share one deadline.
+        now = time.monotonic()
+        deadline = asyncio.get_running_loop().time() + UPDATE_TIMEOUT
+        force, self._force_refresh = self._force_refresh, False
+        due = list(self._updaters) if force else self._due_endpoints(now)
+        track_expired = ENDPOINT_TRACK_LIST in due
+        skipped = {endpoint for endpoint in due if not self._endpoint_available(endpoint)}
+        # With the request budget used up, low-priority endpoints wait for a
+        # later poll and keep serving their cached payload meanwhile.
+        if not force and not self._limiter.has_budget():
+            deferred = {
+                endpoint
+                for endpoint in due
+                if endpoint in self._fetched_at
+                and path_priority(ENDPOINT_URIS[endpoint]) >= PRIORITY_LOW
+            }
+            self._limiter.deferred += len(deferred)
+            due = [endpoint for endpoint in due if endpoint not in deferred]
+            track_expired = ENDPOINT_TRACK_LIST in due
+        attempted = {endpoint for endpoint in due if endpoint not in skipped} - {ENDPOINT_TRACK_LIST}
+        fetched = await self._async_fetch_endpoints(
+            {endpoint: self._updaters[endpoint] for endpoint in attempted}, deadline
+        )
+
+        # The track list only changes when a ride ends, which the motor index
+        # reports through its lastTrack marker. Its TTL is just a safety net.
+        marker = self._last_track_marker()
+        if ENDPOINT_TRACK_LIST in self._updaters and (
+            self.api.dataTrackInfo is None
+            or track_expired
+            or (marker is not None and marker != self._track_marker)
+        ):
+            if self._endpoint_available(ENDPOINT_TRACK_LIST):
+                attempted.add(ENDPOINT_TRACK_LIST)
+                fetched |= await self._async_fetch_endpoints(
+                    {ENDPOINT_TRACK_LIST: self._updaters[ENDPOINT_TRACK_LIST]}, deadline
+                )
+                if ENDPOINT_TRACK_LIST in fetched:
+                    self._track_marker = marker
+            else:
+                skipped.add(ENDPOINT_TRACK_LIST)
+
+        if (attempted or skipped) and not fetched:
+            # Nothing came back: do not present the cached data as current.
+            raise UpdateFailed(
+                f"No NIU endpoint answered (failed: {sorted(attempted)}, circuit open: {sorted(skipped)})"
+            )
+
+        raw = {ENDPOINT_VEHICLES: self.api.dataVehiclesInfo, **self._raw_payloads()}
+        for endpoint in fetched:
+            self._fetched_at[endpoint] = now
+            self._schema.check(endpoint, raw[endpoint])
+
+        parsed: dict[str, Any] = self._extractor.extract(raw)
+        if SENSOR_TYPE_HISTORY in parsed and self.history is not None:
+            try:
+                summary = await self._async_history_summary()
+            except sqlite3.Error as err:
+                _LOGGER.warning("Failed to read the ride history: %s", err)
+                summary = self._history_summary
+            parsed[SENSOR_TYPE_HISTORY] = {
+                field: summary.get(field) for field in parsed[SENSOR_TYPE_HISTORY]
+            }
+        parsed["sn"] = self.api.sn
+        parsed["sensor_prefix"] = self.api.sensor_prefix
+        self._changed = _changed_fields(self.data, parsed)
 
         snapshot = {
             "sn": self.api.sn,
             "sensor_prefix": self.api.sensor_prefix,
             "parsed": parsed,
-            "raw": {
-                "vehicles_info": getattr(self.api, "dataVehiclesInfo", None),
-                "battery_info": getattr(self.api, "dataBat", None),
-                "motor_index_info": getattr(self.api, "dataMoto", None),
-                "overall_tally": getattr(self.api, "dataMotoInfo", None),
-                "track_list": getattr(self.api, "dataTrackInfo", None),
-            },
+            "raw": raw,
         }
 
-        snapshot = _redact_sensitive(snapshot)
+        if self.response_log is not None:
+            try:
+                await self.hass.async_add_executor_job(self._write_response_log, snapshot)
+            except Exception as err:
+                _LOGGER.debug("Failed to write the response log: %s", err)
 
-        # Save latest snapshot to a single file (overwrite), to avoid unbounded growth.
-        try:
-            snapshot_path = Path(self.hass.config.path("niu_last_response.json"))
-            await self.hass.async_add_executor_job(_atomic_write_json, snapshot_path, snapshot)
-        except Exception as err:
-            _LOGGER.debug("Failed to write niu_last_response.json: %s", err)
+        # The next refresh is scheduled with whatever interval is set here.
+        self.update_interval = self.scheduler.stagger(self.scheduler.next_interval(parsed))
+        _LOGGER.debug(
+            "Scooter %s is %s, next poll in %s", self.api.sn, self.scheduler.state, self.update_interval
+        )
 
         return parsed
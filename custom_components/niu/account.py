@@ -0,0 +1,491 @@
+"""Account-level session shared by every scooter of one NIU account."""
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import hashlib
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+import aiohttp
+from aiohttp import ClientTimeout
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.helpers.event import async_call_later
+
+from .auth import NiuToken, async_get_token_store
+from .breaker import CircuitBreaker, backoff_delay
+from .client import NiuHttpClient
+from .const import (
+    ACCOUNT_BASE_URL,
+    ACCOUNT_LINGER,
+    API_BASE_URL,
+    AUTH_ERROR_STATUSES,
+    DATA_ACCOUNTS,
+    DOMAIN,
+    HTTP_REQUEST_TIMEOUT,
+    LOGIN_URI,
+    MOTOINFO_LIST_API_URI,
+    NIU_APP_ID,
+    PRIORITY_AUTH,
+    REQUEST_MAX_ATTEMPTS,
+    RETRY_BACKOFF_MAX,
+    VEHICLES_SHARED_MAX_AGE,
+)
+from .limiter import async_get_limiter, path_priority
+from .models import decode_json
+
+_LOGGER = logging.getLogger(__name__)
+
+# Loop time by which the requests of the running coordinator update have to
+# end, retries included; None leaves requests to their own timeouts.
+request_deadline: contextvars.ContextVar[float | None] = contextvars.ContextVar(
+    "niu_request_deadline", default=None
+)
+
+
+class NiuRequestError(Exception):
+    """Base of the classified request failures."""
+
+
+class NiuAuthError(NiuRequestError):
+    """Raised when the NIU cloud rejects the access token."""
+
+
+class NiuTransientError(NiuRequestError):
+    """A failure worth retrying: the endpoint may well answer a bit later."""
+
+    retry_after: float | None = None
+
+
+class NiuTimeoutError(NiuTransientError):
+    """The request did not complete in time."""
+
+
+class NiuConnectionError(NiuTransientError):
+    """The connection to the NIU cloud failed."""
+
+
+class NiuServerError(NiuTransientError):
+    """HTTP 5xx, or a body that is not JSON."""
+
+
+class NiuRateLimitError(NiuTransientError):
+    """HTTP 429; `retry_after` is the delay the server asked for, if any."""
+
+    def __init__(self, message: str, retry_after: float | None = None) -> None:
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def account_key(
+    username: str, account_url: str = ACCOUNT_BASE_URL, api_url: str = API_BASE_URL
+) -> str:
+    """Return the key of an account's session and stored token. Accounts on
+    other servers (e.g. the emulator) are kept apart from the NIU cloud ones."""
+    key = username.lower()
+    if (account_url, api_url) != (ACCOUNT_BASE_URL, API_BASE_URL):
+        key += f"@{account_url}|{api_url}"
+    return key
+
+
+def _retry_after(value: str | None) -> float | None:
+    """Parse a Retry-After header given in seconds."""
+    try:
+        return max(0.0, float(value)) if value is not None else None
+    except ValueError:
+        return None
+
+
+class NiuAccount:
+    """Own the token and the vehicles list of one NIU account.
+
+    Every NiuApi of the account borrows this session, so N scooters on one
+    account need a single login and a single `/v5/scooter/list` call. It
+    outlives its last user briefly, so the login of the config flow and the
+    vehicles list of an entry being reloaded are reused.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        username: str,
+        password: str,
+        client: NiuHttpClient | None = None,
+        account_url: str = ACCOUNT_BASE_URL,
+        api_url: str = API_BASE_URL,
+    ) -> None:
+        self.hass = hass
+        self.username = username
+        self.password = password
+        self.account_url = account_url.rstrip("/")
+        self.api_url = api_url.rstrip("/")
+        self.key = account_key(username, self.account_url, self.api_url)
+        # Without a client of its own (e.g. in the config flow) the account
+        # uses Home Assistant's shared session.
+        self.client = client
+
+        self.token: str = ""
+        self._token: NiuToken | None = None
+        self._token_lock = asyncio.Lock()
+        self._token_store = async_get_token_store(hass)
+
+        self.vehicles_info: Optional[Dict[str, Any]] = None
+        self._vehicles_fetched_at = 0.0
+        # Requests in flight, shared by every scooter of the account
+        self._inflight: dict[Hashable, asyncio.Task[Optional[Dict[str, Any]]]] = {}
+        self.coalesced = 0
+
+        # Shared by all accounts, including standalone ones
+        self._limiter = async_get_limiter(hass)
+        # API path -> breaker, shared by the scooters of the account
+        self._breakers: dict[str, CircuitBreaker] = {}
+
+        self._users = 0
+        # Pending drop of an account nobody uses any more
+        self._release_timer: CALLBACK_TYPE | None = None
+
+    async def async_ensure_token(self) -> str | None:
+        """Return a usable access token, logging in only when needed.
+
+        The cached token is reused while it is fresh, refreshed with the refresh
+        token shortly before it expires, and replaced by a full password login
+        as a last resort.
+        """
+        async with self._token_lock:
+            if self._token is None:
+                self._token = await self._token_store.async_get(self.key)
+
+            token = self._token
+            if token is not None and token.is_fresh():
+                self.token = token.access_token
+                return self.token
+
+            if token is not None and token.can_refresh():
+                refreshed = await self._async_request_token(
+                    {"grant_type": "refresh_token", "refresh_token": token.refresh_token}
+                )
+                if refreshed is not None:
+                    await self._async_set_token(refreshed)
+                    return self.token
+                _LOGGER.debug("Token refresh failed, falling back to password login")
+
+            await self._async_set_token(await self._async_login())
+            return self.token or None
+
+    async def async_invalidate_token(self, access_token: str) -> None:
+        """Drop a token the API rejected so the next request logs in again."""
+        async with self._token_lock:
+            if self._token is not None and self._token.access_token == access_token:
+                # Keep the refresh token: it may still be valid.
+                self._token.expires_at = 0
+
+    async def async_login(self, password: str | None = None) -> str | None:
+        """Log in with the account password and cache the new token.
+
+        A password given here (e.g. by the config flow) replaces the account
+        password only once the login with it succeeded.
+        """
+        async with self._token_lock:
+            token = await self._async_login(password)
+            if token is None:
+                return None
+            if password is not None:
+                self.password = password
+            await self._async_set_token(token)
+            return self.token
+
+    async def async_get_vehicles_info(self, force: bool = False) -> Optional[Dict[str, Any]]:
+        """Return the account's vehicles list, fetching it once for all scooters.
+
+        With force, the list is refetched unless another scooter of the
+        account refreshed it in the last VEHICLES_SHARED_MAX_AGE seconds.
+        Concurrent calls, forced or not, share one request.
+        """
+        stale = time.monotonic() - self._vehicles_fetched_at >= VEHICLES_SHARED_MAX_AGE
+        if self.vehicles_info is None or (force and stale):
+            await self.async_single_flight(
+                ("GET", MOTOINFO_LIST_API_URI), self._async_fetch_vehicles_info
+            )
+        return self.vehicles_info
+
+    async def _async_fetch_vehicles_info(self) -> Optional[Dict[str, Any]]:
+        vehicles_info = await self.async_request(
+            "GET", MOTOINFO_LIST_API_URI, "Vehicles info", headers={}, check_status=False
+        )
+        if vehicles_info is not None:
+            self.vehicles_info = vehicles_info
+            self._vehicles_fetched_at = time.monotonic()
+        return vehicles_info
+
+    async def async_single_flight(
+        self, key: Hashable, request: Callable[[], Awaitable[Optional[Dict[str, Any]]]]
+    ) -> Optional[Dict[str, Any]]:
+        """Run `request` unless one with the same key (e.g. endpoint and
+        scooter) is in flight, and share its result with every concurrent
+        caller of the account."""
+        task = self._inflight.get(key)
+        if task is None:
+            task = self.hass.async_create_task(request(), f"niu_request_{key}")
+            if not task.done():
+                self._inflight[key] = task
+                task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        else:
+            self.coalesced += 1
+        # A caller giving up does not cancel the request for the others.
+        return await asyncio.shield(task)
+
+    def _session(self) -> aiohttp.ClientSession:
+        if self.client is not None:
+            return self.client.session
+        return async_get_clientsession(self.hass, verify_ssl=False)
+
+    async def _async_set_token(self, token: NiuToken | None) -> None:
+        self._token = token
+        self.token = token.access_token if token is not None else ""
+        await self._token_store.async_set(self.key, token)
+
+    async def _async_login(self, password: str | None = None) -> NiuToken | None:
+        password = self.password if password is None else password
+        md5 = hashlib.md5(password.encode("utf-8")).hexdigest()
+        return await self._async_request_token(
+            {"account": self.username, "password": md5, "grant_type": "password"}
+        )
+
+    async def _async_request_token(self, grant: dict[str, Any]) -> NiuToken | None:
+        """POST an OAuth grant to the account server."""
+        url = self.account_url + LOGIN_URI
+        data = {**grant, "scope": "base", "app_id": NIU_APP_ID}
+
+        await self._limiter.acquire(PRIORITY_AUTH)
+        try:
+            async with self._session().post(
+                url, data=data, timeout=ClientTimeout(total=HTTP_REQUEST_TIMEOUT)
+            ) as response:
+                if response.status != 200:
+                    _LOGGER.error("Login failed with status %d", response.status)
+                    return None
+
+                token_data = decode_json(await response.read())
+                return NiuToken.from_response(token_data.get("data", {}).get("token", {}))
+
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as err:
+            _LOGGER.error("Error getting token: %s", err)
+            return None
+
+    def breaker(self, path: str) -> CircuitBreaker:
+        """Return the circuit breaker of an API path."""
+        breaker = self._breakers.get(path)
+        if breaker is None:
+            breaker = self._breakers[path] = CircuitBreaker()
+        return breaker
+
+    @property
+    def breakers(self) -> dict[str, CircuitBreaker]:
+        return self._breakers
+
+    async def async_request(
+        self,
+        method: str,
+        path: str,
+        description: str,
+        headers: dict[str, str],
+        check_status: bool = True,
+        **kwargs: Any,
+    ) -> Optional[Dict[str, Any]]:
+        """Send an authenticated API request.
+
+        Transient failures are retried with backoff; once they are used up
+        the failure counts against the circuit breaker of `path`, and the
+        request is not sent at all while that breaker is open. An auth
+        failure invalidates the token and the request is retried once with a
+        fresh login. All attempts share the time left before the
+        request_deadline; running into it counts as a failure as well. A
+        request that could not be authenticated, or was cancelled, counts
+        neither way.
+        """
+        breaker = self.breaker(path)
+        if not breaker.allow():
+            _LOGGER.debug("%s skipped: %s is failing", description, path)
+            return None
+        deadline = request_deadline.get()
+        try:
+            async with asyncio.timeout_at(deadline):
+                # A probe of a failing path gets a single attempt
+                result = await self._async_request_with_retries(
+                    method,
+                    path,
+                    description,
+                    headers,
+                    check_status,
+                    1 if breaker.probing else REQUEST_MAX_ATTEMPTS,
+                    deadline,
+                    **kwargs,
+                )
+        except NiuTransientError as err:
+            breaker.record_failure(retry_after=err.retry_after)
+            _LOGGER.debug("%s failed: %s (breaker %s)", description, err, breaker.state)
+            return None
+        except TimeoutError:
+            breaker.record_failure()
+            _LOGGER.debug(
+                "%s did not end before the update deadline (breaker %s)", description, breaker.state
+            )
+            return None
+        except NiuAuthError as err:
+            breaker.release()
+            _LOGGER.debug("%s not sent: %s", description, err)
+            return None
+        except asyncio.CancelledError:
+            breaker.release()
+            raise
+        breaker.record_success()
+        return result
+
+    async def _async_request_with_retries(
+        self,
+        method: str,
+        path: str,
+        description: str,
+        headers: dict[str, str],
+        check_status: bool,
+        attempts: int,
+        deadline: float | None = None,
+        **kwargs: Any,
+    ) -> Optional[Dict[str, Any]]:
+        """Send a request, retrying transient failures up to `attempts` times
+        while a retry can still start before `deadline`. Raises NiuAuthError
+        when there is no token, or the new one is rejected as well."""
+        attempt = 0
+        relogged = False
+        while True:
+            token = await self.async_ensure_token()
+            if not token:
+                raise NiuAuthError(f"no token available for {description}")
+            try:
+                return await self._async_send(
+                    method, path, description, {"token": token, **headers}, check_status, **kwargs
+                )
+            except NiuAuthError:
+                if relogged:
+                    _LOGGER.error("%s rejected the new token as well", description)
+                    raise
+                relogged = True
+                _LOGGER.debug("%s: token rejected, logging in again", description)
+                await self.async_invalidate_token(token)
+            except NiuTransientError as err:
+                attempt += 1
+                if attempt >= attempts or (err.retry_after or 0) > RETRY_BACKOFF_MAX:
+                    raise
+                delay = max(backoff_delay(attempt - 1), err.retry_after or 0)
+                if deadline is not None and asyncio.get_running_loop().time() + delay >= deadline:
+                    raise
+                _LOGGER.debug("%s failed (%s), retrying in %.1fs", description, err, delay)
+                await asyncio.sleep(delay)
+
+    async def _async_send(
+        self,
+        method: str,
+        path: str,
+        description: str,
+        headers: dict[str, str],
+        check_status: bool,
+        **kwargs: Any,
+    ) -> Optional[Dict[str, Any]]:
+        """Send one request, raising a NiuRequestError for failures that are
+        worth retrying or logging in again. Other rejections return None."""
+        url = self.api_url + path
+
+        # Every attempt, retries included, spends from the request budget
+        await self._limiter.acquire(path_priority(path))
+        try:
+            async with self._session().request(
+                method, url, headers=headers, timeout=ClientTimeout(total=HTTP_REQUEST_TIMEOUT), **kwargs
+            ) as response:
+                if response.status in (401, 403):
+                    raise NiuAuthError(f"{description} returned HTTP {response.status}")
+                if response.status == 429:
+                    raise NiuRateLimitError(
+                        f"{description} was rate limited",
+                        _retry_after(response.headers.get(aiohttp.hdrs.RETRY_AFTER)),
+                    )
+                if response.status >= 500:
+                    raise NiuServerError(f"{description} returned HTTP {response.status}")
+                if response.status != 200:
+                    _LOGGER.debug("%s request failed with status %d", description, response.status)
+                    return None
+
+                try:
+                    data = decode_json(await response.read())
+                except ValueError as err:
+                    raise NiuServerError(f"{description} returned invalid JSON: {err}") from err
+                if data.get("status") in AUTH_ERROR_STATUSES:
+                    raise NiuAuthError(f"{description} returned status {data.get('status')}")
+                if check_status and data.get("status") != 0:
+                    _LOGGER.debug("API returned non-zero status: %s", data.get("status"))
+                    return None
+                return data
+
+        except asyncio.TimeoutError as err:
+            raise NiuTimeoutError(f"{description} timed out") from err
+        except aiohttp.ClientError as err:
+            raise NiuConnectionError(f"{description}: {err}") from err
+
+
+def async_acquire_account(
+    hass: HomeAssistant,
+    username: str,
+    password: str,
+    account_url: str = ACCOUNT_BASE_URL,
+    api_url: str = API_BASE_URL,
+) -> NiuAccount:
+    """Return the shared session for a username, creating it on first use.
+
+    The password only seeds a new session; an existing session keeps its
+    password until a login with another one succeeds.
+    """
+    accounts: dict[str, NiuAccount] = hass.data.setdefault(DOMAIN, {}).setdefault(DATA_ACCOUNTS, {})
+    key = account_key(username, account_url.rstrip("/"), api_url.rstrip("/"))
+    account = accounts.get(key)
+    if account is None:
+        account = accounts[key] = NiuAccount(
+            hass, username, password, NiuHttpClient(hass), account_url, api_url
+        )
+    if account._release_timer is not None:
+        account._release_timer()
+        account._release_timer = None
+    account._users += 1
+    return account
+
+
+def async_release_account(hass: HomeAssistant, account: NiuAccount, linger: bool = True) -> None:
+    """Give back a session; it is dropped ACCOUNT_LINGER seconds after the
+    last user gave it back, unless it was acquired again meanwhile. Without
+    linger, a session nobody else uses is dropped right away."""
+    account._users -= 1
+    if account._users > 0 or account._release_timer is not None:
+        return
+    if not linger:
+        _async_drop_account(hass, account)
+        return
+
+    @callback
+    def _async_drop(_now: Any) -> None:
+        account._release_timer = None
+        if account._users <= 0:
+            _async_drop_account(hass, account)
+
+    account._release_timer = async_call_later(hass, ACCOUNT_LINGER, _async_drop)
+
+
+@callback
+def _async_drop_account(hass: HomeAssistant, account: NiuAccount) -> None:
+    accounts = hass.data.get(DOMAIN, {}).get(DATA_ACCOUNTS, {})
+    if accounts.get(account.key) is account:
+        accounts.pop(account.key)
+    if account.client is not None:
+        hass.async_create_task(account.client.async_close())
+    if not accounts:
+        hass.data.get(DOMAIN, {}).pop(DATA_ACCOUNTS, None)
@@ -1,37 +1,52 @@
 from __future__ import annotations
 
-import asyncio
-from datetime import datetime
-import hashlib
-import json
 import logging
-import ssl
-from time import gmtime, strftime
-from typing import Any, Dict, Optional
-
-import aiohttp
-from aiohttp import ClientTimeout
-from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
 
+from .account import NiuAccount
 from .const import *
+from .models import (
+    BatteryInfoResponse,
+    MotorIndexResponse,
+    OverallTallyResponse,
+    TrackListResponse,
+    VehiclesResponse,
+)
 
 _LOGGER = logging.getLogger(__name__)
 
 
 class NiuApi:
-    def __init__(self, hass, username: str, password: str, scooter_id: int) -> None:
+    def __init__(
+        self,
+        hass,
+        username: str,
+        password: str,
+        scooter_id: int,
+        account: NiuAccount | None = None,
+        account_url: str = ACCOUNT_BASE_URL,
+        api_url: str = API_BASE_URL,
+    ) -> None:
         self.hass = hass
         self.username = username
         self.password = password
         self.scooter_id = int(scooter_id)
 
-        self.dataBat: Optional[Dict[str, Any]] = None
-        self.dataMoto: Optional[Dict[str, Any]] = None
-        self.dataMotoInfo: Optional[Dict[str, Any]] = None
-        self.dataTrackInfo: Optional[Dict[str, Any]] = None
-        self.dataVehiclesInfo: Optional[Dict[str, Any]] = None
+        # Token and vehicles list are borrowed from the account session; a
+        # standalone client gets a private one, on the given servers (e.g.
+        # the emulator in tools/).
+        self.account = (
+            account
+            if account is not None
+            else NiuAccount(hass, username, password, account_url=account_url, api_url=api_url)
+        )
+
+        self.dataBat: Optional[BatteryInfoResponse] = None
+        self.dataMoto: Optional[MotorIndexResponse] = None
+        self.dataMotoInfo: Optional[OverallTallyResponse] = None
+        self.dataTrackInfo: Optional[TrackListResponse] = None
+        self.dataVehiclesInfo: Optional[VehiclesResponse] = None
         
-        self.token: str = ""
         self.sn: str = ""
         self.sensor_prefix: str = ""
 
@@ -40,16 +55,18 @@ class NiuApi:
         self.product_type: str | None = None
         self.carframe_id: str | None = None
 
+    @property
+    def token(self) -> str:
+        """Return the account's current access token."""
+        return self.account.token
+
     async def async_init(self) -> None:
         """Initialize API asynchronously."""
-        self.token = await self.async_get_token()
-        
-        if not self.token:
+        if not await self.account.async_ensure_token():
             _LOGGER.error("Failed to get authentication token")
             return
             
-        api_uri = MOTOINFO_LIST_API_URI
-        vehicles_info = await self.async_get_vehicles_info(api_uri)
+        vehicles_info = await self.account.async_get_vehicles_info()
         self.dataVehiclesInfo = vehicles_info
         
         if not vehicles_info:
@@ -63,11 +80,7 @@ class NiuApi:
             
         raw_sn = items[self.scooter_id].get("sn_id", "")
         vehicle = items[self.scooter_id] if isinstance(items[self.scooter_id], dict) else {}
-        self.sensor_prefix = vehicle.get("scooter_name", "")
-
-        self.sku_name = vehicle.get("sku_name")
-        self.product_type = vehicle.get("product_type")
-        self.carframe_id = vehicle.get("carframe_id")
+        self._apply_vehicle(vehicle)
         
         # Validate SN - treat "none" as invalid
         if not raw_sn or raw_sn.lower() == "none":
@@ -80,242 +93,132 @@ class NiuApi:
             _LOGGER.error("Failed to get valid scooter SN")
             return
 
+    def _apply_vehicle(self, vehicle: Dict[str, Any]) -> None:
+        """Take over the scooter metadata from a vehicles list item."""
+        self.sensor_prefix = vehicle.get("scooter_name", "")
+
+        self.sku_name = vehicle.get("sku_name")
+        self.product_type = vehicle.get("product_type")
+        self.carframe_id = vehicle.get("carframe_id")
+
+    async def _async_single_flight(
+        self, key: Hashable, request: Callable[[], Awaitable[Optional[Dict[str, Any]]]]
+    ) -> Optional[Dict[str, Any]]:
+        """Run `request` unless an identical one for this scooter is in
+        flight on the account, and share its result."""
+        return await self.account.async_single_flight((self.sn, key), request)
+
     async def async_get_token(self) -> str:
         """Get authentication token asynchronously."""
-        url = ACCOUNT_BASE_URL + LOGIN_URI
-        md5 = hashlib.md5(self.password.encode("utf-8")).hexdigest()
-        data = {
-            "account": self.username,
-            "password": md5,
-            "grant_type": "password",
-            "scope": "base",
-            "app_id": "niu_ktdrr960",
-        }
-        
-        try:
-            session = async_get_clientsession(self.hass, verify_ssl=False)
-            async with session.post(url, data=data, timeout=ClientTimeout(total=10)) as response:
-                if response.status != 200:
-                    _LOGGER.error("Login failed with status %d", response.status)
-                    return None
-                    
-                response_text = await response.text()
-                token_data = json.loads(response_text)
-                return token_data.get("data", {}).get("token", {}).get("access_token", "")
-                
-        except (aiohttp.ClientError, asyncio.TimeoutError, json.JSONDecodeError) as err:
-            _LOGGER.error("Error getting token: %s", err)
-            return None
-
-    async def async_get_vehicles_info(self, path: str) -> Optional[Dict[str, Any]]:
-        """Get vehicles information asynchronously."""
-        if not self.token:
-            _LOGGER.error("No token available")
-            return None
-            
-        url = API_BASE_URL + path
-        headers = {"token": str(self.token)}
-        
-        try:
-            session = async_get_clientsession(self.hass, verify_ssl=False)
-            async with session.get(url, headers=headers, timeout=ClientTimeout(total=10)) as response:
-                if response.status != 200:
-                    _LOGGER.debug("Vehicles info request failed with status %d", response.status)
-                    return None
-                    
-                response_text = await response.text()
-                return json.loads(response_text)
-                
-        except (aiohttp.ClientError, asyncio.TimeoutError, json.JSONDecodeError) as err:
-            _LOGGER.debug("Error getting vehicles info: %s", err)
-            return None
+        return await self.account.async_login()
 
     async def async_get_info(self, path: str) -> Optional[Dict[str, Any]]:
         """Get information asynchronously."""
-        if not self.token or not self.sn:
-            _LOGGER.debug("No token or SN available")
+        if not self.sn:
+            _LOGGER.debug("No SN available")
             return None
             
-        url = API_BASE_URL + path
-        params = {"sn": self.sn}
         headers = {
-            "token": str(self.token),
             "user-agent": "manager/4.10.4 (android; IN2020 11);lang=zh-CN;client-agentIdentifier=Domestic;timezone=Asia/Shanghai;model=IN2020;deviceName=IN2020;ostype=android",
         }
-        
-        try:
-            session = async_get_clientsession(self.hass, verify_ssl=False)
-            async with session.get(url, headers=headers, params=params, timeout=ClientTimeout(total=10)) as response:
-                if response.status != 200:
-                    _LOGGER.debug("Get info request failed with status %d", response.status)
-                    return None
-                    
-                response_text = await response.text()
-                data = json.loads(response_text)
-                if data.get("status") != 0:
-                    _LOGGER.debug("API returned non-zero status: %d", data.get("status"))
-                    return None
-                return data
-                
-        except (aiohttp.ClientError, asyncio.TimeoutError, json.JSONDecodeError) as err:
-            _LOGGER.debug("Error getting info: %s", err)
-            return None
+        return await self._async_single_flight(
+            ("GET", path),
+            lambda: self.account.async_request(
+                "GET", path, "Get info", headers=headers, params={"sn": self.sn}
+            ),
+        )
 
     async def async_post_info(self, path: str) -> Optional[Dict[str, Any]]:
         """POST information asynchronously."""
-        if not self.token or not self.sn:
-            _LOGGER.debug("No token or SN available")
+        if not self.sn:
+            _LOGGER.debug("No SN available")
             return None
             
-        url = API_BASE_URL + path
-        headers = {"token": str(self.token), "Accept-Language": "en-US"}
-        
-        try:
-            session = async_get_clientsession(self.hass, verify_ssl=False)
-            async with session.post(url, headers=headers, data={"sn": self.sn}, timeout=ClientTimeout(total=10)) as response:
-                if response.status != 200:
-                    _LOGGER.debug("Post info request failed with status %d", response.status)
-                    return None
-                    
-                response_text = await response.text()
-                data = json.loads(response_text)
-                if data.get("status") != 0:
-                    _LOGGER.debug("API returned non-zero status: %d", data.get("status"))
-                    return None
-                return data
-                
-        except (aiohttp.ClientError, asyncio.TimeoutError, json.JSONDecodeError) as err:
-            _LOGGER.debug("Error posting info: %s", err)
-            return None
-
-    async def async_post_info_track(self, path: str) -> Optional[Dict[str, Any]]:
-        """POST track information asynchronously."""
-        if not self.token or not self.sn:
-            _LOGGER.debug("No token or SN available")
+        headers = {"Accept-Language": "en-US"}
+        return await self._async_single_flight(
+            ("POST", path),
+            lambda: self.account.async_request(
+                "POST", path, "Post info", headers=headers, data={"sn": self.sn}
+            ),
+        )
+
+    async def async_post_info_track(
+        self, path: str, index: int = 0, pagesize: int = 10
+    ) -> Optional[Dict[str, Any]]:
+        """POST track information asynchronously (one page, newest first)."""
+        if not self.sn:
+            _LOGGER.debug("No SN available")
             return None
             
-        url = API_BASE_URL + path
         headers = {
-            "token": str(self.token),
             "Accept-Language": "en-US",
             "User-Agent": "manager/1.0.0 (identifier);clientIdentifier=identifier",
         }
-        
-        try:
-            session = async_get_clientsession(self.hass, verify_ssl=False)
-            async with session.post(
-                url, 
-                headers=headers, 
-                json={"index": "0", "pagesize": 10, "sn": self.sn},
-                timeout=ClientTimeout(total=10)
-            ) as response:
-                if response.status != 200:
-                    _LOGGER.debug("Track info request failed with status %d", response.status)
-                    return None
-                    
-                response_text = await response.text()
-                data = json.loads(response_text)
-                if data.get("status") != 0:
-                    _LOGGER.debug("API returned non-zero status: %d", data.get("status"))
-                    return None
-                return data
-                
-        except (aiohttp.ClientError, asyncio.TimeoutError, json.JSONDecodeError) as err:
-            _LOGGER.debug("Error posting track info: %s", err)
-            return None
-
-    def getDataBat(self, id_field: str) -> Any:
-        """Get battery data."""
-        if not isinstance(self.dataBat, dict):
-            return None
-        try:
-            data = self.dataBat.get("data", {})
-
-            # Primary battery compartment fields
-            compartment_a = data.get("batteries", {}).get("compartmentA", {})
-            if isinstance(compartment_a, dict) and id_field in compartment_a:
-                return compartment_a.get(id_field)
-
-            # Top-level battery fields (e.g., isCharging/centreCtrlBattery/estimatedMileage)
-            if isinstance(data, dict):
-                return data.get(id_field)
-            return None
-        except (KeyError, TypeError):
-            return None
-
-    def getDataMoto(self, id_field: str) -> Any:
-        """Get motor data."""
-        if not isinstance(self.dataMoto, dict):
-            return None
-        try:
-            return self.dataMoto.get("data", {}).get(id_field)
-        except (KeyError, TypeError):
-            return None
-
-    def getDataDist(self, id_field: str) -> Any:
-        """Get distance data."""
-        if not isinstance(self.dataMoto, dict):
-            return None
-        try:
-            return self.dataMoto.get("data", {}).get("lastTrack", {}).get(id_field)
-        except (KeyError, TypeError):
-            return None
-
-    def getDataPos(self, id_field: str) -> Any:
-        """Get position data."""
-        if not isinstance(self.dataMoto, dict):
-            return None
-        try:
-            return self.dataMoto.get("data", {}).get("postion", {}).get(id_field)
-        except (KeyError, TypeError):
-            return None
-
-    def getDataOverall(self, id_field: str) -> Any:
-        """Get overall data."""
-        if not isinstance(self.dataMotoInfo, dict):
-            return None
-        try:
-            return self.dataMotoInfo.get("data", {}).get(id_field)
-        except (KeyError, TypeError):
-            return None
-
-    def getDataTrack(self, id_field: str) -> Any:
-        """Get track data."""
-        if not isinstance(self.dataTrackInfo, dict):
-            return None
-        try:
-            if id_field == "startTime" or id_field == "endTime":
-                timestamp = self.dataTrackInfo.get("data", [{}])[0].get(id_field, 0)
-                if timestamp:
-                    return datetime.fromtimestamp(timestamp / 1000).strftime("%Y-%m-%d %H:%M:%S")
-                return None
-            if id_field == "ridingtime":
-                seconds = self.dataTrackInfo.get("data", [{}])[0].get(id_field, 0)
-                if seconds:
-                    return strftime("%H:%M:%S", gmtime(seconds))
-                return None
-            if id_field == "track_thumb":
-                thumburl = self.dataTrackInfo.get("data", [{}])[0].get(id_field, "")
-                if thumburl:
-                    thumburl = thumburl.replace("app-api.niucache.com", "app-api.niu.com")
-                    return thumburl.replace("/track/thumb/", "/track/overseas/thumb/")
-                return None
-            return self.dataTrackInfo.get("data", [{}])[0].get(id_field)
-        except (KeyError, TypeError, IndexError):
+        return await self._async_single_flight(
+            ("POST", path, index, pagesize),
+            lambda: self.account.async_request(
+                "POST",
+                path,
+                "Track info",
+                headers=headers,
+                json={"index": str(index), "pagesize": pagesize, "sn": self.sn},
+            ),
+        )
+
+    async def async_get_track_page(self, index: int, pagesize: int) -> Optional[Dict[str, Any]]:
+        """Fetch one page of the track list."""
+        return await self.async_post_info_track(TRACK_LIST_API_URI, index, pagesize)
+
+    async def async_get_track_detail(self, track_id: str, date: str) -> Optional[Dict[str, Any]]:
+        """Fetch the GPS points of one ride."""
+        if not self.sn:
+            _LOGGER.debug("No SN available")
             return None
 
-    async def async_update_bat(self) -> None:
+        headers = {
+            "Accept-Language": "en-US",
+            "User-Agent": "manager/1.0.0 (identifier);clientIdentifier=identifier",
+        }
+        return await self._async_single_flight(
+            ("POST", TRACK_DETAIL_API_URI, track_id, date),
+            lambda: self.account.async_request(
+                "POST",
+                TRACK_DETAIL_API_URI,
+                "Track detail",
+                headers=headers,
+                json={"trackId": track_id, "date": date, "sn": self.sn},
+            ),
+        )
+
+    async def async_update_bat(self) -> bool:
         """Update battery information asynchronously."""
-        self.dataBat = await self.async_get_info(MOTOR_BATTERY_API_URI)
+        return self._store("dataBat", await self.async_get_info(MOTOR_BATTERY_API_URI))
 
-    async def async_update_moto(self) -> None:
+    async def async_update_moto(self) -> bool:
         """Update motor information asynchronously."""
-        self.dataMoto = await self.async_get_info(MOTOR_INDEX_API_URI)
+        return self._store("dataMoto", await self.async_get_info(MOTOR_INDEX_API_URI))
 
-    async def async_update_moto_info(self) -> None:
+    async def async_update_moto_info(self) -> bool:
         """Update motor overall information asynchronously."""
-        self.dataMotoInfo = await self.async_post_info(MOTOINFO_ALL_API_URI)
+        return self._store("dataMotoInfo", await self.async_post_info(MOTOINFO_ALL_API_URI))
 
-    async def async_update_track_info(self) -> None:
+    async def async_update_track_info(self) -> bool:
         """Update track information asynchronously."""
-        self.dataTrackInfo = await self.async_post_info_track(TRACK_LIST_API_URI)
\ No newline at end of file
+        return self._store("dataTrackInfo", await self.async_post_info_track(TRACK_LIST_API_URI))
+
+    async def async_update_vehicles(self) -> bool:
+        """Refresh the scooter metadata (name, SKU, ...) from the vehicles list."""
+        if not self._store("dataVehiclesInfo", await self.account.async_get_vehicles_info(force=True)):
+            return False
+        for vehicle in self.dataVehiclesInfo.get("data", {}).get("items", []):
+            if isinstance(vehicle, dict) and vehicle.get("sn_id") == self.sn:
+                self._apply_vehicle(vehicle)
+                break
+        return True
+
+    def _store(self, attr: str, payload: Optional[Dict[str, Any]]) -> bool:
+        """Keep a fresh payload; a failed fetch leaves the cached one in place."""
+        if payload is None:
+            return False
+        setattr(self, attr, payload)
+        return True
@@ -0,0 +1,119 @@
+"""Persistent OAuth token cache for the NIU cloud."""
+from __future__ import annotations
+
+import asyncio
+from dataclasses import asdict, dataclass
+import time
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+
+from .const import DOMAIN, TOKEN_REFRESH_MARGIN
+
+TOKEN_STORAGE_KEY = f"{DOMAIN}.tokens"
+TOKEN_STORAGE_VERSION = 1
+DATA_TOKEN_STORE = f"{DOMAIN}_token_store"
+
+# Expiry fields above this value are absolute epoch seconds, below it they are
+# lifetimes relative to the login time.
+_EPOCH_THRESHOLD = 1_000_000_000
+
+
+def _parse_expiry(value: Any, now: float) -> float | None:
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return None
+    if value <= 0:
+        return None
+    if value > _EPOCH_THRESHOLD:
+        return value
+    return now + value
+
+
+@dataclass
+class NiuToken:
+    """Access/refresh token pair with their expiry times (epoch seconds)."""
+
+    access_token: str
+    expires_at: float | None = None
+    refresh_token: str | None = None
+    refresh_expires_at: float | None = None
+
+    @classmethod
+    def from_response(cls, token_data: dict[str, Any], now: float | None = None) -> NiuToken | None:
+        """Build a token from the `data.token` object of a login response."""
+        if not isinstance(token_data, dict) or not token_data.get("access_token"):
+            return None
+        now = time.time() if now is None else now
+        return cls(
+            access_token=token_data["access_token"],
+            expires_at=_parse_expiry(token_data.get("token_expires_in"), now),
+            refresh_token=token_data.get("refresh_token") or None,
+            refresh_expires_at=_parse_expiry(token_data.get("refresh_token_expires_in"), now),
+        )
+
+    def is_fresh(self, now: float | None = None) -> bool:
+        """Return True if the access token can be used without refreshing."""
+        if self.expires_at is None:
+            # Unknown lifetime: keep using it until the API rejects it.
+            return True
+        now = time.time() if now is None else now
+        return self.expires_at - TOKEN_REFRESH_MARGIN > now
+
+    def can_refresh(self, now: float | None = None) -> bool:
+        """Return True if the refresh token is still usable."""
+        if not self.refresh_token:
+            return False
+        if self.refresh_expires_at is None:
+            return True
+        now = time.time() if now is None else now
+        return self.refresh_expires_at > now
+
+
+class NiuTokenStore:
+    """Tokens of all NIU accounts, persisted in Home Assistant storage."""
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        self._store: Store[dict[str, dict[str, Any]]] = Store(
+            hass, TOKEN_STORAGE_VERSION, TOKEN_STORAGE_KEY, private=True
+        )
+        self._tokens: dict[str, dict[str, Any]] | None = None
+        self._lock = asyncio.Lock()
+
+    async def _async_ensure_loaded(self) -> dict[str, dict[str, Any]]:
+        if self._tokens is None:
+            self._tokens = await self._store.async_load() or {}
+        return self._tokens
+
+    async def async_get(self, username: str) -> NiuToken | None:
+        """Return the cached token for an account, if any."""
+        async with self._lock:
+            tokens = await self._async_ensure_loaded()
+        stored = tokens.get(username.lower())
+        if not stored:
+            return None
+        try:
+            return NiuToken(**stored)
+        except TypeError:
+            return None
+
+    async def async_set(self, username: str, token: NiuToken | None) -> None:
+        """Store (or forget, with None) the token for an account."""
+        async with self._lock:
+            tokens = await self._async_ensure_loaded()
+            if token is None:
+                if tokens.pop(username.lower(), None) is None:
+                    return
+            else:
+                tokens[username.lower()] = asdict(token)
+            await self._store.async_save(tokens)
+
+
+def async_get_token_store(hass: HomeAssistant) -> NiuTokenStore:
+    """Return the token store shared by every NIU client."""
+    store = hass.data.get(DATA_TOKEN_STORE)
+    if store is None:
+        store = hass.data[DATA_TOKEN_STORE] = NiuTokenStore(hass)
+    return store
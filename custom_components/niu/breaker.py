@@ -0,0 +1,110 @@
+"""Circuit breakers and retry backoff for the NIU API paths.
+
+A breaker counts the failed requests of one API path in a row. Once it
+trips, the path is not requested for a while (open). After that a single
+request probes it (half-open): success closes the breaker, failure opens it
+again for twice as long, and a probe that was cancelled or could not be
+sent (no token) lets the next request probe instead. The coordinator skips the endpoints whose breaker
+is open, so a cloud incident costs a probe per path instead of a request
+(and its retries) per poll.
+"""
+from __future__ import annotations
+
+import random
+import time
+from typing import Any
+
+from .const import (
+    BREAKER_FAILURE_THRESHOLD,
+    BREAKER_MAX_RESET_TIMEOUT,
+    BREAKER_RESET_TIMEOUT,
+    RETRY_BACKOFF_BASE,
+    RETRY_BACKOFF_MAX,
+)
+
+STATE_CLOSED = "closed"
+STATE_OPEN = "open"
+STATE_HALF_OPEN = "half_open"
+
+
+def backoff_delay(attempt: int) -> float:
+    """Return the wait before retry `attempt` (0-based): full jitter over
+    an exponentially growing, capped window."""
+    return random.uniform(0, min(RETRY_BACKOFF_MAX, RETRY_BACKOFF_BASE * 2**attempt))
+
+
+class CircuitBreaker:
+    """Closed / open / half-open breaker of one API path."""
+
+    def __init__(
+        self,
+        failure_threshold: int = BREAKER_FAILURE_THRESHOLD,
+        reset_timeout: float = BREAKER_RESET_TIMEOUT,
+        max_reset_timeout: float = BREAKER_MAX_RESET_TIMEOUT,
+    ) -> None:
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.max_reset_timeout = max_reset_timeout
+        self.state = STATE_CLOSED
+        self.failures = 0
+        # Monotonic time the breaker may be probed again, while open
+        self.retry_at = 0.0
+        self._timeout = reset_timeout
+        self.trips = 0
+        self.rejected = 0
+
+    def available(self, now: float | None = None) -> bool:
+        """Return True if a request may be sent now, without claiming it."""
+        if self.state == STATE_CLOSED:
+            return True
+        if self.state == STATE_OPEN:
+            return (time.monotonic() if now is None else now) >= self.retry_at
+        return False
+
+    def allow(self, now: float | None = None) -> bool:
+        """Return True if a request may be sent; an expired open breaker
+        lets exactly one probe through."""
+        if not self.available(now):
+            self.rejected += 1
+            return False
+        if self.state == STATE_OPEN:
+            self.state = STATE_HALF_OPEN
+        return True
+
+    @property
+    def probing(self) -> bool:
+        return self.state == STATE_HALF_OPEN
+
+    def record_success(self) -> None:
+        self.state = STATE_CLOSED
+        self.failures = 0
+        self._timeout = self.reset_timeout
+
+    def release(self) -> None:
+        """End a request that tells nothing about the path. A probe hands
+        over to the next request; a closed breaker is left as it is."""
+        if self.state == STATE_HALF_OPEN:
+            self.state = STATE_OPEN
+
+    def record_failure(self, now: float | None = None, retry_after: float | None = None) -> None:
+        """Count a failed request; trip the breaker at the threshold, after
+        a failed probe, or when the server asked to back off."""
+        now = time.monotonic() if now is None else now
+        self.failures += 1
+        if self.state == STATE_HALF_OPEN:
+            self._timeout = min(self._timeout * 2, self.max_reset_timeout)
+        elif self.failures < self.failure_threshold and retry_after is None:
+            return
+        self.state = STATE_OPEN
+        self.trips += 1
+        self.retry_at = now + max(self._timeout, retry_after or 0)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the breaker state for the diagnostics."""
+        return {
+            "state": self.state,
+            "failures": self.failures,
+            "retry_in": max(0.0, round(self.retry_at - time.monotonic(), 1)) if self.state == STATE_OPEN else 0,
+            "trips": self.trips,
+            "rejected": self.rejected,
+        }
@@ -1,132 +0,0 @@
-"""Last Track for Niu Integration integration.
-    Author: Giovanni P. (@pikka97)
-"""
-import logging
-from typing import final
-
-import httpx
-
-from homeassistant.components.camera import CameraState
-from homeassistant.components.generic.camera import GenericCamera
-from homeassistant.helpers.httpx_client import get_async_client
-
-from .api import NiuApi
-from .const import *
-
-_LOGGER = logging.getLogger(__name__)
-GET_IMAGE_TIMEOUT = 10
-
-
-async def async_setup_entry(hass, entry, async_add_entities) -> None:
-    niu_auth = entry.data.get(CONF_AUTH, None)
-    if niu_auth == None:
-        _LOGGER.error(
-            "The authenticator of your Niu integration is None.. can not setup the integration..."
-        )
-        return False
-
-    # Get coordinator and api from hass.data
-    coordinator_data = hass.data[DOMAIN][entry.entry_id]
-    coordinator = coordinator_data["coordinator"]
-    api = coordinator_data["api"]
-    
-    _LOGGER.debug("Setting up camera: sn=%s, sensor_prefix=%s", api.sn, api.sensor_prefix)
-
-    # Validate SN before creating entities
-    if not api.sn or api.sn.lower() == "none":
-        _LOGGER.error("Cannot create camera entity: SN not available or invalid (sn=%s)", api.sn)
-        return False
-
-    camera_name = api.sensor_prefix + " Last Track Camera"
-
-    device_config = {
-        "name": camera_name,
-        "still_image_url": "",
-        "stream_source": None,
-        "authentication": "basic",
-        "username": None,
-        "password": None,
-        "limit_refetch_to_url_change": False,
-        "content_type": "image/jpeg",
-        "framerate": 2,
-        "verify_ssl": False,
-    }
-    async_add_entities([LastTrackCamera(hass, api, coordinator, device_config, camera_name, camera_name)])
-
-
-class LastTrackCamera(GenericCamera):
-    _attr_has_entity_name = True
-    _attr_translation_key = "last_track_camera"
-    
-    def __init__(self, hass, api, coordinator, device_info, identifier: str, title: str) -> None:
-        if not api.sn or api.sn.lower() == "none":
-            raise ValueError(f"Cannot create camera entity: SN not available or invalid (sn={api.sn})")
-        self._api = api
-        self._coordinator = coordinator
-        self._sn = api.sn
-        _LOGGER.debug("Creating camera: unique_id=camera.niu_%s_last_track", self._sn)
-        super().__init__(hass, device_info, identifier, title)
-
-    @property
-    @final
-    def state(self) -> str:
-        """Return the camera state."""
-        return CameraState.IDLE
-
-    @property
-    def is_on(self) -> bool:
-        """Return true if on."""
-        return self._last_image != b""
-
-    @property
-    def unique_id(self):
-        return f"camera.niu_{self._sn}_last_track"
-
-    @property
-    def device_info(self):
-        # Use sensor_prefix (scooter name) if available, otherwise use SN
-        device_name = self._api.sensor_prefix if self._api.sensor_prefix else f"Niu Scooter {self._sn}"
-        # Use SN as primary identifier, fallback to device_name
-        identifier = self._sn if self._sn and self._sn.lower() != "none" else device_name
-        dev = {
-            "identifiers": {("niu", identifier)},
-            "name": device_name,
-            "manufacturer": "Niu",
-            "model": self._api.sku_name or self._api.product_type or "Niu Scooter",
-            "hw_version": self._api.product_type,
-            "serial_number": self._api.carframe_id,
-        }
-        return dev
-
-    async def async_camera_image(
-        self, width: int | None = None, height: int | None = None
-    ) -> bytes | None:
-        if self._coordinator.data is None:
-            return self._last_image
-
-        last_track_url = self._coordinator.data.get(SENSOR_TYPE_TRACK, {}).get("track_thumb")
-        if not last_track_url:
-            _LOGGER.debug("No track_thumb URL available")
-            return self._last_image
-
-        if last_track_url == self._last_url and self._previous_image != b"":
-            # The path image is the same as before so the image is the same:
-            return self._previous_image
-
-        try:
-            async_client = get_async_client(self.hass, verify_ssl=self.verify_ssl)
-            response = await async_client.get(
-                last_track_url, auth=self._auth, timeout=GET_IMAGE_TIMEOUT
-            )
-            response.raise_for_status()
-            self._last_image = response.content
-        except httpx.TimeoutException:
-            _LOGGER.error("Timeout getting camera image from %s", self._name)
-            return self._last_image
-        except (httpx.RequestError, httpx.HTTPStatusError) as err:
-            _LOGGER.error("Error getting new camera image from %s: %s", self._name, err)
-            return self._last_image
-
-        self._last_url = last_track_url
-        self._previous_image = self._last_image
-        return self._last_image
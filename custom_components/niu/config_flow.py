@@ -9,11 +9,12 @@ from typing import Any
 import voluptuous as vol
 
 from homeassistant import config_entries
+from homeassistant.core import callback
 from homeassistant.data_entry_flow import FlowResult
 from homeassistant.exceptions import HomeAssistantError
 from homeassistant.helpers import selector
 
-from .api import NiuApi
+from .account import async_acquire_account, async_release_account
 from .const import *
 
 _LOGGER = logging.getLogger(__name__)
@@ -40,20 +41,47 @@ STEP_SENSORS_DATA_SCHEMA = vol.Schema(
 )
 
 
+STEP_USER_ADVANCED_SCHEMA = STEP_USER_DATA_SCHEMA.extend(
+    {
+        vol.Required(CONF_ACCOUNT_URL, default=ACCOUNT_BASE_URL): str,
+        vol.Required(CONF_API_URL, default=API_BASE_URL): str,
+    }
+)
+
+
 class NiuAuthenticator:
-    def __init__(self, username, password, scooter_id, sensors_selected) -> None:
+    def __init__(
+        self,
+        username,
+        password,
+        scooter_id,
+        sensors_selected,
+        account_url=ACCOUNT_BASE_URL,
+        api_url=API_BASE_URL,
+    ) -> None:
         self.username = username
         self.password = password
         self.scooter_id = scooter_id
         self.sensors_selected = sensors_selected
+        self.account_url = account_url
+        self.api_url = api_url
 
     async def authenticate(self, hass):
-        api = NiuApi(hass, self.username, self.password, self.scooter_id)
+        # The shared account session outlives the flow briefly, so the entry
+        # set up right after reuses this login. A wrong password leaves the
+        # session of running entries alone.
+        account = async_acquire_account(
+            hass, self.username, self.password, self.account_url, self.api_url
+        )
+        token = None
         try:
-            token = await api.async_get_token()
+            token = await account.async_login(self.password)
             return token is not None
         except Exception:
             return None
+        finally:
+            # A session this flow created with a wrong password is not kept
+            async_release_account(hass, account, linger=token is not None)
 
 
 class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
@@ -61,6 +89,14 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
 
     VERSION = 1
 
+    @staticmethod
+    @callback
+    def async_get_options_flow(
+        config_entry: config_entries.ConfigEntry,
+    ) -> config_entries.OptionsFlow:
+        """Create the options flow."""
+        return OptionsFlowHandler()
+
     async def async_step_user(
         self, user_input: dict[str, Any] | None = None
     ) -> FlowResult:
@@ -74,24 +110,33 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             username = user_input[CONF_USERNAME]
             password = user_input[CONF_PASSWORD]
             scooter_id = user_input[CONF_SCOOTER_ID]
+            account_url = user_input.get(CONF_ACCOUNT_URL, ACCOUNT_BASE_URL)
+            api_url = user_input.get(CONF_API_URL, API_BASE_URL)
 
             # Validate credentials first; sensor selection comes next step
-            niu_auth = NiuAuthenticator(username, password, scooter_id, [])
+            niu_auth = NiuAuthenticator(
+                username, password, scooter_id, [], account_url, api_url
+            )
             auth_result = await niu_auth.authenticate(self.hass)
             if auth_result:
                 self._credentials = {
                     CONF_USERNAME: username,
                     CONF_PASSWORD: password,
                     CONF_SCOOTER_ID: scooter_id,
+                    CONF_ACCOUNT_URL: account_url,
+                    CONF_API_URL: api_url,
                 }
                 return await self.async_step_sensors()
             
             # The user used wrong credentials...
             errors["base"] = "invalid_auth"
 
-        return self.async_show_form(
-            step_id="user", data_schema=STEP_USER_DATA_SCHEMA, errors=errors
+        schema = (
+            STEP_USER_ADVANCED_SCHEMA
+            if self.show_advanced_options
+            else STEP_USER_DATA_SCHEMA
         )
+        return self.async_show_form(step_id="user", data_schema=schema, errors=errors)
 
 
     async def async_step_sensors(
@@ -114,6 +159,8 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                     self._credentials[CONF_PASSWORD],
                     self._credentials[CONF_SCOOTER_ID],
                     sensors_selected,
+                    self._credentials[CONF_ACCOUNT_URL],
+                    self._credentials[CONF_API_URL],
                 )
                 return self.async_create_entry(
                     title=integration_title, data={CONF_AUTH: niu_auth.__dict__}
@@ -122,3 +169,61 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         return self.async_show_form(
             step_id="sensors", data_schema=STEP_SENSORS_DATA_SCHEMA, errors=errors
         )
+
+
+class OptionsFlowHandler(config_entries.OptionsFlow):
+    """Handle the polling options of a Niu entry."""
+
+    async def async_step_init(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Manage the adaptive polling range and the per-endpoint TTLs."""
+        errors: dict[str, str] = {}
+
+        if user_input is not None:
+            if user_input[CONF_POLL_MIN_INTERVAL] > user_input[CONF_POLL_MAX_INTERVAL]:
+                errors["base"] = "invalid_poll_range"
+            else:
+                return self.async_create_entry(
+                    title="", data={**self.config_entry.options, **user_input}
+                )
+
+        options = self.config_entry.options
+        schema = vol.Schema(
+            {
+                vol.Required(
+                    CONF_POLL_MIN_INTERVAL,
+                    default=options.get(CONF_POLL_MIN_INTERVAL, DEFAULT_POLL_MIN_INTERVAL),
+                ): vol.All(vol.Coerce(int), vol.Range(min=10, max=3600)),
+                vol.Required(
+                    CONF_POLL_MAX_INTERVAL,
+                    default=options.get(CONF_POLL_MAX_INTERVAL, DEFAULT_POLL_MAX_INTERVAL),
+                ): vol.All(vol.Coerce(int), vol.Range(min=10, max=86400)),
+                **{
+                    vol.Required(
+                        CONF_TTL_PREFIX + endpoint,
+                        default=options.get(CONF_TTL_PREFIX + endpoint, default),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=0, max=7 * 86400))
+                    for endpoint, default in DEFAULT_ENDPOINT_TTLS.items()
+                },
+                vol.Required(
+                    CONF_RESPONSE_LOG,
+                    default=options.get(CONF_RESPONSE_LOG, DEFAULT_RESPONSE_LOG),
+                ): selector.SelectSelector(
+                    selector.SelectSelectorConfig(
+                        options=RESPONSE_LOG_MODES,
+                        translation_key=CONF_RESPONSE_LOG,
+                    ),
+                ),
+                vol.Required(
+                    CONF_TRACK_IMAGE,
+                    default=options.get(CONF_TRACK_IMAGE, DEFAULT_TRACK_IMAGE),
+                ): selector.SelectSelector(
+                    selector.SelectSelectorConfig(
+                        options=TRACK_IMAGE_MODES,
+                        translation_key=CONF_TRACK_IMAGE,
+                    ),
+                ),
+            }
+        )
+        return self.async_show_form(step_id="init", data_schema=schema, errors=errors)
@@ -6,6 +6,7 @@ MOTOR_INDEX_API_URI = "/v5/scooter/motor_data/index_info"
 MOTOINFO_LIST_API_URI = "/v5/scooter/list"
 MOTOINFO_ALL_API_URI = "/motoinfo/overallTally"
 TRACK_LIST_API_URI = "/v5/track/list/v2"
+TRACK_DETAIL_API_URI = "/v5/track/detail"
 # FIRMWARE_BAS_URL = '/motorota/getfirmwareversion'
 
 DOMAIN = "niu"
@@ -14,9 +15,169 @@ CONF_PASSWORD = "password"
 CONF_SCOOTER_ID = "scooter_id"
 CONF_AUTH = "conf_auth"
 CONF_SENSORS = "sensors_selected"
+# Advanced: other servers than the NIU cloud, e.g. tools/niu_emulator.py
+CONF_ACCOUNT_URL = "account_url"
+CONF_API_URL = "api_url"
+
+# hass.data[DOMAIN] key holding the per-username NiuAccount sessions
+DATA_ACCOUNTS = "accounts"
+# hass.data[DOMAIN] key holding the shared RideHistory
+DATA_HISTORY = "history"
+# hass.data[DOMAIN] key holding the domain-wide request budget
+DATA_LIMITER = "limiter"
 
 DEFAULT_SCOOTER_ID = 0
 
+# Update cycle: endpoints are fetched as one concurrent batch bounded by
+# UPDATE_MAX_PARALLEL requests in flight and a single overall deadline, which
+# the retries of every request have to fit in as well.
+UPDATE_MAX_PARALLEL = 4
+UPDATE_TIMEOUT = 15
+
+# Authentication: cached tokens are refreshed this many seconds before they
+# expire. HTTP 401/403 and these API status codes (token missing, invalid or
+# expired) trigger a single re-login and retry of the request.
+TOKEN_REFRESH_MARGIN = 300
+AUTH_ERROR_STATUSES = {1131, 1132, 1133}
+NIU_APP_ID = "niu_ktdrr960"
+
+# Transient failures (timeouts, connection errors, HTTP 429 and 5xx) are
+# retried up to REQUEST_MAX_ATTEMPTS times with exponential backoff and full
+# jitter. After BREAKER_FAILURE_THRESHOLD failed requests in a row an API path
+# is skipped for BREAKER_RESET_TIMEOUT seconds, then probed with a single
+# request; every failed probe doubles the wait up to BREAKER_MAX_RESET_TIMEOUT.
+REQUEST_MAX_ATTEMPTS = 3
+RETRY_BACKOFF_BASE = 0.5
+RETRY_BACKOFF_MAX = 4
+BREAKER_FAILURE_THRESHOLD = 3
+BREAKER_RESET_TIMEOUT = 60
+BREAKER_MAX_RESET_TIMEOUT = 900
+
+# Request budget shared by every account: a token bucket of
+# REQUEST_BUDGET_RATE requests per second with bursts of REQUEST_BUDGET_BURST.
+# Queued requests are served by priority, lowest value first.
+REQUEST_BUDGET_RATE = 4
+REQUEST_BUDGET_BURST = 20
+PRIORITY_AUTH = 0
+PRIORITY_POSITION = 1
+PRIORITY_BATTERY = 2
+PRIORITY_LOW = 3
+
+# Endpoints refreshed by the coordinator. Each has its own time-to-live
+# (seconds, option "ttl_<endpoint>"); 0 means every poll. The track list is
+# refetched when the motor index reports a new lastTrack; its TTL only bounds
+# how stale it can get when that marker is unavailable.
+ENDPOINT_BATTERY = "battery_info"
+ENDPOINT_MOTOR_INDEX = "motor_index_info"
+ENDPOINT_OVERALL_TALLY = "overall_tally"
+ENDPOINT_TRACK_LIST = "track_list"
+ENDPOINT_VEHICLES = "vehicles_info"
+DEFAULT_ENDPOINT_TTLS = {
+    ENDPOINT_BATTERY: 0,
+    ENDPOINT_MOTOR_INDEX: 0,
+    ENDPOINT_OVERALL_TALLY: 3600,
+    ENDPOINT_TRACK_LIST: 21600,
+    ENDPOINT_VEHICLES: 86400,
+}
+CONF_TTL_PREFIX = "ttl_"
+# API path of each endpoint, the key of its circuit breaker
+ENDPOINT_URIS = {
+    ENDPOINT_BATTERY: MOTOR_BATTERY_API_URI,
+    ENDPOINT_MOTOR_INDEX: MOTOR_INDEX_API_URI,
+    ENDPOINT_OVERALL_TALLY: MOTOINFO_ALL_API_URI,
+    ENDPOINT_TRACK_LIST: TRACK_LIST_API_URI,
+    ENDPOINT_VEHICLES: MOTOINFO_LIST_API_URI,
+}
+# A vehicles list refreshed by one scooter is reused by the others of the
+# account for this long.
+VEHICLES_SHARED_MAX_AGE = 300
+# An account nobody uses any more (after the config flow, or while an entry
+# reloads) keeps its token, vehicles list and connections this long.
+ACCOUNT_LINGER = 60
+
+# HTTP client of an account: idle connections outlive the polling interval
+# so a poll reuses the TLS connection of the previous one.
+HTTP_KEEPALIVE_TIMEOUT = 180
+HTTP_DNS_CACHE_TTL = 600
+HTTP_CONNECTIONS_PER_HOST = 6
+HTTP_REQUEST_TIMEOUT = 10
+
+# Raw response logging: off, the latest snapshot in niu_last_response.json,
+# or a compressed journal of changes in niu_journal/<sn>.ndjson.gz
+CONF_RESPONSE_LOG = "response_log"
+RESPONSE_LOG_OFF = "off"
+RESPONSE_LOG_LAST = "last"
+RESPONSE_LOG_JOURNAL = "journal"
+RESPONSE_LOG_MODES = [RESPONSE_LOG_OFF, RESPONSE_LOG_LAST, RESPONSE_LOG_JOURNAL]
+DEFAULT_RESPONSE_LOG = RESPONSE_LOG_LAST
+JOURNAL_MAX_BYTES = 1024 * 1024
+JOURNAL_BACKUPS = 3
+
+# Adaptive polling (seconds). The floor and ceiling are options of the entry.
+CONF_POLL_MIN_INTERVAL = "poll_min_interval"
+CONF_POLL_MAX_INTERVAL = "poll_max_interval"
+DEFAULT_POLL_MIN_INTERVAL = 15
+DEFAULT_POLL_MAX_INTERVAL = 900
+DEFAULT_POLL_INTERVAL = 60
+POLL_CHARGING_INTERVAL = 60
+# Each scooter polls in a slot of the interval derived from its SN, moved by
+# up to POLL_JITTER_FRACTION of the interval (at most POLL_JITTER_MAX
+# seconds). While Home Assistant starts, the first polls are spread over
+# POLL_STARTUP_SPREAD seconds the same way.
+POLL_JITTER_FRACTION = 0.05
+POLL_JITTER_MAX = 3
+POLL_STARTUP_SPREAD = 8
+# Movement between two polls above this many degrees counts as riding.
+POLL_POSITION_EPSILON = 0.0002
+# index_info lockStatus value of a locked scooter (the is_locked sensor
+# translations: 0 unlocked, 1 locked)
+LOCK_STATUS_LOCKED = 1
+
+# Ride history (SQLite in the config directory). A sync pages through the
+# track list, newest first, until it reaches a stored ride: small pages once
+# the history has rides, larger ones to seed an empty history.
+HISTORY_DB_FILE = "niu_rides.db"
+HISTORY_SYNC_PAGE_SIZE = 3
+HISTORY_INITIAL_PAGE_SIZE = 20
+HISTORY_SYNC_MAX_PAGES = 5
+SERVICE_GET_RIDES = "get_rides"
+SERVICE_REFRESH = "refresh"
+
+# Full backfill of the track list into the ride history and the recorder's
+# long-term statistics: pages per request, pages in flight, and statistic
+# rows per import job.
+BACKFILL_PAGE_SIZE = 50
+BACKFILL_MAX_PARALLEL = 4
+STATISTICS_BATCH_SIZE = 5000
+SERVICE_BACKFILL_STATISTICS = "backfill_statistics"
+
+# Last track image: the remote thumbnail, or rendered locally (Pillow) from
+# the track points. Rendered images are PNG, TRACK_RENDER_WIDTH x
+# TRACK_RENDER_HEIGHT unless the frontend asks for a size; the points and
+# images of the last TRACK_RENDER_CACHE_SIZE rides/sizes are kept. A ride
+# whose points could not be fetched shows the thumbnail and is not asked for
+# again for TRACK_RENDER_RETRY seconds.
+CONF_TRACK_IMAGE = "track_image"
+TRACK_IMAGE_THUMBNAIL = "thumbnail"
+TRACK_IMAGE_RENDER = "render"
+TRACK_IMAGE_MODES = [TRACK_IMAGE_THUMBNAIL, TRACK_IMAGE_RENDER]
+DEFAULT_TRACK_IMAGE = TRACK_IMAGE_THUMBNAIL
+TRACK_RENDER_WIDTH = 640
+TRACK_RENDER_HEIGHT = 480
+TRACK_RENDER_MAX_SIZE = 2048
+TRACK_RENDER_CACHE_SIZE = 8
+TRACK_RENDER_RETRY = 300
+# Speed drawn in the fastest color
+TRACK_SPEED_SCALE_KMH = 45
+
+# Remote thumbnails are cached on disk in niu_thumbnails/<sn>/ up to this size
+THUMBNAIL_CACHE_DIR = "niu_thumbnails"
+THUMBNAIL_CACHE_MAX_BYTES = 20 * 1024 * 1024
+# Browser cache lifetime of a last track image (its URL changes with the track)
+TRACK_IMAGE_MAX_AGE = 7 * 86400
+# Resized/transcoded variants (?width=&height=&format=) kept in memory
+VARIANT_CACHE_MAX_BYTES = 8 * 1024 * 1024
+
 SENSOR_TYPE_BAT = "BAT"
 SENSOR_TYPE_MOTO = "MOTO"
 SENSOR_TYPE_DIST = "DIST"
@@ -24,6 +185,19 @@ SENSOR_TYPE_OVERALL = "TOTAL"
 SENSOR_TYPE_POS = "POSITION"
 # SENSOR_TYPE_SYSTEM = 'SYSTEM'
 SENSOR_TYPE_TRACK = "TRACK"
+# Aggregates of the local ride history
+SENSOR_TYPE_HISTORY = "HISTORY"
+
+# Endpoint each sensor group is parsed from
+GROUP_ENDPOINTS = {
+    SENSOR_TYPE_BAT: ENDPOINT_BATTERY,
+    SENSOR_TYPE_MOTO: ENDPOINT_MOTOR_INDEX,
+    SENSOR_TYPE_POS: ENDPOINT_MOTOR_INDEX,
+    SENSOR_TYPE_DIST: ENDPOINT_MOTOR_INDEX,
+    SENSOR_TYPE_OVERALL: ENDPOINT_OVERALL_TALLY,
+    SENSOR_TYPE_TRACK: ENDPOINT_TRACK_LIST,
+    SENSOR_TYPE_HISTORY: ENDPOINT_TRACK_LIST,
+}
 
 AVAILABLE_SENSORS = [
     "BatteryCharge",
@@ -52,6 +226,10 @@ AVAILABLE_SENSORS = [
     "LastTrackAverageSpeed",
     "LastTrackRidingtime",
     "LastTrackThumb",
+    "DistanceToday",
+    "DistanceThisWeek",
+    "DistanceThisMonth",
+    "RidesToday",
 ]
 
 
@@ -100,6 +278,10 @@ PLATFORM_SCHEMA = PLATFORM_SCHEMA.extend(
                         "LastTrackAverageSpeed",
                         "LastTrackRidingtime",
                         "LastTrackThumb",
+                        "DistanceToday",
+                        "DistanceThisWeek",
+                        "DistanceThisMonth",
+                        "RidesToday",
                     ]
                 )
             ],
@@ -288,4 +470,36 @@ SENSOR_TYPES = {
         "none",
         "mdi:map",
     ],
+    "DistanceToday": [
+        "distance_today",
+        "km",
+        "distance_today",
+        SENSOR_TYPE_HISTORY,
+        "distance",
+        "mdi:map-marker-distance",
+    ],
+    "DistanceThisWeek": [
+        "distance_this_week",
+        "km",
+        "distance_week",
+        SENSOR_TYPE_HISTORY,
+        "distance",
+        "mdi:map-marker-distance",
+    ],
+    "DistanceThisMonth": [
+        "distance_this_month",
+        "km",
+        "distance_month",
+        SENSOR_TYPE_HISTORY,
+        "distance",
+        "mdi:map-marker-distance",
+    ],
+    "RidesToday": [
+        "rides_today",
+        "",
+        "rides_today",
+        SENSOR_TYPE_HISTORY,
+        "none",
+        "mdi:counter",
+    ],
 }
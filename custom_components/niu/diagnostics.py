@@ -0,0 +1,39 @@
+"""Diagnostics support for Niu Scooters."""
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .const import CONF_PASSWORD, CONF_USERNAME, DOMAIN
+from .models import JSON_BACKEND
+
+TO_REDACT = {CONF_PASSWORD, CONF_USERNAME, "token", "lat", "lng"}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    coordinator = hass.data[DOMAIN][entry.entry_id]["coordinator"]
+
+    return {
+        "entry": async_redact_data(entry.as_dict(), TO_REDACT),
+        "coordinator": {
+            "update_interval": str(coordinator.update_interval),
+            "poll_state": coordinator.scheduler.state,
+            "poll_phase": round(coordinator.scheduler.phase, 3),
+            "endpoints": sorted(coordinator.plan.endpoints),
+            "fields": coordinator.plan.fields,
+            "state_writes": coordinator.state_writes,
+            "suppressed_writes": coordinator.suppressed_writes,
+            "redaction_fallbacks": coordinator.redaction_fallbacks,
+            "json_backend": JSON_BACKEND,
+            "schema_drift": coordinator.schema_drift,
+            "breakers": coordinator.breakers,
+            "request_budget": coordinator.request_budget,
+        },
+        "data": async_redact_data(coordinator.data or {}, TO_REDACT),
+    }
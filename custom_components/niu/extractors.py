@@ -0,0 +1,148 @@
+"""Declarative field extraction from the raw NIU payloads.
+
+Every sensor group lives at a fixed place in one endpoint payload. The
+tables below describe those places; NiuFieldExtractor compiles them once for
+the fields an entry needs, so a poll resolves each container a single time
+instead of re-walking the payload from its root for every field.
+"""
+from __future__ import annotations
+
+from datetime import datetime
+from time import gmtime, strftime
+from typing import Any, Callable
+
+from .const import (
+    GROUP_ENDPOINTS,
+    SENSOR_TYPE_BAT,
+    SENSOR_TYPE_DIST,
+    SENSOR_TYPE_MOTO,
+    SENSOR_TYPE_OVERALL,
+    SENSOR_TYPE_POS,
+    SENSOR_TYPE_TRACK,
+)
+
+Path = tuple[Any, ...]
+
+# Container(s) holding the fields of each group, most specific first: a field
+# present in an earlier container wins over a later one.
+GROUP_CONTAINERS: dict[str, tuple[Path, ...]] = {
+    # Per-compartment values first, then the pack-wide ones (isCharging, ...)
+    SENSOR_TYPE_BAT: (("data", "batteries", "compartmentA"), ("data",)),
+    SENSOR_TYPE_MOTO: (("data",),),
+    # (sic) the API spells it "postion"; the fixed spelling is a fallback
+    SENSOR_TYPE_POS: (("data", "postion"), ("data", "position")),
+    SENSOR_TYPE_DIST: (("data", "lastTrack"),),
+    SENSOR_TYPE_OVERALL: (("data",),),
+    # Only the latest ride is exposed
+    SENSOR_TYPE_TRACK: (("data", 0),),
+}
+
+
+def _format_ms_timestamp(value: Any) -> str | None:
+    if not value:
+        return None
+    return datetime.fromtimestamp(value / 1000).strftime("%Y-%m-%d %H:%M:%S")
+
+
+def _format_duration(value: Any) -> str | None:
+    if not value:
+        return None
+    return strftime("%H:%M:%S", gmtime(value))
+
+
+def _track_thumb_url(value: Any) -> str | None:
+    if not value:
+        return None
+    value = value.replace("app-api.niucache.com", "app-api.niu.com")
+    return value.replace("/track/thumb/", "/track/overseas/thumb/")
+
+
+FIELD_TRANSFORMS: dict[tuple[str, str], Callable[[Any], Any]] = {
+    (SENSOR_TYPE_TRACK, "startTime"): _format_ms_timestamp,
+    (SENSOR_TYPE_TRACK, "endTime"): _format_ms_timestamp,
+    (SENSOR_TYPE_TRACK, "ridingtime"): _format_duration,
+    (SENSOR_TYPE_TRACK, "track_thumb"): _track_thumb_url,
+}
+
+_TRANSFORM_ERRORS = (TypeError, ValueError, AttributeError, OverflowError, OSError)
+
+
+def _resolve(payload: Any, path: Path) -> dict[str, Any] | None:
+    """Walk `path` (dict keys / list indexes) and return the dict found there."""
+    node = payload
+    for step in path:
+        if isinstance(step, int):
+            if not isinstance(node, list) or len(node) <= step:
+                return None
+            node = node[step]
+        elif isinstance(node, dict):
+            node = node.get(step)
+        else:
+            return None
+    return node if isinstance(node, dict) else None
+
+
+def _compile_container(
+    path: Path, targets: list[tuple[str, str, Callable[[Any], Any] | None]]
+) -> Callable[[Any, dict[str, dict[str, Any]]], None]:
+    """Return a closure copying `targets` (field, group, transform) out of
+    the container at `path` into the parsed dict."""
+
+    def extract(payload: Any, out: dict[str, dict[str, Any]]) -> None:
+        container = _resolve(payload, path)
+        if container is None:
+            return
+        for name, group, transform in targets:
+            if name not in container:
+                continue
+            value = container[name]
+            if transform is not None:
+                try:
+                    value = transform(value)
+                except _TRANSFORM_ERRORS:
+                    value = None
+            out[group][name] = value
+
+    return extract
+
+
+class NiuFieldExtractor:
+    """Pull the wanted fields of every group out of the raw payloads."""
+
+    def __init__(self, fields: dict[str, tuple[str, ...]]) -> None:
+        self.fields = fields
+        self._template = {group: dict.fromkeys(names) for group, names in fields.items()}
+
+        # (endpoint, container path) -> (rank, targets); rank is the position
+        # of the container in GROUP_CONTAINERS.
+        containers: dict[tuple[str, Path], tuple[int, list]] = {}
+        for group, names in fields.items():
+            if group not in GROUP_CONTAINERS:
+                # Filled in by the coordinator (ride history aggregates)
+                continue
+            endpoint = GROUP_ENDPOINTS[group]
+            for rank, path in enumerate(GROUP_CONTAINERS[group]):
+                _, targets = containers.setdefault((endpoint, path), (rank, []))
+                targets.extend((name, group, FIELD_TRANSFORMS.get((group, name))) for name in names)
+
+        # endpoint -> container closures, least specific first so the more
+        # specific containers overwrite what they also provide.
+        self._extractors: dict[str, list[Callable[[Any, dict[str, dict[str, Any]]], None]]] = {}
+        for (endpoint, path), (rank, targets) in sorted(
+            containers.items(), key=lambda item: -item[1][0]
+        ):
+            self._extractors.setdefault(endpoint, []).append(_compile_container(path, targets))
+
+    def extract(self, payloads: dict[str, Any]) -> dict[str, dict[str, Any]]:
+        """Return {group: {field: value}} for the compiled fields.
+
+        Fields whose endpoint payload is missing or lacks them are None.
+        """
+        out = {group: values.copy() for group, values in self._template.items()}
+        for endpoint, extractors in self._extractors.items():
+            payload = payloads.get(endpoint)
+            if payload is None:
+                continue
+            for extract in extractors:
+                extract(payload, out)
+        return out
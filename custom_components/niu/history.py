@@ -0,0 +1,304 @@
+"""Local ride history of the NIU scooters.
+
+Rides from the track list API are kept in a SQLite database
+(niu_rides.db in the config directory), one row per (sn, trackId). The track
+list is paged newest first, so a sync only has to walk the pages until it
+reaches a ride that is already stored.
+
+RideHistory is blocking; run its methods in the executor.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+from pathlib import Path
+import sqlite3
+import threading
+from typing import Any, Awaitable, Callable, Iterable
+
+from homeassistant.core import HomeAssistant
+
+from .const import (
+    DATA_HISTORY,
+    DOMAIN,
+    HISTORY_DB_FILE,
+    HISTORY_INITIAL_PAGE_SIZE,
+    HISTORY_SYNC_MAX_PAGES,
+    HISTORY_SYNC_PAGE_SIZE,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+SCHEMA_VERSION = 1
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS rides (
+    sn TEXT NOT NULL,
+    track_id TEXT NOT NULL,
+    start_time INTEGER NOT NULL,
+    end_time INTEGER,
+    distance INTEGER,
+    avespeed REAL,
+    ridingtime INTEGER,
+    track_thumb TEXT,
+    data TEXT NOT NULL,
+    PRIMARY KEY (sn, track_id)
+);
+CREATE INDEX IF NOT EXISTS rides_sn_start ON rides (sn, start_time);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+# Columns returned by RideHistory.rides(), in order
+RIDE_COLUMNS = (
+    "track_id",
+    "start_time",
+    "end_time",
+    "distance",
+    "avespeed",
+    "ridingtime",
+    "track_thumb",
+)
+
+
+def _as_int(value: Any) -> int | None:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _as_float(value: Any) -> float | None:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _ride_row(sn: str, ride: dict[str, Any]) -> tuple | None:
+    """Return the rides table row of a track list item, None if unusable."""
+    track_id = ride.get("trackId")
+    start_time = _as_int(ride.get("startTime"))
+    if not track_id or start_time is None:
+        return None
+    return (
+        sn,
+        str(track_id),
+        start_time,
+        _as_int(ride.get("endTime")),
+        _as_int(ride.get("distance")),
+        _as_float(ride.get("avespeed")),
+        _as_int(ride.get("ridingtime")),
+        ride.get("track_thumb"),
+        json.dumps(ride, ensure_ascii=False, separators=(",", ":")),
+    )
+
+
+def track_items(payload: Any) -> list[dict[str, Any]]:
+    """Return the ride dicts of a track list payload."""
+    if not isinstance(payload, dict):
+        return []
+    items = payload.get("data")
+    if not isinstance(items, list):
+        return []
+    return [item for item in items if isinstance(item, dict)]
+
+
+class RideHistory:
+    """SQLite store of rides, shared by every scooter."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._conn: sqlite3.Connection | None = None
+        self._lock = threading.Lock()
+        self._users = 0
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.executescript(_SCHEMA)
+            conn.execute(
+                "INSERT OR IGNORE INTO meta (key, value) VALUES ('schema_version', ?)",
+                (str(SCHEMA_VERSION),),
+            )
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def add_rides(self, sn: str, rides: Iterable[dict[str, Any]]) -> int:
+        """Store track list items and return how many were new."""
+        rows = [row for row in (_ride_row(sn, ride) for ride in rides) if row is not None]
+        if not rows:
+            return 0
+        with self._lock:
+            conn = self._connection()
+            before = conn.total_changes
+            with conn:
+                conn.executemany(
+                    "INSERT OR IGNORE INTO rides VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", rows
+                )
+            return conn.total_changes - before
+
+    def known_track_ids(self, sn: str, track_ids: Iterable[str]) -> set[str]:
+        """Return which of `track_ids` are already stored for `sn`."""
+        track_ids = [str(track_id) for track_id in track_ids]
+        if not track_ids:
+            return set()
+        with self._lock:
+            cursor = self._connection().execute(
+                f"SELECT track_id FROM rides WHERE sn = ? AND track_id IN ({','.join('?' * len(track_ids))})",
+                (sn, *track_ids),
+            )
+            return {row[0] for row in cursor}
+
+    def ride_count(self, sn: str) -> int:
+        with self._lock:
+            return self._connection().execute(
+                "SELECT COUNT(*) FROM rides WHERE sn = ?", (sn,)
+            ).fetchone()[0]
+
+    def summary(self, sn: str, start_ms: int, end_ms: int | None = None) -> dict[str, int]:
+        """Return rides, distance (m) and riding time (s) of rides started in the range."""
+        query = "SELECT COUNT(*), TOTAL(distance), TOTAL(ridingtime) FROM rides WHERE sn = ? AND start_time >= ?"
+        args: list[Any] = [sn, start_ms]
+        if end_ms is not None:
+            query += " AND start_time < ?"
+            args.append(end_ms)
+        with self._lock:
+            count, distance, ridingtime = self._connection().execute(query, args).fetchone()
+        return {"rides": count, "distance": int(distance), "ridingtime": int(ridingtime)}
+
+    def rides(
+        self,
+        sn: str | None = None,
+        start_ms: int | None = None,
+        end_ms: int | None = None,
+        limit: int | None = None,
+    ) -> list[dict[str, Any]]:
+        """Return stored rides, newest first, optionally filtered by scooter and start time."""
+        clauses: list[str] = []
+        args: list[Any] = []
+        if sn is not None:
+            clauses.append("sn = ?")
+            args.append(sn)
+        if start_ms is not None:
+            clauses.append("start_time >= ?")
+            args.append(start_ms)
+        if end_ms is not None:
+            clauses.append("start_time < ?")
+            args.append(end_ms)
+        query = f"SELECT sn, {', '.join(RIDE_COLUMNS)} FROM rides"
+        if clauses:
+            query += " WHERE " + " AND ".join(clauses)
+        query += " ORDER BY start_time DESC"
+        if limit is not None:
+            query += " LIMIT ?"
+            args.append(limit)
+        with self._lock:
+            cursor = self._connection().execute(query, args)
+            return [dict(zip(("sn", *RIDE_COLUMNS), row)) for row in cursor]
+
+    def hourly_totals(self, sn: str, bucket_ms: int) -> list[tuple[int, int, float, float]]:
+        """Return (bucket, rides, distance, riding time) per bucket with rides, oldest first.
+
+        Buckets are numbered start_time // bucket_ms.
+        """
+        with self._lock:
+            cursor = self._connection().execute(
+                "SELECT start_time / ? AS bucket, COUNT(*), TOTAL(distance), TOTAL(ridingtime)"
+                " FROM rides WHERE sn = ? GROUP BY bucket ORDER BY bucket",
+                (bucket_ms, sn),
+            )
+            return cursor.fetchall()
+
+    def get_meta(self, key: str) -> str | None:
+        with self._lock:
+            row = self._connection().execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def set_meta(self, key: str, value: str | None) -> None:
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                if value is None:
+                    conn.execute("DELETE FROM meta WHERE key = ?", (key,))
+                else:
+                    conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+
+
+async def async_sync_rides(
+    hass: HomeAssistant,
+    history: RideHistory,
+    sn: str,
+    fetch_page: Callable[[int, int], Awaitable[dict[str, Any] | None]],
+    deadline: float | None = None,
+) -> tuple[dict[str, Any] | None, int, int | None]:
+    """Pull the rides newer than the stored ones into the history.
+
+    Pages are fetched newest first until one contains a ride that is already
+    stored, is short, HISTORY_SYNC_MAX_PAGES is reached or the `deadline`
+    (loop time) has passed. Once the history has rides, a sync usually
+    costs one small page. Returns the first page
+    (the latest rides, None if it failed), the number of new rides and the
+    start time (ms) of the oldest new ride.
+    """
+    has_rides = await hass.async_add_executor_job(history.ride_count, sn) > 0
+    page_size = HISTORY_SYNC_PAGE_SIZE if has_rides else HISTORY_INITIAL_PAGE_SIZE
+
+    first_page: dict[str, Any] | None = None
+    added = 0
+    oldest_new: int | None = None
+    for index in range(HISTORY_SYNC_MAX_PAGES):
+        if index and deadline is not None and asyncio.get_running_loop().time() >= deadline:
+            break
+        payload = await fetch_page(index, page_size)
+        if payload is None:
+            break
+        if first_page is None:
+            first_page = payload
+        rides = track_items(payload)
+        known = await hass.async_add_executor_job(
+            history.known_track_ids, sn, [ride.get("trackId") for ride in rides if ride.get("trackId")]
+        )
+        added += await hass.async_add_executor_job(history.add_rides, sn, rides)
+        for ride in rides:
+            start = _as_int(ride.get("startTime"))
+            if start is not None and str(ride.get("trackId")) not in known:
+                oldest_new = start if oldest_new is None else min(oldest_new, start)
+        if known or len(rides) < page_size:
+            break
+
+    if added:
+        _LOGGER.debug("Stored %d new rides of %s", added, sn)
+    return first_page, added, oldest_new
+
+
+def async_acquire_history(hass: HomeAssistant) -> RideHistory:
+    """Return the ride history shared by the config entries."""
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    history = domain_data.get(DATA_HISTORY)
+    if history is None:
+        history = domain_data[DATA_HISTORY] = RideHistory(Path(hass.config.path(HISTORY_DB_FILE)))
+    history._users += 1
+    return history
+
+
+async def async_release_history(hass: HomeAssistant, history: RideHistory) -> None:
+    """Give back the ride history; the database is closed with its last user."""
+    history._users -= 1
+    if history._users > 0:
+        return
+    domain_data = hass.data.get(DOMAIN, {})
+    if domain_data.get(DATA_HISTORY) is history:
+        domain_data.pop(DATA_HISTORY)
+    await hass.async_add_executor_job(history.close)
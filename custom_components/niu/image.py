@@ -0,0 +1,347 @@
+"""Last track image of the Niu Integration.
+
+The image only changes when a ride ends, so instead of a camera the frontend
+polls, this is an image entity whose `image_last_updated` moves when the last
+track changes. Its picture is served by NiuTrackImageView at a URL that
+carries the track and a token derived from it, with an ETag and long-lived
+cache headers, so browsers fetch each track image about once. `width`, `height` and `format` (jpeg or
+webp) query parameters ask for a resized or transcoded variant.
+"""
+from __future__ import annotations
+
+import hashlib
+import hmac
+from http import HTTPStatus
+import logging
+from pathlib import Path
+import secrets
+from typing import Any
+
+from aiohttp import hdrs, web
+
+from homeassistant.components.http import KEY_AUTHENTICATED, HomeAssistantView
+from homeassistant.components.image import ImageEntity
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+from homeassistant.util import dt as dt_util
+
+from .api import NiuApi
+from .const import *
+from .render import TrackRenderer, renderer_available
+from .thumbcache import ThumbnailCache, thumbnail_key
+from .variants import (
+    CONTENT_TYPES,
+    FORMAT_JPEG,
+    FORMAT_WEBP,
+    ImageVariantCache,
+    variants_available,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+DATA_TRACK_IMAGE_VIEW = "niu_track_image_view"
+TRACK_IMAGE_URL = "/api/niu/track_image/{entity_id}"
+
+# Coordinator fields the image depends on
+IMAGE_FIELDS = frozenset(
+    {
+        (SENSOR_TYPE_TRACK, "track_thumb"),
+        (SENSOR_TYPE_TRACK, "trackId"),
+        (SENSOR_TYPE_TRACK, "date"),
+    }
+)
+
+
+async def async_setup_entry(hass, entry, async_add_entities) -> None:
+    niu_auth = entry.data.get(CONF_AUTH, None)
+    if niu_auth is None:
+        _LOGGER.error(
+            "The authenticator of your Niu integration is None.. can not setup the integration..."
+        )
+        return False
+
+    # Get coordinator and api from hass.data
+    coordinator_data = hass.data[DOMAIN][entry.entry_id]
+    coordinator = coordinator_data["coordinator"]
+    api = coordinator_data["api"]
+
+    _LOGGER.debug("Setting up last track image: sn=%s, sensor_prefix=%s", api.sn, api.sensor_prefix)
+
+    # Validate SN before creating entities
+    if not api.sn or api.sn.lower() == "none":
+        _LOGGER.error("Cannot create image entity: SN not available or invalid (sn=%s)", api.sn)
+        return False
+
+    # The last track used to be a camera entity
+    entity_registry = er.async_get(hass)
+    if old_entity_id := entity_registry.async_get_entity_id(
+        "camera", DOMAIN, f"camera.niu_{api.sn}_last_track"
+    ):
+        entity_registry.async_remove(old_entity_id)
+
+    renderer = None
+    if entry.options.get(CONF_TRACK_IMAGE, DEFAULT_TRACK_IMAGE) == TRACK_IMAGE_RENDER:
+        if renderer_available():
+            renderer = TrackRenderer(hass, api.async_get_track_detail)
+        else:
+            _LOGGER.warning("Pillow is not installed; the last track image is the remote thumbnail")
+
+    thumbnails = ThumbnailCache(
+        hass, Path(hass.config.path(THUMBNAIL_CACHE_DIR, api.sn)), THUMBNAIL_CACHE_MAX_BYTES
+    )
+    async_add_entities([NiuLastTrackImage(hass, coordinator, api, renderer, thumbnails)])
+
+
+def _async_get_view(hass: HomeAssistant) -> NiuTrackImageView:
+    """Return the track image view, registering it on first use."""
+    view = hass.data.get(DATA_TRACK_IMAGE_VIEW)
+    if view is None:
+        view = hass.data[DATA_TRACK_IMAGE_VIEW] = NiuTrackImageView(
+            ImageVariantCache(hass, VARIANT_CACHE_MAX_BYTES)
+        )
+        hass.http.register_view(view)
+    return view
+
+
+class NiuLastTrackImage(CoordinatorEntity, ImageEntity):
+    _attr_has_entity_name = True
+    _attr_translation_key = "last_track_image"
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        coordinator,
+        api: NiuApi,
+        renderer: TrackRenderer | None,
+        thumbnails: ThumbnailCache,
+    ) -> None:
+        CoordinatorEntity.__init__(self, coordinator, context=IMAGE_FIELDS)
+        ImageEntity.__init__(self, hass)
+        self._api = api
+        self._sn = api.sn
+        self._renderer = renderer
+        self._thumbnails = thumbnails
+        self._attr_unique_id = f"image.niu_{self._sn}_last_track"
+        # Identity of the track shown, and the image served for it
+        self._track_key: str | None = None
+        self._image: bytes | None = None
+        # Signs the picture URLs; unlike the access tokens it does not rotate
+        self._url_secret = secrets.token_bytes(32)
+        _LOGGER.debug("Creating image: unique_id=%s", self._attr_unique_id)
+
+    @property
+    def device_info(self):
+        # Use sensor_prefix (scooter name) if available, otherwise use SN
+        device_name = self._api.sensor_prefix if self._api.sensor_prefix else f"Niu Scooter {self._sn}"
+        # Use SN as primary identifier, fallback to device_name
+        identifier = self._sn if self._sn and self._sn.lower() != "none" else device_name
+        return {
+            "identifiers": {("niu", identifier)},
+            "name": device_name,
+            "manufacturer": "Niu",
+            "model": self._api.sku_name or self._api.product_type or "Niu Scooter",
+            "hw_version": self._api.product_type,
+            "serial_number": self._api.carframe_id,
+        }
+
+    @property
+    def entity_picture(self) -> str | None:
+        """Link to the cacheable image of the current track."""
+        if self._track_key is None:
+            return None
+        return (
+            TRACK_IMAGE_URL.format(entity_id=self.entity_id)
+            + f"?token={self.track_token(self._track_key)}&v={self._track_key}"
+        )
+
+    def track_token(self, key: str) -> str:
+        """Return the token of the picture URL of a track, the same for as
+        long as the track is shown."""
+        return hmac.new(self._url_secret, key.encode("utf-8"), hashlib.sha256).hexdigest()
+
+    def _current_track(self) -> tuple[str | None, dict[str, Any]]:
+        track = (self.coordinator.data or {}).get(SENSOR_TYPE_TRACK, {})
+        return thumbnail_key(track.get("trackId"), track.get("track_thumb")), track
+
+    @callback
+    def _update_track(self) -> bool:
+        """Take over a new last track; return True if it changed."""
+        key, _ = self._current_track()
+        if key is None or key == self._track_key:
+            return False
+        self._track_key = key
+        self._image = None
+        self._attr_image_last_updated = dt_util.utcnow()
+        return True
+
+    async def async_added_to_hass(self) -> None:
+        await super().async_added_to_hass()
+        self._update_track()
+        _async_get_view(self.hass).entities[self.entity_id] = self
+
+    async def async_will_remove_from_hass(self) -> None:
+        await super().async_will_remove_from_hass()
+        view = self.hass.data.get(DATA_TRACK_IMAGE_VIEW)
+        if view is not None and view.entities.get(self.entity_id) is self:
+            del view.entities[self.entity_id]
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        # Only a new track changes the image
+        if self._update_track():
+            self.async_write_ha_state()
+
+    @property
+    def _render_failed(self) -> bool:
+        """Return True while the thumbnail stands in for a render that failed
+        and waits to be retried."""
+        _, track = self._current_track()
+        return (
+            self._renderer is not None
+            and bool(track.get("trackId"))
+            and self._renderer.failed(str(track["trackId"]))
+        )
+
+    @property
+    def available(self):
+        return self.coordinator.last_update_success or self._image is not None
+
+    async def async_source_image(self, width: int | None, height: int | None) -> bytes | None:
+        """Return the image a variant of width x height is made from.
+
+        Rendered tracks are drawn at the requested size; other images are
+        downscaled from the full-size one.
+        """
+        _, track = self._current_track()
+        if self._renderer is not None and (width or height) and track.get("trackId") and track.get("date"):
+            try:
+                image = await self._renderer.async_image(
+                    str(track["trackId"]), str(track["date"]), width, height
+                )
+            except (OSError, ValueError) as err:
+                _LOGGER.error("Error rendering the last track of %s: %s", self.entity_id, err)
+            else:
+                if image is not None:
+                    return image
+        return await self.async_image()
+
+    async def async_image(self) -> bytes | None:
+        """Return the image of the current track."""
+        if self._image is not None:
+            return self._image
+        key, track = self._current_track()
+        if key is None:
+            return None
+
+        image = None
+        if self._renderer is not None and track.get("trackId") and track.get("date"):
+            try:
+                image = await self._renderer.async_image(str(track["trackId"]), str(track["date"]))
+            except (OSError, ValueError) as err:
+                _LOGGER.error("Error rendering the last track of %s: %s", self.entity_id, err)
+            if image is not None:
+                self._attr_content_type = self._renderer.content_type
+        if image is None and track.get("track_thumb"):
+            image = await self._thumbnails.async_get(key, track["track_thumb"])
+            if image is not None:
+                self._attr_content_type = "image/jpeg"
+        if image is None:
+            _LOGGER.error("Error getting the last track image of %s", self.entity_id)
+            return None
+
+        # Only keep the image if the track did not change meanwhile, and not
+        # a thumbnail standing in for a render that is retried later
+        if key == self._track_key and not self._render_failed:
+            self._image = image
+        return image
+
+
+class NiuTrackImageView(HomeAssistantView):
+    """Serve last track images with validators and cache headers."""
+
+    name = "api:niu:track_image"
+    requires_auth = False
+    url = TRACK_IMAGE_URL
+
+    def __init__(self, variants: ImageVariantCache) -> None:
+        self.entities: dict[str, NiuLastTrackImage] = {}
+        self.variants = variants
+
+    async def get(self, request: web.Request, entity_id: str) -> web.StreamResponse:
+        if (entity := self.entities.get(entity_id)) is None:
+            raise web.HTTPNotFound()
+        key = entity._track_key
+        token = request.query.get("token", "")
+        if not (
+            request[KEY_AUTHENTICATED]
+            or token in entity.access_tokens
+            or (key is not None and _same_token(token, entity.track_token(key)))
+        ):
+            raise web.HTTPForbidden()
+        if key is None:
+            raise web.HTTPNotFound()
+
+        width = _dimension(request.query.get("width"))
+        height = _dimension(request.query.get("height"))
+        fmt = request.query.get("format")
+        if fmt is not None and fmt not in CONTENT_TYPES:
+            raise web.HTTPBadRequest()
+        if fmt is None and (width or height):
+            # Resized variants default to WebP when the client takes it
+            fmt = FORMAT_WEBP if "image/webp" in request.headers.get(hdrs.ACCEPT, "") else FORMAT_JPEG
+        if not variants_available():
+            fmt = None
+
+        etag = f'"{key}"' if fmt is None else f'"{key}-{width or 0}x{height or 0}-{fmt}"'
+        headers = {
+            hdrs.ETAG: etag,
+            # The URL changes with the track only, so a cached image never
+            # goes stale and is not refetched when the access token rotates.
+            hdrs.CACHE_CONTROL: f"private, max-age={TRACK_IMAGE_MAX_AGE}, immutable",
+            hdrs.VARY: hdrs.ACCEPT,
+        }
+        if etag in request.headers.get(hdrs.IF_NONE_MATCH, ""):
+            return web.Response(status=HTTPStatus.NOT_MODIFIED, headers=headers)
+
+        if fmt is None:
+            image = await entity.async_image()
+            content_type = entity.content_type
+        else:
+            try:
+                image = await self.variants.async_get(
+                    (entity_id, key),
+                    lambda: entity.async_source_image(width, height),
+                    width,
+                    height,
+                    fmt,
+                )
+            except (OSError, ValueError) as err:
+                _LOGGER.error("Error converting the last track image of %s: %s", entity_id, err)
+                image = None
+            content_type = CONTENT_TYPES[fmt]
+        if image is None:
+            raise web.HTTPServiceUnavailable()
+        if entity._render_failed:
+            # The rendered image replaces this one once it can be fetched
+            headers = {hdrs.CACHE_CONTROL: "no-cache", hdrs.VARY: hdrs.ACCEPT}
+            if fmt is not None:
+                self.variants.discard((entity_id, key), width, height, fmt)
+        return web.Response(body=image, content_type=content_type, headers=headers)
+
+
+def _same_token(given: str, expected: str) -> bool:
+    return hmac.compare_digest(given.encode("utf-8"), expected.encode("utf-8"))
+
+
+def _dimension(value: str | None) -> int | None:
+    """Parse a width/height query parameter, capped at TRACK_RENDER_MAX_SIZE."""
+    if value is None or value == "":
+        return None
+    try:
+        dimension = int(value)
+    except ValueError:
+        raise web.HTTPBadRequest() from None
+    if dimension <= 0:
+        raise web.HTTPBadRequest()
+    return min(dimension, TRACK_RENDER_MAX_SIZE)
@@ -0,0 +1,308 @@
+"""Persist the raw NIU responses for debugging.
+
+Two writers are available:
+
+* LastResponseWriter keeps a single pretty-printed JSON file with the latest
+  snapshot and only rewrites it when the snapshot changed.
+* ResponseJournal appends to a gzip-compressed NDJSON journal, one record per
+  endpoint whose payload changed. The first record of an endpoint in a file is
+  the full payload, later ones are deltas against the previous payload. Files
+  rotate at a size cap. A file is one gzip stream, sync-flushed after every
+  write, so the records share one compression window; a file still being
+  written (or left by a crash) just lacks the gzip trailer. A journal opened
+  on such a file rotates it away instead of appending to it.
+
+This module only uses the standard library so it can be run directly to
+replay a journal:
+
+    python custom_components/niu/journal.py niu_journal/<sn>.ndjson.gz
+"""
+from __future__ import annotations
+
+import argparse
+from datetime import datetime, timezone
+import gzip
+import hashlib
+import json
+from pathlib import Path
+import sys
+import threading
+from typing import IO, Any, Iterator
+import zlib
+
+_MISSING = object()
+
+
+def _atomic_write_json(path: Path, payload: object) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(payload, f, ensure_ascii=False, indent=2)
+    tmp_path.replace(path)
+
+
+def _canonical(value: Any) -> str:
+    return json.dumps(value, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+
+
+def _digest(value: Any) -> str:
+    return _digest_text(_canonical(value))
+
+
+def _digest_text(text: str) -> str:
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def diff(old: Any, new: Any) -> dict[str, Any]:
+    """Return a delta turning `old` into `new`.
+
+    Nested dicts are diffed key by key; any other change (lists included)
+    replaces the value. The delta is {"set": [[path, value], ...],
+    "del": [path, ...]} with paths as lists of keys.
+    """
+    sets: list[list[Any]] = []
+    dels: list[list[str]] = []
+
+    def walk(a: Any, b: Any, path: list[str]) -> None:
+        if isinstance(a, dict) and isinstance(b, dict):
+            for key, value in b.items():
+                old_value = a.get(key, _MISSING)
+                if old_value is _MISSING:
+                    sets.append([path + [key], value])
+                elif old_value != value:
+                    walk(old_value, value, path + [key])
+            dels.extend(path + [key] for key in a if key not in b)
+        elif a != b:
+            sets.append([path, b])
+
+    walk(old, new, [])
+    delta: dict[str, Any] = {}
+    if sets:
+        delta["set"] = sets
+    if dels:
+        delta["del"] = dels
+    return delta
+
+
+def patch(value: Any, delta: dict[str, Any]) -> Any:
+    """Apply a delta produced by diff() and return the new value."""
+    for path, new in delta.get("set", []):
+        if not path:
+            value = new
+            continue
+        node = value
+        for key in path[:-1]:
+            node = node[key]
+        node[path[-1]] = new
+    for path in delta.get("del", []):
+        node = value
+        for key in path[:-1]:
+            node = node[key]
+        node.pop(path[-1], None)
+    return value
+
+
+class LastResponseWriter:
+    """Keep the latest snapshot in one JSON file, rewritten only on change."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._last_digest: str | None = None
+
+    def write(self, snapshot: dict[str, Any]) -> bool:
+        """Write the snapshot if it differs from the last one written."""
+        digest = _digest(snapshot)
+        if digest == self._last_digest:
+            return False
+        _atomic_write_json(self.path, snapshot)
+        self._last_digest = digest
+        return True
+
+    def close(self) -> None:
+        """Nothing is kept open."""
+
+
+class ResponseJournal:
+    """Bounded, rotating, compressed journal of per-endpoint payload changes."""
+
+    def __init__(self, path: Path, max_bytes: int, backups: int) -> None:
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backups = backups
+        # endpoint -> (digest, payload) of the last record in the current file
+        self._last: dict[str, tuple[str, Any]] = {}
+        # Open gzip stream of the current file
+        self._file: IO[bytes] | None = None
+        self._stream: gzip.GzipFile | None = None
+        # write() and close() run in executor threads
+        self._lock = threading.Lock()
+
+    def _open(self) -> gzip.GzipFile:
+        if self._stream is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            # After a clean stop the file gets a new gzip member; readers see
+            # one stream. A member left unfinished by a crash cannot be
+            # continued, so that file is rotated away first.
+            if self.path.exists() and not _decompress(self.path.read_bytes())[1]:
+                self._rotate()
+            self._file = open(self.path, "ab")
+            self._stream = gzip.GzipFile(fileobj=self._file, mode="ab")
+        return self._stream
+
+    def close(self) -> None:
+        """Finish the gzip stream of the current file."""
+        with self._lock:
+            self._close()
+
+    def _close(self) -> None:
+        if self._stream is not None:
+            self._stream.close()
+            self._stream = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _rotate(self) -> None:
+        self._close()
+        for index in range(self.backups - 1, 0, -1):
+            source = self.path.with_name(f"{self.path.name}.{index}")
+            if source.exists():
+                source.replace(self.path.with_name(f"{self.path.name}.{index + 1}"))
+        if self.backups > 0:
+            self.path.replace(self.path.with_name(f"{self.path.name}.1"))
+        else:
+            self.path.unlink()
+        # Every file starts with full payloads so it can be replayed alone.
+        self._last.clear()
+
+    def write(self, snapshot: dict[str, Any]) -> bool:
+        """Append a record for every endpoint whose payload changed."""
+        with self._lock:
+            return self._write(snapshot)
+
+    def _write(self, snapshot: dict[str, Any]) -> bool:
+        payloads = {"parsed": snapshot.get("parsed"), **snapshot.get("raw", {})}
+        timestamp = datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+        if self.path.exists() and self.path.stat().st_size >= self.max_bytes:
+            self._rotate()
+
+        lines = []
+        for endpoint, payload in payloads.items():
+            if payload is None:
+                continue
+            text = _canonical(payload)
+            digest = _digest_text(text)
+            last = self._last.get(endpoint)
+            if last is not None and last[0] == digest:
+                continue
+            record: dict[str, Any] = {"ts": timestamp, "sn": snapshot.get("sn"), "endpoint": endpoint}
+            if last is None:
+                record["full"] = payload
+            else:
+                record["delta"] = diff(last[1], payload)
+            lines.append(_canonical(record))
+            # Keep a private copy: the caller's payload may be mutated later.
+            self._last[endpoint] = (digest, json.loads(text))
+
+        if not lines:
+            return False
+        stream = self._open()
+        stream.write(("\n".join(lines) + "\n").encode("utf-8"))
+        # Complete records are readable (and counted in the file size) at
+        # once, without ending the stream.
+        stream.flush(zlib.Z_SYNC_FLUSH)
+        return True
+
+
+def journal_files(path: Path) -> list[Path]:
+    """Return a journal and its rotated files, oldest first."""
+    rotated = sorted(
+        (p for p in path.parent.glob(f"{path.name}.*") if p.suffix.lstrip(".").isdigit()),
+        key=lambda p: int(p.suffix.lstrip(".")),
+        reverse=True,
+    )
+    return rotated + ([path] if path.exists() else [])
+
+
+def _decompress(data: bytes) -> tuple[bytes, bool]:
+    """Decompress the gzip members of a journal file.
+
+    Returns the data and whether the last member is complete. Decoding stops
+    at a member without its trailer (still being written, or left by a
+    crash), keeping what was flushed of it, and at damaged data.
+    """
+    text = bytearray()
+    while data:
+        decompressor = zlib.decompressobj(zlib.MAX_WBITS | 16)
+        try:
+            text += decompressor.decompress(data)
+        except zlib.error:
+            # Recover what was flushed before the damage, byte by byte
+            decompressor = zlib.decompressobj(zlib.MAX_WBITS | 16)
+            for index in range(len(data)):
+                try:
+                    text += decompressor.decompress(data[index : index + 1])
+                except zlib.error:
+                    break
+            return bytes(text), False
+        if not decompressor.eof:
+            return bytes(text), False
+        data = decompressor.unused_data
+    return bytes(text), True
+
+
+def _read_lines(file: Path) -> list[str]:
+    """Return the lines of a journal file; the last one may be cut off."""
+    text, _ = _decompress(file.read_bytes())
+    return text.decode("utf-8", errors="replace").splitlines(keepends=True)
+
+
+def replay(path: Path) -> Iterator[dict[str, Any]]:
+    """Yield {"ts", "sn", "endpoint", "payload"} for every journal record.
+
+    Deltas are applied, so every yielded payload is complete.
+    """
+    for file in journal_files(path):
+        state: dict[str, Any] = {}
+        for line in _read_lines(file):
+            if not line.endswith("\n") or not line.strip():
+                continue
+            record = json.loads(line)
+            endpoint = record["endpoint"]
+            if "full" in record:
+                state[endpoint] = record["full"]
+            elif endpoint in state:
+                state[endpoint] = patch(state[endpoint], record["delta"])
+            else:
+                continue
+            yield {
+                "ts": record["ts"],
+                "sn": record.get("sn"),
+                "endpoint": endpoint,
+                "payload": json.loads(_canonical(state[endpoint])),
+            }
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Replay a NIU response journal as NDJSON.")
+    parser.add_argument("journal", type=Path, help="path of the .ndjson.gz journal")
+    parser.add_argument("--endpoint", help="only show this endpoint")
+    parser.add_argument("--latest", action="store_true", help="only show the final state of each endpoint")
+    args = parser.parse_args(argv)
+
+    latest: dict[str, dict[str, Any]] = {}
+    for entry in replay(args.journal):
+        if args.endpoint and entry["endpoint"] != args.endpoint:
+            continue
+        if args.latest:
+            latest[entry["endpoint"]] = entry
+        else:
+            print(json.dumps(entry, ensure_ascii=False))
+    for entry in latest.values():
+        print(json.dumps(entry, ensure_ascii=False))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,151 @@
+"""Domain-wide request budget against the NIU cloud.
+
+Every request of every account takes a token from one bucket, refilled at
+REQUEST_BUDGET_RATE tokens per second up to REQUEST_BUDGET_BURST. When the
+bucket is empty requests queue up and are served by priority: logins and the
+scooter list first, then the position (motor index), the battery, and the
+tally and track list last. The coordinator defers due low-priority endpoints
+to a later poll instead of queueing them while the bucket is empty.
+"""
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+import time
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+
+from .const import (
+    DATA_LIMITER,
+    DOMAIN,
+    MOTOINFO_LIST_API_URI,
+    MOTOR_BATTERY_API_URI,
+    MOTOR_INDEX_API_URI,
+    PRIORITY_AUTH,
+    PRIORITY_BATTERY,
+    PRIORITY_LOW,
+    PRIORITY_POSITION,
+    REQUEST_BUDGET_BURST,
+    REQUEST_BUDGET_RATE,
+)
+
+PATH_PRIORITIES = {
+    MOTOINFO_LIST_API_URI: PRIORITY_AUTH,
+    MOTOR_INDEX_API_URI: PRIORITY_POSITION,
+    MOTOR_BATTERY_API_URI: PRIORITY_BATTERY,
+}
+
+
+def path_priority(path: str) -> int:
+    """Return the priority of the requests to an API path."""
+    return PATH_PRIORITIES.get(path, PRIORITY_LOW)
+
+
+class NiuRequestLimiter:
+    """Token bucket with a priority queue of waiting requests."""
+
+    def __init__(self, rate: float, burst: int) -> None:
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        # Heap of (priority, sequence, future); cancelled waiters are
+        # dropped when they reach the top.
+        self._waiters: list[tuple[int, int, asyncio.Future[None]]] = []
+        self._sequence = itertools.count()
+        self._timer: asyncio.TimerHandle | None = None
+        self.granted = 0
+        self.queued = 0
+        self.deferred = 0
+        # Requests that waited in the queue and got a token
+        self._waits = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def has_budget(self) -> bool:
+        """Return True if a request would be sent right away."""
+        self._refill(time.monotonic())
+        return self._tokens >= 1 and not self._waiters
+
+    async def acquire(self, priority: int) -> None:
+        """Wait for a token; lower priorities are served first."""
+        now = time.monotonic()
+        self._refill(now)
+        if self._tokens >= 1 and not self._waiters:
+            self._tokens -= 1
+            self.granted += 1
+            return
+
+        future: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._sequence), future))
+        self.queued += 1
+        self._schedule()
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # Granted, but the request was given up: return the token.
+                self._tokens = min(self.burst, self._tokens + 1)
+                self._dispatch()
+            raise
+        waited = time.monotonic() - now
+        self.granted += 1
+        self._waits += 1
+        self._total_wait += waited
+        self._max_wait = max(self._max_wait, waited)
+
+    def _schedule(self) -> None:
+        if self._timer is not None or not self._waiters:
+            return
+        delay = max(0.0, (1 - self._tokens) / self.rate)
+        self._timer = asyncio.get_running_loop().call_later(delay, self._dispatch_timer)
+
+    def _dispatch_timer(self) -> None:
+        self._timer = None
+        self._dispatch()
+
+    def _dispatch(self) -> None:
+        """Hand out the available tokens to the waiters, by priority."""
+        self._refill(time.monotonic())
+        while self._waiters and self._tokens >= 1:
+            _, _, future = heapq.heappop(self._waiters)
+            if future.done():
+                continue
+            self._tokens -= 1
+            future.set_result(None)
+        while self._waiters and self._waiters[0][2].done():
+            heapq.heappop(self._waiters)
+        self._schedule()
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the budget state for the diagnostics."""
+        self._refill(time.monotonic())
+        depth: dict[int, int] = {}
+        for priority, _, future in self._waiters:
+            if not future.done():
+                depth[priority] = depth.get(priority, 0) + 1
+        return {
+            "tokens": round(self._tokens, 2),
+            "queue_depth": sum(depth.values()),
+            "queue_by_priority": depth,
+            "granted": self.granted,
+            "queued": self.queued,
+            "deferred": self.deferred,
+            "mean_wait": round(self._total_wait / self._waits, 3) if self._waits else 0.0,
+            "max_wait": round(self._max_wait, 3),
+        }
+
+
+def async_get_limiter(hass: HomeAssistant) -> NiuRequestLimiter:
+    """Return the request budget shared by all config entries."""
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    limiter = domain_data.get(DATA_LIMITER)
+    if limiter is None:
+        limiter = domain_data[DATA_LIMITER] = NiuRequestLimiter(REQUEST_BUDGET_RATE, REQUEST_BUDGET_BURST)
+    return limiter
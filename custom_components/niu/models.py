@@ -0,0 +1,244 @@
+"""Typed models of the NIU API payloads, their decoding and drift checks.
+
+The payloads stay plain dicts (the extractors and the response log work on
+them), typed with the TypedDicts below. Responses are decoded straight from
+their bytes, with orjson when it is installed.
+
+The required keys of the models are the ones the integration reads.
+SchemaMonitor compares each fresh payload with its model once, and warns when
+the API stops sending a key or container. When a similar key appears instead,
+the warning names it, e.g. if the long-misspelled `postion` gets fixed.
+"""
+# No `from __future__ import annotations`: TypedDict needs the evaluated
+# NotRequired markers to tell required keys apart.
+import difflib
+import json
+import logging
+from typing import (
+    Any,
+    NotRequired,
+    TypedDict,
+    get_args,
+    get_origin,
+    get_type_hints,
+    is_typeddict,
+)
+
+from .const import (
+    ENDPOINT_BATTERY,
+    ENDPOINT_MOTOR_INDEX,
+    ENDPOINT_OVERALL_TALLY,
+    ENDPOINT_TRACK_LIST,
+    ENDPOINT_VEHICLES,
+)
+
+try:
+    import orjson
+except ImportError:  # orjson is optional
+    orjson = None
+
+_LOGGER = logging.getLogger(__name__)
+
+JSON_BACKEND = "orjson" if orjson is not None else "json"
+
+
+def decode_json(content: bytes) -> Any:
+    """Parse a response body; raises ValueError on invalid JSON."""
+    if orjson is not None:
+        return orjson.loads(content)
+    return json.loads(content)
+
+
+class Point(TypedDict):
+    lat: float | str
+    lng: float | str
+
+
+class BatteryCompartment(TypedDict):
+    batteryCharging: int
+    isConnected: bool
+    chargedTimes: int | str
+    temperature: int
+    temperatureDesc: str
+    gradeBattery: float | str
+    bmsId: NotRequired[str]
+    energyConsumedTody: NotRequired[int]
+    totalPoint: NotRequired[int]
+    items: NotRequired[list[dict[str, Any]]]
+
+
+class Batteries(TypedDict):
+    compartmentA: BatteryCompartment
+    compartmentB: NotRequired[BatteryCompartment]
+
+
+class BatteryInfo(TypedDict):
+    batteries: Batteries
+    isCharging: int
+    estimatedMileage: int
+    centreCtrlBattery: int
+    batteryDetail: NotRequired[bool]
+
+
+class LastTrack(TypedDict):
+    time: int
+    distance: int
+    ridingTime: int
+
+
+class MotorIndex(TypedDict):
+    nowSpeed: float
+    isConnected: bool
+    lockStatus: int
+    leftTime: float | str
+    hdop: int
+    postion: Point
+    lastTrack: LastTrack
+    isCharging: NotRequired[int]
+    isAccOn: NotRequired[int]
+    gps: NotRequired[int]
+    gsm: NotRequired[int]
+    estimatedMileage: NotRequired[int]
+    centreCtrlBattery: NotRequired[int]
+    gpsTimestamp: NotRequired[int]
+    infoTimestamp: NotRequired[int]
+    time: NotRequired[int]
+
+
+class OverallTally(TypedDict):
+    totalMileage: float | str
+    bindDaysCount: int
+
+
+class TrackItem(TypedDict):
+    trackId: str
+    startTime: int
+    endTime: int
+    distance: int
+    avespeed: float
+    ridingtime: int
+    track_thumb: str
+    date: str
+    startPoint: NotRequired[Point]
+    lastPoint: NotRequired[Point]
+    power_consumption: NotRequired[int]
+
+
+class Vehicle(TypedDict):
+    sn_id: str
+    scooter_name: str
+    sku_name: NotRequired[str]
+    product_type: NotRequired[str]
+    carframe_id: NotRequired[str]
+
+
+class Vehicles(TypedDict):
+    items: list[Vehicle]
+
+
+class BatteryInfoResponse(TypedDict):
+    status: int
+    data: BatteryInfo
+
+
+class MotorIndexResponse(TypedDict):
+    status: int
+    data: MotorIndex
+
+
+class OverallTallyResponse(TypedDict):
+    status: int
+    data: OverallTally
+
+
+class TrackListResponse(TypedDict):
+    status: int
+    data: list[TrackItem]
+
+
+class VehiclesResponse(TypedDict):
+    status: int
+    data: Vehicles
+
+
+RESPONSE_MODELS: dict[str, type] = {
+    ENDPOINT_BATTERY: BatteryInfoResponse,
+    ENDPOINT_MOTOR_INDEX: MotorIndexResponse,
+    ENDPOINT_OVERALL_TALLY: OverallTallyResponse,
+    ENDPOINT_TRACK_LIST: TrackListResponse,
+    ENDPOINT_VEHICLES: VehiclesResponse,
+}
+
+Path = tuple[Any, ...]
+
+
+def _compile_model(model: type, path: Path = ()) -> list[tuple[Path, frozenset[str]]]:
+    """Flatten a TypedDict into (container path, required keys), parents first.
+
+    A list of models is checked through its first item.
+    """
+    checks = [(path, frozenset(model.__required_keys__))]
+    for key, hint in get_type_hints(model).items():
+        if get_origin(hint) is list and get_args(hint):
+            hint, step = get_args(hint)[0], (key, 0)
+        else:
+            step = (key,)
+        if is_typeddict(hint):
+            checks.extend(_compile_model(hint, path + step))
+    return checks
+
+
+def _format_path(path: Path) -> str:
+    return ".".join(str(step) for step in path) or "<root>"
+
+
+class SchemaMonitor:
+    """Report keys the models expect but the payloads no longer carry."""
+
+    def __init__(self) -> None:
+        self._checks = {endpoint: _compile_model(model) for endpoint, model in RESPONSE_MODELS.items()}
+        # endpoint.path -> description, each drift reported once
+        self.drift: dict[str, str] = {}
+
+    def check(self, endpoint: str, payload: Any) -> list[str]:
+        """Compare a successful payload with its model; return new drifts."""
+        checks = self._checks.get(endpoint)
+        if checks is None or not isinstance(payload, dict) or payload.get("status") not in (0, None):
+            return []
+
+        found = []
+        missing_containers: list[Path] = []
+        for path, required in checks:
+            if any(path[: len(parent)] == parent for parent in missing_containers):
+                continue
+            node = payload
+            for step in path:
+                if isinstance(step, int):
+                    node = node[step] if isinstance(node, list) and len(node) > step else None
+                else:
+                    node = node.get(step) if isinstance(node, dict) else None
+            if not isinstance(node, dict):
+                # A missing key is reported with its parent; an optional
+                # container, a null or an empty list (no rides yet) is not
+                # drift. Either way its children are not checked.
+                missing_containers.append(path)
+                continue
+            for key in required - node.keys():
+                key_path = path + (key,)
+                description = f"{_format_path(key_path)} is missing"
+                renamed = difflib.get_close_matches(key, node.keys() - required, n=1, cutoff=0.75)
+                if renamed:
+                    description += f" ({_format_path(path + (renamed[0],))} looks like its new name)"
+                found.append((f"{endpoint}.{_format_path(key_path)}", description))
+
+        new = []
+        for name, description in found:
+            if name not in self.drift:
+                self.drift[name] = description
+                new.append(description)
+                _LOGGER.warning(
+                    "The NIU %s payload changed: %s; please report this as an issue",
+                    endpoint,
+                    description,
+                )
+        return new
@@ -0,0 +1,87 @@
+"""Work out which endpoints and fields a config entry actually needs."""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Iterable
+
+from .const import (
+    ENDPOINT_MOTOR_INDEX,
+    ENDPOINT_TRACK_LIST,
+    ENDPOINT_VEHICLES,
+    GROUP_ENDPOINTS,
+    SENSOR_TYPE_BAT,
+    SENSOR_TYPE_DIST,
+    SENSOR_TYPE_MOTO,
+    SENSOR_TYPE_POS,
+    SENSOR_TYPE_TRACK,
+    SENSOR_TYPES,
+)
+
+# Fields read by a platform regardless of the selected sensors.
+PLATFORM_FIELDS = {
+    # trackId and date locate the points of the locally rendered image
+    "image": {
+        (SENSOR_TYPE_TRACK, "track_thumb"),
+        (SENSOR_TYPE_TRACK, "trackId"),
+        (SENSOR_TYPE_TRACK, "date"),
+    },
+    "device_tracker": {
+        (SENSOR_TYPE_POS, "lat"),
+        (SENSOR_TYPE_POS, "lng"),
+        (SENSOR_TYPE_TRACK, "startTime"),
+        (SENSOR_TYPE_TRACK, "endTime"),
+    },
+}
+
+# Fields that are only nice to have (attributes, poll scheduling): they are
+# parsed when their endpoint is fetched anyway, but never add a request.
+OPTIONAL_FIELDS = {
+    # NiuPollScheduler inputs
+    (SENSOR_TYPE_MOTO, "nowSpeed"),
+    (SENSOR_TYPE_MOTO, "isConnected"),
+    (SENSOR_TYPE_MOTO, "lockStatus"),
+    (SENSOR_TYPE_BAT, "isCharging"),
+    (SENSOR_TYPE_BAT, "isConnected"),
+    (SENSOR_TYPE_POS, "lat"),
+    (SENSOR_TYPE_POS, "lng"),
+    # ScooterConnected and device tracker attributes
+    (SENSOR_TYPE_BAT, "bmsId"),
+    (SENSOR_TYPE_BAT, "batteryCharging"),
+    (SENSOR_TYPE_BAT, "gradeBattery"),
+    (SENSOR_TYPE_BAT, "estimatedMileage"),
+    (SENSOR_TYPE_BAT, "centreCtrlBattery"),
+    (SENSOR_TYPE_DIST, "time"),
+}
+
+
+@dataclass(frozen=True)
+class NiuFetchPlan:
+    """Endpoints to poll and fields to parse for one config entry."""
+
+    endpoints: frozenset[str]
+    fields: dict[str, tuple[str, ...]]
+
+
+def build_fetch_plan(sensors_selected: Iterable[str], platforms: Iterable[str]) -> NiuFetchPlan:
+    """Build the fetch plan for the selected sensors and enabled platforms."""
+    required: set[tuple[str, str]] = set()
+    for sensor in sensors_selected:
+        if sensor in SENSOR_TYPES:
+            required.add((SENSOR_TYPES[sensor][3], SENSOR_TYPES[sensor][2]))
+    for platform in platforms:
+        required |= PLATFORM_FIELDS.get(platform, set())
+
+    endpoints = {ENDPOINT_VEHICLES} | {GROUP_ENDPOINTS[group] for group, _ in required}
+    if ENDPOINT_TRACK_LIST in endpoints:
+        # The motor index lastTrack marker tells when the track list changed.
+        endpoints.add(ENDPOINT_MOTOR_INDEX)
+
+    wanted = required | {key for key in OPTIONAL_FIELDS if GROUP_ENDPOINTS[key[0]] in endpoints}
+    fields: dict[str, list[str]] = {}
+    for group, field in sorted(wanted):
+        fields.setdefault(group, []).append(field)
+
+    return NiuFetchPlan(
+        endpoints=frozenset(endpoints),
+        fields={group: tuple(names) for group, names in fields.items()},
+    )
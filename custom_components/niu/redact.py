@@ -0,0 +1,201 @@
+"""Redaction of sensitive fields before NIU responses are written to disk.
+
+The generic walk (_redact_sensitive) copies a payload recursively and checks
+every key. NIU payloads keep the same shape from poll to poll, so
+RedactionEngine learns the shape of each endpoint once: which keys hold
+nested containers and where sensitive keys sit. Later payloads that fit the
+learned shape are redacted by replacing just those paths, and payloads
+without sensitive keys are passed through without copying. A payload that
+does not fit falls back to the generic walk, which also extends the shape.
+"""
+from __future__ import annotations
+
+from typing import Any
+
+REDACTED = "***REDACTED***"
+
+_SENSITIVE_KEYS = {
+    "token",
+    "access_token",
+    "refresh_token",
+    "password",
+    "passwd",
+    "secret",
+    "authorization",
+    "auth",
+}
+
+
+def _is_sensitive(key: Any) -> bool:
+    return str(key).lower() in _SENSITIVE_KEYS
+
+
+def _redact_sensitive(value: Any) -> Any:
+    """Recursively redact sensitive fields before persisting to disk."""
+    if isinstance(value, dict):
+        redacted: dict[str, Any] = {}
+        for k, v in value.items():
+            key = str(k).lower()
+            if key in _SENSITIVE_KEYS:
+                redacted[k] = REDACTED
+            else:
+                redacted[k] = _redact_sensitive(v)
+        return redacted
+    if isinstance(value, list):
+        return [_redact_sensitive(v) for v in value]
+    return value
+
+
+class _Shape:
+    """Learned structure of a dict or list node.
+
+    For dicts, `keys` are all keys seen, `children` the shapes of keys that
+    held containers and `sensitive` the keys to redact. For lists, `item` is
+    the merged shape of the container items.
+    """
+
+    __slots__ = ("is_list", "keys", "children", "sensitive", "item", "hot")
+
+    def __init__(self, is_list: bool) -> None:
+        self.is_list = is_list
+        self.keys: frozenset[Any] = frozenset()
+        self.children: dict[Any, _Shape] = {}
+        self.sensitive: frozenset[Any] = frozenset()
+        self.item: _Shape | None = None
+        # Whether a sensitive key sits at or below this node (set by _mark)
+        self.hot = True
+
+    def fits(self, value: Any) -> bool:
+        """Return True if `value` has no keys or containers the shape lacks."""
+        if self.is_list:
+            if type(value) is not list:
+                return False
+            item = self.item
+            for entry in value:
+                if type(entry) is dict or type(entry) is list:
+                    if item is None or not item.fits(entry):
+                        return False
+            return True
+
+        if type(value) is not dict or not value.keys() <= self.keys:
+            return False
+        children = self.children
+        for key, entry in value.items():
+            if type(entry) is dict or type(entry) is list:
+                child = children.get(key)
+                if child is None or not child.fits(entry):
+                    return False
+        return True
+
+
+def _mark(shape: _Shape) -> bool:
+    """Set `hot` on every node of a shape and return the root's value."""
+    if shape.is_list:
+        shape.hot = shape.item is not None and _mark(shape.item)
+    else:
+        hot = bool(shape.sensitive)
+        for child in shape.children.values():
+            hot = _mark(child) or hot
+        shape.hot = hot
+    return shape.hot
+
+
+def _learn(value: Any, shape: _Shape | None) -> tuple[Any, _Shape | None]:
+    """Generic walk: redact `value` and merge its structure into `shape`."""
+    if isinstance(value, dict):
+        if shape is None or shape.is_list:
+            shape = _Shape(is_list=False)
+        redacted: dict[Any, Any] = {}
+        sensitive = set(shape.sensitive)
+        for key, entry in value.items():
+            if _is_sensitive(key):
+                sensitive.add(key)
+                redacted[key] = REDACTED
+                continue
+            if isinstance(entry, (dict, list)):
+                redacted[key], shape.children[key] = _learn(entry, shape.children.get(key))
+            else:
+                redacted[key] = entry
+        shape.keys = shape.keys | value.keys()
+        shape.sensitive = frozenset(sensitive)
+        return redacted, shape
+
+    if isinstance(value, list):
+        if shape is None or not shape.is_list:
+            shape = _Shape(is_list=True)
+        redacted_items = []
+        for entry in value:
+            if isinstance(entry, (dict, list)):
+                entry, shape.item = _learn(entry, shape.item)
+            redacted_items.append(entry)
+        return redacted_items, shape
+
+    return value, shape
+
+
+def _apply(value: Any, shape: _Shape) -> Any:
+    """Copy `value` along the sensitive paths of a fitting shape only."""
+    if shape.is_list:
+        item = shape.item
+        return [
+            _apply(entry, item) if item is not None and isinstance(entry, (dict, list)) else entry
+            for entry in value
+        ]
+    redacted = dict(value)
+    for key in shape.sensitive:
+        if key in redacted:
+            redacted[key] = REDACTED
+    for key, child in shape.children.items():
+        entry = redacted.get(key)
+        if child.hot and isinstance(entry, (dict, list)):
+            redacted[key] = _apply(entry, child)
+    return redacted
+
+
+class _CompiledPlan:
+    """Redaction plan of one endpoint."""
+
+    __slots__ = ("shape", "needs_copy")
+
+    def __init__(self, shape: _Shape | None) -> None:
+        self.shape = shape
+        self.needs_copy = shape is not None and _mark(shape)
+
+
+class RedactionEngine:
+    """Redact payloads by endpoint using learned, compiled shapes."""
+
+    def __init__(self) -> None:
+        self._plans: dict[str, _CompiledPlan] = {}
+        self.fallbacks = 0
+
+    def redact(self, endpoint: str, payload: Any) -> Any:
+        """Return `payload` with sensitive fields replaced.
+
+        The result may be `payload` itself when nothing needs redacting; it
+        must be treated as read-only.
+        """
+        if not isinstance(payload, (dict, list)):
+            return payload
+        plan = self._plans.get(endpoint)
+        if plan is not None and plan.shape is not None and plan.shape.fits(payload):
+            if not plan.needs_copy:
+                return payload
+            return _apply(payload, plan.shape)
+
+        # Unknown shape: generic walk, and remember the (merged) shape.
+        self.fallbacks += 1
+        redacted, shape = _learn(payload, plan.shape if plan is not None else None)
+        self._plans[endpoint] = _CompiledPlan(shape)
+        return redacted
+
+    def redact_snapshot(self, snapshot: dict[str, Any]) -> dict[str, Any]:
+        """Redact a coordinator snapshot ({..., "parsed", "raw": {endpoint: payload}})."""
+        redacted = dict(snapshot)
+        if "parsed" in snapshot:
+            redacted["parsed"] = self.redact("parsed", snapshot["parsed"])
+        redacted["raw"] = {
+            endpoint: self.redact(endpoint, payload)
+            for endpoint, payload in snapshot.get("raw", {}).items()
+        }
+        return redacted
@@ -0,0 +1,204 @@
+"""Render ride tracks locally from their GPS points.
+
+The point list of a ride is fetched once from the track detail API and drawn
+with Pillow: a polyline colored by speed, a start and an end marker. Images
+are cached per ride and size, so a ride is rendered once per size it is
+shown at. A failed fetch is not repeated for a while; the image shows the
+remote thumbnail meanwhile. Pillow is optional; without it the image keeps using the remote
+thumbnail.
+"""
+from __future__ import annotations
+
+from collections import OrderedDict
+import io
+import logging
+import math
+import time
+from typing import Any, Awaitable, Callable
+
+from homeassistant.core import HomeAssistant
+
+from .const import (
+    TRACK_RENDER_CACHE_SIZE,
+    TRACK_RENDER_HEIGHT,
+    TRACK_RENDER_MAX_SIZE,
+    TRACK_RENDER_RETRY,
+    TRACK_RENDER_WIDTH,
+    TRACK_SPEED_SCALE_KMH,
+)
+
+try:
+    from PIL import Image, ImageDraw
+except ImportError:  # Pillow is optional
+    Image = ImageDraw = None
+
+_LOGGER = logging.getLogger(__name__)
+
+BACKGROUND = (245, 245, 240)
+START_COLOR = (46, 160, 67)
+END_COLOR = (207, 34, 46)
+# Speed gradient from slow to fast
+SPEED_COLORS = ((46, 160, 67), (240, 200, 40), (230, 120, 30), (207, 34, 46))
+
+EARTH_RADIUS_M = 6_371_000
+
+
+def renderer_available() -> bool:
+    """Return True if Pillow is installed."""
+    return Image is not None
+
+
+def track_points(payload: Any) -> list[tuple[float, float, int | None]]:
+    """Return (lat, lng, time ms) of the points of a track detail payload."""
+    data = payload.get("data") if isinstance(payload, dict) else None
+    items = data.get("trackItems") if isinstance(data, dict) else None
+    if not isinstance(items, list):
+        return []
+    points = []
+    for item in items:
+        if not isinstance(item, dict):
+            continue
+        try:
+            lat, lng = float(item["lat"]), float(item["lng"])
+        except (KeyError, TypeError, ValueError):
+            continue
+        if lat == 0 and lng == 0:
+            # No GPS fix
+            continue
+        timestamp = item.get("date")
+        points.append((lat, lng, timestamp if isinstance(timestamp, int) else None))
+    points.sort(key=lambda point: point[2] or 0)
+    return points
+
+
+def _distance_m(a: tuple[float, float, Any], b: tuple[float, float, Any]) -> float:
+    lat1, lng1, lat2, lng2 = map(math.radians, (a[0], a[1], b[0], b[1]))
+    h = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lng2 - lng1) / 2) ** 2
+    return 2 * EARTH_RADIUS_M * math.asin(min(1.0, math.sqrt(h)))
+
+
+def _speed_color(speed_kmh: float | None) -> tuple[int, int, int]:
+    if speed_kmh is None:
+        return SPEED_COLORS[0]
+    position = max(0.0, min(speed_kmh / TRACK_SPEED_SCALE_KMH, 1.0)) * (len(SPEED_COLORS) - 1)
+    low = min(int(position), len(SPEED_COLORS) - 2)
+    fraction = position - low
+    return tuple(
+        round(a + (b - a) * fraction) for a, b in zip(SPEED_COLORS[low], SPEED_COLORS[low + 1])
+    )
+
+
+def render_track(points: list[tuple[float, float, int | None]], width: int, height: int) -> bytes:
+    """Draw a track as a PNG of width x height pixels (blocking)."""
+    image = Image.new("RGB", (width, height), BACKGROUND)
+    draw = ImageDraw.Draw(image)
+
+    # Equirectangular projection around the track, fitted into the image
+    # with a margin and the aspect ratio kept.
+    lat0 = math.radians(sum(point[0] for point in points) / len(points))
+    xs = [point[1] * math.cos(lat0) for point in points]
+    ys = [point[0] for point in points]
+    margin = max(8, min(width, height) // 12)
+    span_x = max(max(xs) - min(xs), 1e-9)
+    span_y = max(max(ys) - min(ys), 1e-9)
+    scale = min((width - 2 * margin) / span_x, (height - 2 * margin) / span_y)
+    offset_x = (width - span_x * scale) / 2
+    offset_y = (height - span_y * scale) / 2
+    min_x, max_y = min(xs), max(ys)
+    pixels = [
+        (offset_x + (x - min_x) * scale, offset_y + (max_y - y) * scale) for x, y in zip(xs, ys)
+    ]
+
+    line_width = max(2, min(width, height) // 120)
+    for index in range(1, len(points)):
+        previous, point = points[index - 1], points[index]
+        speed = None
+        if previous[2] is not None and point[2] is not None and point[2] > previous[2]:
+            speed = _distance_m(previous, point) / ((point[2] - previous[2]) / 1000) * 3.6
+        draw.line(
+            (pixels[index - 1], pixels[index]), fill=_speed_color(speed), width=line_width, joint="curve"
+        )
+
+    radius = line_width * 2 + 2
+    for (x, y), color in ((pixels[0], START_COLOR), (pixels[-1], END_COLOR)):
+        draw.ellipse((x - radius, y - radius, x + radius, y + radius), fill=color, outline=(255, 255, 255))
+
+    buffer = io.BytesIO()
+    image.save(buffer, format="PNG", optimize=False)
+    return buffer.getvalue()
+
+
+class TrackRenderer:
+    """Fetch, render and cache the images of rides."""
+
+    content_type = "image/png"
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        fetch_detail: Callable[[str, str], Awaitable[dict[str, Any] | None]],
+    ) -> None:
+        self.hass = hass
+        self._fetch_detail = fetch_detail
+        self._points: OrderedDict[str, list[tuple[float, float, int | None]]] = OrderedDict()
+        self._images: OrderedDict[tuple[str, int, int], bytes] = OrderedDict()
+        # Rides whose detail fetch failed, and when it may be retried
+        self._retry_at: dict[str, float] = {}
+
+    @staticmethod
+    def _size(width: int | None, height: int | None) -> tuple[int, int]:
+        """Fill in a missing dimension from the default aspect ratio."""
+        if width and not height:
+            height = width * TRACK_RENDER_HEIGHT // TRACK_RENDER_WIDTH
+        elif height and not width:
+            width = height * TRACK_RENDER_WIDTH // TRACK_RENDER_HEIGHT
+        elif not width and not height:
+            width, height = TRACK_RENDER_WIDTH, TRACK_RENDER_HEIGHT
+        return (
+            max(16, min(int(width), TRACK_RENDER_MAX_SIZE)),
+            max(16, min(int(height), TRACK_RENDER_MAX_SIZE)),
+        )
+
+    def failed(self, track_id: str) -> bool:
+        """Return True while a failed fetch of the ride waits to be retried."""
+        return self._retry_at.get(track_id, 0) > time.monotonic()
+
+    async def _async_points(self, track_id: str, date: str) -> list[tuple[float, float, int | None]]:
+        points = self._points.get(track_id)
+        if points is None:
+            if self.failed(track_id):
+                return []
+            now = time.monotonic()
+            payload = await self._fetch_detail(track_id, date)
+            if payload is None:
+                self._retry_at = {key: at for key, at in self._retry_at.items() if at > now}
+                self._retry_at[track_id] = now + TRACK_RENDER_RETRY
+                return []
+            self._retry_at.pop(track_id, None)
+            points = track_points(payload)
+            self._points[track_id] = points
+            while len(self._points) > TRACK_RENDER_CACHE_SIZE:
+                self._points.popitem(last=False)
+        else:
+            self._points.move_to_end(track_id)
+        return points
+
+    async def async_image(
+        self, track_id: str, date: str, width: int | None = None, height: int | None = None
+    ) -> bytes | None:
+        """Return the PNG of a ride, None if it has no points or cannot be fetched."""
+        size = self._size(width, height)
+        key = (track_id, *size)
+        image = self._images.get(key)
+        if image is not None:
+            self._images.move_to_end(key)
+            return image
+
+        points = await self._async_points(track_id, date)
+        if len(points) < 2:
+            return None
+        image = await self.hass.async_add_executor_job(render_track, points, *size)
+        self._images[key] = image
+        while len(self._images) > TRACK_RENDER_CACHE_SIZE:
+            self._images.popitem(last=False)
+        return image
@@ -0,0 +1,129 @@
+"""Adaptive poll interval for the NIU data update coordinator."""
+from __future__ import annotations
+
+from datetime import timedelta
+import hashlib
+import random
+import time
+from typing import Any
+
+from .const import (
+    DEFAULT_POLL_INTERVAL,
+    LOCK_STATUS_LOCKED,
+    POLL_CHARGING_INTERVAL,
+    POLL_JITTER_FRACTION,
+    POLL_JITTER_MAX,
+    POLL_POSITION_EPSILON,
+    SENSOR_TYPE_BAT,
+    SENSOR_TYPE_MOTO,
+    SENSOR_TYPE_POS,
+)
+
+STATE_RIDING = "riding"
+STATE_CHARGING = "charging"
+STATE_PARKED = "parked"
+STATE_IDLE = "idle"
+
+
+def _as_float(value: Any) -> float | None:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _is_off(value: Any) -> bool:
+    """Return True for an explicit false/0 flag (None means unknown)."""
+    return value is not None and not value
+
+
+def poll_phase(key: str) -> float:
+    """Return the stable offset of a scooter's polls, as a fraction of the
+    interval in [0, 1)."""
+    digest = hashlib.sha256(key.encode("utf-8")).digest()
+    return int.from_bytes(digest[:4], "big") / 2**32
+
+
+class NiuPollScheduler:
+    """Derive the next poll interval from the last parsed coordinator data.
+
+    Riding polls at the floor, charging at a short fixed interval, and a
+    parked (locked or offline) scooter backs off exponentially from the base
+    interval up to the ceiling. Anything else polls at the base interval.
+
+    Each scooter polls in its own slot of the interval (its phase), so many
+    scooters do not all poll in the same instant.
+    """
+
+    def __init__(self, min_interval: float, max_interval: float, phase: float = 0.0) -> None:
+        self.min_interval = min_interval
+        self.max_interval = max(min_interval, max_interval)
+        self.phase = phase
+        self.state: str = STATE_IDLE
+        self._parked_polls = 0
+        self._last_position: tuple[float, float] | None = None
+
+    def _clamp(self, seconds: float) -> float:
+        return min(self.max_interval, max(self.min_interval, seconds))
+
+    def _moved(self, parsed: dict[str, Any]) -> bool:
+        position = parsed.get(SENSOR_TYPE_POS, {})
+        lat = _as_float(position.get("lat"))
+        lng = _as_float(position.get("lng"))
+        if lat is None or lng is None:
+            return False
+        last, self._last_position = self._last_position, (lat, lng)
+        if last is None:
+            return False
+        return abs(lat - last[0]) > POLL_POSITION_EPSILON or abs(lng - last[1]) > POLL_POSITION_EPSILON
+
+    def classify(self, parsed: dict[str, Any]) -> str:
+        """Return the scooter state the next interval is based on."""
+        moto = parsed.get(SENSOR_TYPE_MOTO, {})
+        bat = parsed.get(SENSOR_TYPE_BAT, {})
+
+        moved = self._moved(parsed)
+        speed = _as_float(moto.get("nowSpeed")) or 0
+        if speed > 0 or moved:
+            return STATE_RIDING
+        if bat.get("isCharging"):
+            return STATE_CHARGING
+        if _is_off(moto.get("isConnected")) or _is_off(bat.get("isConnected")):
+            return STATE_PARKED
+        if moto.get("lockStatus") == LOCK_STATUS_LOCKED:
+            return STATE_PARKED
+        return STATE_IDLE
+
+    def next_interval(self, parsed: dict[str, Any] | None) -> timedelta:
+        """Return how long to wait before the next poll."""
+        self.state = self.classify(parsed) if parsed else STATE_IDLE
+
+        if self.state == STATE_PARKED:
+            seconds = DEFAULT_POLL_INTERVAL * 2 ** self._parked_polls
+            if seconds < self.max_interval:
+                self._parked_polls += 1
+        else:
+            self._parked_polls = 0
+            if self.state == STATE_RIDING:
+                seconds = self.min_interval
+            elif self.state == STATE_CHARGING:
+                seconds = POLL_CHARGING_INTERVAL
+            else:
+                seconds = DEFAULT_POLL_INTERVAL
+
+        return timedelta(seconds=self._clamp(seconds))
+
+    def stagger(self, interval: timedelta, now: float | None = None) -> timedelta:
+        """Move a poll onto the scooter's slot and add bounded jitter.
+
+        The delay ends at the next wall-clock time t, at least half an
+        interval away, with t mod interval == phase * interval. The result,
+        jitter included, stays within the floor and ceiling.
+        """
+        seconds = interval.total_seconds()
+        now = time.time() if now is None else now
+        delay = seconds - (now - self.phase * seconds) % seconds
+        if delay < seconds / 2:
+            delay += seconds
+        jitter = min(POLL_JITTER_MAX, seconds * POLL_JITTER_FRACTION)
+        return timedelta(seconds=self._clamp(delay + random.uniform(-jitter, jitter)))
@@ -15,6 +15,20 @@ from .api import NiuApi
 
 _LOGGER = logging.getLogger(__name__)
 
+# Coordinator fields shown as attributes of the ScooterConnected sensor
+CONNECTED_ATTRIBUTE_FIELDS = {
+    (SENSOR_TYPE_BAT, "bmsId"),
+    (SENSOR_TYPE_POS, "lat"),
+    (SENSOR_TYPE_POS, "lng"),
+    (SENSOR_TYPE_DIST, "time"),
+    (SENSOR_TYPE_BAT, "estimatedMileage"),
+    (SENSOR_TYPE_MOTO, "estimatedMileage"),
+    (SENSOR_TYPE_BAT, "batteryCharging"),
+    (SENSOR_TYPE_BAT, "gradeBattery"),
+    (SENSOR_TYPE_BAT, "centreCtrlBattery"),
+    (SENSOR_TYPE_MOTO, "centreCtrlBattery"),
+}
+
 
 def _generate_entity_id(sensor_prefix: str | None, sn: str | None, sensor_name: str, sensor_id: str | None) -> str:
     """Build a deterministic entity_id using scooter name and sensor key."""
@@ -103,7 +117,7 @@ async def async_setup_entry(hass, entry, async_add_entities) -> None:
                 )
             )
         else:
-            # Last Track Thumb sensor will be used as camera... now just skip it
+            # Last Track Thumb is shown by the image entity
             pass
 
     # Always add vehicle metadata sensors (diagnostic). These are stable and useful
@@ -210,9 +224,23 @@ class NiuSensor(CoordinatorEntity):
             self._attr_entity_category = EntityCategory.DIAGNOSTIC
 
         self.entity_id = _generate_entity_id(sensor_prefix, sn, name, sensor_id)
-        super().__init__(coordinator)
+
+        # Only get called back when a field this sensor shows has changed.
+        fields = {(sensor_grp, id_name)}
+        if sensor_grp == SENSOR_TYPE_MOTO and id_name == "isConnected":
+            fields |= CONNECTED_ATTRIBUTE_FIELDS
+        super().__init__(coordinator, context=frozenset(fields))
+
+    async def async_added_to_hass(self) -> None:
+        """Take the current coordinator data as the initial state."""
+        await super().async_added_to_hass()
+        self._update_state()
 
     def _handle_coordinator_update(self) -> None:
+        self._update_state()
+        self.async_write_ha_state()
+
+    def _update_state(self) -> None:
         raw_value = None
         if self.coordinator.data is not None:
             raw_value = self.coordinator.data.get(self._sensor_grp, {}).get(self._id_name)
@@ -228,8 +256,6 @@ class NiuSensor(CoordinatorEntity):
         else:
             self._state = None
 
-        self.async_write_ha_state()
-
     @property
     def unique_id(self):
         return self._unique_id
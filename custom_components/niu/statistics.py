@@ -0,0 +1,188 @@
+"""Backfill the ride history and import it as long-term statistics.
+
+The backfill pages through the whole track list with a few pages in flight
+at once. Its position is kept in the history database, so an interrupted
+backfill resumes where it stopped. The stored rides are then summed per
+hour and imported as external statistics (distance, riding time and rides,
+all cumulative) in large batches.
+"""
+from __future__ import annotations
+
+import asyncio
+from datetime import datetime, timezone
+import json
+import logging
+from typing import Any, Awaitable, Callable
+
+from homeassistant.components.recorder.models import StatisticData, StatisticMetaData
+from homeassistant.components.recorder.statistics import async_add_external_statistics
+from homeassistant.const import UnitOfLength, UnitOfTime
+from homeassistant.core import HomeAssistant
+from homeassistant.util import slugify
+
+from .const import (
+    BACKFILL_MAX_PARALLEL,
+    BACKFILL_PAGE_SIZE,
+    DOMAIN,
+    STATISTICS_BATCH_SIZE,
+)
+from .history import RideHistory, track_items
+
+try:
+    from homeassistant.components.recorder.models import StatisticMeanType
+except ImportError:  # older Home Assistant: has_mean only
+    StatisticMeanType = None
+
+_LOGGER = logging.getLogger(__name__)
+
+HOUR_MS = 3_600_000
+
+# statistic suffix -> (name suffix, unit, hourly value from a bucket row)
+STATISTICS: dict[str, tuple[str, str | None, Callable[[tuple], float]]] = {
+    "distance": ("distance", UnitOfLength.KILOMETERS, lambda row: row[2] / 1000),
+    "riding_time": ("riding time", UnitOfTime.HOURS, lambda row: row[3] / 3600),
+    "rides": ("rides", None, lambda row: row[1]),
+}
+
+
+def _cursor_key(sn: str) -> str:
+    return f"backfill:{sn}"
+
+
+def _load_cursor(history: RideHistory, sn: str) -> dict[str, Any]:
+    try:
+        cursor = json.loads(history.get_meta(_cursor_key(sn)) or "{}")
+    except ValueError:
+        cursor = {}
+    return cursor if isinstance(cursor, dict) else {}
+
+
+def _save_cursor(history: RideHistory, sn: str, cursor: dict[str, Any] | None) -> None:
+    history.set_meta(_cursor_key(sn), json.dumps(cursor) if cursor is not None else None)
+
+
+def is_backfilled(history: RideHistory, sn: str) -> bool:
+    """Return True if the whole track list of `sn` has been backfilled once."""
+    return bool(_load_cursor(history, sn).get("done"))
+
+
+async def async_backfill_rides(
+    hass: HomeAssistant,
+    history: RideHistory,
+    sn: str,
+    fetch_page: Callable[[int, int], Awaitable[dict[str, Any] | None]],
+    restart: bool = False,
+) -> int:
+    """Page through the whole track list into the history.
+
+    Runs BACKFILL_MAX_PARALLEL pages at a time and saves the index of the
+    next page after every round. A failed page ends the run; the next run
+    picks up from it. Returns the number of new rides.
+    """
+    cursor = {} if restart else await hass.async_add_executor_job(_load_cursor, history, sn)
+    if cursor.get("done"):
+        return 0
+    # New rides push older ones to later pages; start one page early so a
+    # resumed run does not miss the rides that moved across the boundary.
+    index = max(int(cursor.get("next_index", 0)) - 1, 0)
+    semaphore = asyncio.Semaphore(BACKFILL_MAX_PARALLEL)
+
+    async def _fetch(page_index: int) -> dict[str, Any] | None:
+        async with semaphore:
+            return await fetch_page(page_index, BACKFILL_PAGE_SIZE)
+
+    added = 0
+    done = False
+    while not done:
+        indexes = range(index, index + BACKFILL_MAX_PARALLEL)
+        pages = await asyncio.gather(*(_fetch(i) for i in indexes), return_exceptions=True)
+        rides: list[dict[str, Any]] = []
+        failed = False
+        for page in pages:
+            if isinstance(page, BaseException) or page is None:
+                failed = True
+                break
+            items = track_items(page)
+            rides.extend(items)
+            index += 1
+            if len(items) < BACKFILL_PAGE_SIZE:
+                done = True
+                break
+
+        added += await hass.async_add_executor_job(history.add_rides, sn, rides)
+        await hass.async_add_executor_job(
+            _save_cursor, history, sn, {"next_index": index, "done": done}
+        )
+        if failed:
+            _LOGGER.debug("Backfill of %s stopped at page %d; it resumes on the next run", sn, index)
+            break
+
+    _LOGGER.debug("Backfilled %d rides of %s (%d pages)", added, sn, index)
+    return added
+
+
+def _statistic_id(sn: str, suffix: str) -> str:
+    return f"{DOMAIN}:{slugify(sn)}_{suffix}"
+
+
+def _metadata(sn: str, name: str, suffix: str) -> StatisticMetaData:
+    label, unit, _ = STATISTICS[suffix]
+    metadata = StatisticMetaData(
+        has_mean=False,
+        has_sum=True,
+        name=f"{name} {label}",
+        source=DOMAIN,
+        statistic_id=_statistic_id(sn, suffix),
+        unit_of_measurement=unit,
+    )
+    if StatisticMeanType is not None:
+        metadata["mean_type"] = StatisticMeanType.NONE
+    return metadata
+
+
+def build_statistics(buckets: list[tuple]) -> dict[str, list[StatisticData]]:
+    """Turn (hour, rides, distance, riding time) buckets into cumulative
+    StatisticData per statistic suffix."""
+    statistics: dict[str, list[StatisticData]] = {suffix: [] for suffix in STATISTICS}
+    for suffix, (_, _, value) in STATISTICS.items():
+        total = 0.0
+        rows = statistics[suffix]
+        for bucket in buckets:
+            total += value(bucket)
+            rows.append(
+                StatisticData(
+                    start=datetime.fromtimestamp(bucket[0] * HOUR_MS / 1000, tz=timezone.utc),
+                    state=round(total, 3),
+                    sum=round(total, 3),
+                )
+            )
+    return statistics
+
+
+async def async_import_statistics(
+    hass: HomeAssistant,
+    history: RideHistory,
+    sn: str,
+    name: str,
+    since_ms: int | None = None,
+) -> int:
+    """Import the stored rides of `sn` as hourly external statistics.
+
+    Sums are cumulative from the first ride, so they are always computed
+    over all stored rides; only the hours from `since_ms` on (all hours by
+    default) are sent to the recorder, which overwrites the ones it already
+    has. Returns the number of hours imported.
+    """
+    buckets = await hass.async_add_executor_job(history.hourly_totals, sn, HOUR_MS)
+    statistics = await hass.async_add_executor_job(build_statistics, buckets)
+    skip = 0
+    if since_ms is not None:
+        first_hour = since_ms // HOUR_MS
+        skip = next((i for i, bucket in enumerate(buckets) if bucket[0] >= first_hour), len(buckets))
+    if skip == len(buckets):
+        return 0
+    for suffix, rows in statistics.items():
+        metadata = _metadata(sn, name, suffix)
+        for start in range(skip, len(rows), STATISTICS_BATCH_SIZE):
+            async_add_external_statistics(hass, metadata, rows[start : start + STATISTICS_BATCH_SIZE])
+    return len(buckets) - skip
@@ -0,0 +1,203 @@
+"""On-disk LRU cache of the track thumbnails.
+
+Thumbnails are stored in niu_thumbnails/ in the config directory, keyed by
+track ID, together with their ETag and Last-Modified headers. A cached
+thumbnail is served right away, also after a restart, and revalidated once
+per session with a conditional GET. The least recently used files are
+removed once the cache exceeds its size cap.
+"""
+from __future__ import annotations
+
+import json
+import logging
+from pathlib import Path
+import re
+import threading
+import time
+from typing import Any
+from urllib.parse import urlsplit
+
+import httpx
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.httpx_client import get_async_client
+
+_LOGGER = logging.getLogger(__name__)
+
+INDEX_FILE = "index.json"
+GET_IMAGE_TIMEOUT = 10
+
+_UNSAFE = re.compile(r"[^A-Za-z0-9_-]")
+
+
+def thumbnail_key(track_id: Any, url: str | None) -> str | None:
+    """Return the cache key of a thumbnail: its track ID, or the file name
+    of the URL (without extension) when the track ID is unknown."""
+    if track_id:
+        key = str(track_id)
+    elif url:
+        key = urlsplit(url).path.rsplit("/", 1)[-1].rsplit(".", 1)[0]
+    else:
+        return None
+    key = _UNSAFE.sub("_", key)
+    return key or None
+
+
+class ThumbnailCache:
+    """Size-bounded on-disk LRU of thumbnails with HTTP revalidation."""
+
+    def __init__(self, hass: HomeAssistant, directory: Path, max_bytes: int) -> None:
+        self.hass = hass
+        self.directory = directory
+        self.max_bytes = max_bytes
+        # key -> {"etag", "last_modified", "size", "used"}
+        self._index: dict[str, dict[str, Any]] | None = None
+        self._file_lock = threading.Lock()
+        # Keys revalidated (or downloaded) during this session, and the ones
+        # being revalidated right now
+        self._validated: set[str] = set()
+        self._revalidating: set[str] = set()
+        # Bytes of the most recently served thumbnail
+        self._memory: tuple[str, bytes] | None = None
+        self.hits = 0
+        self.revalidated = 0
+        self.downloads = 0
+
+    # Blocking helpers, run in the executor
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.img"
+
+    def _load_index(self) -> dict[str, dict[str, Any]]:
+        try:
+            index = json.loads((self.directory / INDEX_FILE).read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(index, dict):
+            return {}
+        # Drop entries whose file is gone
+        return {key: meta for key, meta in index.items() if isinstance(meta, dict) and self._path(key).exists()}
+
+    def _save_index(self) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.directory / (INDEX_FILE + ".tmp")
+        tmp_path.write_text(json.dumps(self._index), encoding="utf-8")
+        tmp_path.replace(self.directory / INDEX_FILE)
+
+    def _read(self, key: str) -> bytes | None:
+        try:
+            return self._path(key).read_bytes()
+        except OSError:
+            return None
+
+    def _touch(self, key: str) -> None:
+        with self._file_lock:
+            meta = self._index.get(key)
+            if meta is None:
+                return
+            meta["used"] = time.time()
+            self._save_index()
+
+    def _store(self, key: str, content: bytes, etag: str | None, last_modified: str | None) -> None:
+        with self._file_lock:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            tmp_path = self._path(key).with_suffix(".tmp")
+            tmp_path.write_bytes(content)
+            tmp_path.replace(self._path(key))
+            self._index[key] = {
+                "etag": etag,
+                "last_modified": last_modified,
+                "size": len(content),
+                "used": time.time(),
+            }
+            self._evict(keep=key)
+            self._save_index()
+
+    def _evict(self, keep: str) -> None:
+        total = sum(meta.get("size", 0) for meta in self._index.values())
+        for key, meta in sorted(self._index.items(), key=lambda item: item[1].get("used", 0)):
+            if total <= self.max_bytes:
+                break
+            if key == keep:
+                continue
+            self._path(key).unlink(missing_ok=True)
+            total -= meta.get("size", 0)
+            del self._index[key]
+
+    # Async API
+
+    async def _async_index(self) -> dict[str, dict[str, Any]]:
+        if self._index is None:
+            self._index = await self.hass.async_add_executor_job(self._load_index)
+        return self._index
+
+    async def async_get(self, key: str, url: str, verify_ssl: bool = False) -> bytes | None:
+        """Return the thumbnail of `key`.
+
+        A cached thumbnail is returned right away; if it was not checked
+        during this session, `url` is revalidated in the background. Without
+        a cached copy the thumbnail is downloaded.
+        """
+        index = await self._async_index()
+        cached: bytes | None = None
+        if self._memory is not None and self._memory[0] == key:
+            cached = self._memory[1]
+        elif key in index:
+            cached = await self.hass.async_add_executor_job(self._read, key)
+
+        if cached is None:
+            return await self._async_fetch(key, url, None, verify_ssl)
+
+        self.hits += 1
+        self._memory = (key, cached)
+        if key in index:
+            # Persisted with the next write
+            index[key]["used"] = time.time()
+        if key not in self._validated and key not in self._revalidating:
+            self._revalidating.add(key)
+            self.hass.async_create_background_task(
+                self._async_fetch(key, url, cached, verify_ssl), f"niu_thumbnail_{key}"
+            )
+        return cached
+
+    async def _async_fetch(
+        self, key: str, url: str, cached: bytes | None, verify_ssl: bool
+    ) -> bytes | None:
+        """Download `url`, conditionally if a cached copy exists."""
+        headers = {}
+        meta = self._index.get(key) if cached is not None else None
+        if meta is not None:
+            if meta.get("etag"):
+                headers["If-None-Match"] = meta["etag"]
+            if meta.get("last_modified"):
+                headers["If-Modified-Since"] = meta["last_modified"]
+
+        try:
+            client = get_async_client(self.hass, verify_ssl=verify_ssl)
+            response = await client.get(url, headers=headers, timeout=GET_IMAGE_TIMEOUT)
+            if response.status_code == 304 and cached is not None:
+                self.revalidated += 1
+                self._validated.add(key)
+                await self.hass.async_add_executor_job(self._touch, key)
+                return cached
+            response.raise_for_status()
+        except (httpx.RequestError, httpx.HTTPStatusError) as err:
+            # Keep serving what we have; it is revalidated on a later request.
+            _LOGGER.debug("Error getting thumbnail %s: %s", url, err)
+            return cached
+        finally:
+            self._revalidating.discard(key)
+
+        content = response.content
+        self.downloads += 1
+        self._validated.add(key)
+        if cached is None or (self._memory is not None and self._memory[0] == key):
+            self._memory = (key, content)
+        await self.hass.async_add_executor_job(
+            self._store,
+            key,
+            content,
+            response.headers.get("ETag"),
+            response.headers.get("Last-Modified"),
+        )
+        return content
@@ -0,0 +1,127 @@
+"""Resized and transcoded variants of the last track images.
+
+Clients can ask the track image view for a size and format (JPEG or WebP).
+Variants are produced with Pillow in the executor and kept in a memory cache
+bounded in bytes. Concurrent requests for the same variant share one
+conversion.
+"""
+from __future__ import annotations
+
+import asyncio
+from collections import OrderedDict
+import io
+from typing import Awaitable, Callable, Hashable
+
+from homeassistant.core import HomeAssistant
+
+try:
+    from PIL import Image
+except ImportError:  # Pillow is optional
+    Image = None
+
+FORMAT_JPEG = "jpeg"
+FORMAT_WEBP = "webp"
+CONTENT_TYPES = {FORMAT_JPEG: "image/jpeg", FORMAT_WEBP: "image/webp"}
+QUALITY = 80
+
+
+def variants_available() -> bool:
+    """Return True if Pillow is installed."""
+    return Image is not None
+
+
+def make_variant(source: bytes, width: int | None, height: int | None, fmt: str) -> bytes:
+    """Fit `source` into width x height (never upscaled) and encode it (blocking)."""
+    with Image.open(io.BytesIO(source)) as image:
+        image.draft("RGB", (width or image.width, height or image.height))
+        image = image.convert("RGB")
+        image.thumbnail((width or image.width, height or image.height), Image.LANCZOS)
+        buffer = io.BytesIO()
+        if fmt == FORMAT_WEBP:
+            image.save(buffer, format="WEBP", quality=QUALITY, method=4)
+        else:
+            image.save(buffer, format="JPEG", quality=QUALITY, optimize=True, progressive=True)
+    return buffer.getvalue()
+
+
+class ImageVariantCache:
+    """Memory-bounded LRU of image variants with request coalescing."""
+
+    def __init__(self, hass: HomeAssistant, max_bytes: int) -> None:
+        self.hass = hass
+        self.max_bytes = max_bytes
+        self._variants: OrderedDict[Hashable, bytes] = OrderedDict()
+        self._size = 0
+        self._pending: dict[Hashable, asyncio.Task[bytes | None]] = {}
+        self.hits = 0
+        self.conversions = 0
+
+    def _put(self, key: Hashable, content: bytes) -> None:
+        if len(content) > self.max_bytes:
+            return
+        self._variants[key] = content
+        self._size += len(content)
+        while self._size > self.max_bytes:
+            _, evicted = self._variants.popitem(last=False)
+            self._size -= len(evicted)
+
+    def discard(self, key: Hashable, width: int | None, height: int | None, fmt: str) -> None:
+        """Forget a variant, e.g. one made from a stand-in image."""
+        content = self._variants.pop((key, width, height, fmt), None)
+        if content is not None:
+            self._size -= len(content)
+
+    async def async_get(
+        self,
+        key: Hashable,
+        source: Callable[[], Awaitable[bytes | None]],
+        width: int | None,
+        height: int | None,
+        fmt: str,
+    ) -> bytes | None:
+        """Return the variant of `key` at the given size and format.
+
+        `source` returns the full-size image; it is only awaited when the
+        variant is neither cached nor being produced.
+        """
+        variant_key = (key, width, height, fmt)
+        content = self._variants.get(variant_key)
+        if content is not None:
+            self._variants.move_to_end(variant_key)
+            self.hits += 1
+            return content
+
+        task = self._pending.get(variant_key)
+        if task is None:
+            # Runs as its own task so that a client going away does not
+            # cancel the conversion the other requests are waiting for.
+            task = self.hass.async_create_task(
+                self._async_make(variant_key, source, width, height, fmt),
+                f"niu_variant_{key}",
+            )
+            if not task.done():
+                self._pending[variant_key] = task
+        else:
+            self.hits += 1
+        return await asyncio.shield(task)
+
+    async def _async_make(
+        self,
+        variant_key: Hashable,
+        source: Callable[[], Awaitable[bytes | None]],
+        width: int | None,
+        height: int | None,
+        fmt: str,
+    ) -> bytes | None:
+        try:
+            original = await source()
+            if original is None:
+                return None
+            content = await self.hass.async_add_executor_job(
+                make_variant, original, width, height, fmt
+            )
+            self.conversions += 1
+            self._put(variant_key, content)
+            return content
+        finally:
+            self._pending.pop(variant_key, None)
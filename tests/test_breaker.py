@@ -0,0 +1,37 @@
+"""Tests for the circuit breaker."""
+from __future__ import annotations
+
+from custom_components.niu.breaker import (
+    STATE_CLOSED,
+    STATE_HALF_OPEN,
+    STATE_OPEN,
+    CircuitBreaker,
+)
+
+
+def _tripped() -> CircuitBreaker:
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=60)
+    breaker.record_failure(now=0)
+    assert breaker.state == STATE_OPEN
+    return breaker
+
+
+def test_released_probe_hands_over() -> None:
+    breaker = _tripped()
+    assert breaker.allow(now=60)
+    assert breaker.state == STATE_HALF_OPEN
+    assert not breaker.allow(now=61)
+
+    # A cancelled probe does not leave the breaker half-open for good
+    breaker.release()
+    assert breaker.allow(now=61)
+    breaker.record_success()
+    assert breaker.state == STATE_CLOSED
+
+
+def test_release_keeps_failure_count() -> None:
+    breaker = CircuitBreaker(failure_threshold=3)
+    breaker.record_failure(now=0)
+    breaker.release()
+    assert breaker.state == STATE_CLOSED
+    assert breaker.failures == 1
@@ -0,0 +1,59 @@
+"""Tests for the response journal."""
+from __future__ import annotations
+
+import gzip
+from pathlib import Path
+
+from custom_components.niu.journal import ResponseJournal, journal_files, replay
+
+
+def _snapshot(soc: int) -> dict:
+    return {"sn": "SN1", "parsed": None, "raw": {"battery_info": {"soc": soc}}}
+
+
+def _crash(journal: ResponseJournal) -> None:
+    """Drop the journal as a killed process would, without the gzip trailer."""
+    journal._file.close()
+    journal._file = journal._stream = None
+
+
+def test_replay_after_clean_restart(tmp_path: Path) -> None:
+    path = tmp_path / "SN1.ndjson.gz"
+    journal = ResponseJournal(path, 1024 * 1024, 2)
+    journal.write(_snapshot(80))
+    journal.close()
+
+    journal = ResponseJournal(path, 1024 * 1024, 2)
+    journal.write(_snapshot(79))
+    journal.close()
+
+    assert journal_files(path) == [path]
+    assert [entry["payload"]["soc"] for entry in replay(path)] == [80, 79]
+
+
+def test_replay_after_crash(tmp_path: Path) -> None:
+    path = tmp_path / "SN1.ndjson.gz"
+    journal = ResponseJournal(path, 1024 * 1024, 2)
+    journal.write(_snapshot(80))
+    journal.write(_snapshot(79))
+    _crash(journal)
+
+    journal = ResponseJournal(path, 1024 * 1024, 2)
+    journal.write(_snapshot(78))
+    journal.close()
+
+    # The unfinished file was rotated away, not appended to
+    assert journal_files(path) == [path.with_name(f"{path.name}.1"), path]
+    assert [entry["payload"]["soc"] for entry in replay(path)] == [80, 79, 78]
+
+
+def test_replay_stops_at_damaged_member(tmp_path: Path) -> None:
+    path = tmp_path / "SN1.ndjson.gz"
+    journal = ResponseJournal(path, 1024 * 1024, 0)
+    journal.write(_snapshot(80))
+    _crash(journal)
+    # A member appended behind the unfinished one, as older versions did
+    with open(path, "ab") as file:
+        file.write(gzip.compress(b'{"endpoint":"battery_info","delta":{}}\n'))
+
+    assert [entry["payload"]["soc"] for entry in replay(path)] == [80]
@@ -0,0 +1,29 @@
+"""Tests for the adaptive poll scheduler."""
+from __future__ import annotations
+
+from datetime import timedelta
+
+from custom_components.niu.const import SENSOR_TYPE_BAT, SENSOR_TYPE_MOTO
+from custom_components.niu.scheduler import STATE_IDLE, STATE_PARKED, NiuPollScheduler
+
+
+def _parsed(lock_status: int) -> dict:
+    return {
+        SENSOR_TYPE_MOTO: {"nowSpeed": 0, "isConnected": True, "lockStatus": lock_status},
+        SENSOR_TYPE_BAT: {"isCharging": 0, "isConnected": True},
+    }
+
+
+def test_locked_scooter_is_parked() -> None:
+    scheduler = NiuPollScheduler(15, 900)
+    assert scheduler.classify(_parsed(1)) == STATE_PARKED
+    assert scheduler.classify(_parsed(0)) == STATE_IDLE
+
+
+def test_stagger_stays_within_bounds() -> None:
+    for phase in (0.0, 0.25, 0.5, 0.99):
+        scheduler = NiuPollScheduler(15, 900, phase)
+        for seconds in (15, 60, 900):
+            for now in range(0, 1800, 7):
+                delay = scheduler.stagger(timedelta(seconds=seconds), now=now).total_seconds()
+                assert 15 <= delay <= 900
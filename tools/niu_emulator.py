@@ -0,0 +1,448 @@
+"""Local stand-in of the NIU cloud for offline development and load tests.
+
+    python tools/niu_emulator.py --scooters 50 --latency 0.08 --error-rate 0.02
+
+serves the login, vehicles list, battery, motor index, overall tally and track
+list endpoints on http://127.0.0.1:8100 for every account, with the password
+given by --password. All accounts share one simulated fleet. Its scooters
+ride in turns: each one rides for the --riding fraction of every --ride-cycle
+seconds, at its own offset, and parks (locked) for the rest. Every finished
+ride shows up in the track list, on top of --rides older ones.
+
+Point an entry at the emulator with the "Account server" and "API server"
+fields of the config flow (shown in advanced mode), both set to the emulator
+URL, and use scooter IDs 0 to --scooters - 1. In code, pass the URL as
+`account_url` and `api_url` to NiuApi or NiuAccount, or run the emulator in
+process with `NiuEmulator(FleetConfig(...))` as the benchmarks do.
+
+Failures are injected with --error-rate (HTTP 500, a quarter of them 429 with
+Retry-After) and access tokens expire after --token-ttl seconds.
+GET /_emulator/stats returns the request counts and the peak concurrency.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+from dataclasses import dataclass
+import datetime
+import hashlib
+import math
+from pathlib import Path
+import random
+import secrets
+import struct
+import sys
+import time
+from typing import Any
+import zlib
+
+from aiohttp import web
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from custom_components.niu.const import (  # noqa: E402
+    AUTH_ERROR_STATUSES,
+    LOGIN_URI,
+    MOTOINFO_ALL_API_URI,
+    MOTOINFO_LIST_API_URI,
+    MOTOR_BATTERY_API_URI,
+    MOTOR_INDEX_API_URI,
+    TRACK_LIST_API_URI,
+)
+
+STATS_PATH = "/_emulator/stats"
+THUMB_PATH = "/track/thumb/{track_id}.jpg"
+# Degrees of latitude/longitude per km, close enough around 52°N
+KM_LAT = 1 / 111.0
+KM_LNG = 1 / 68.0
+RIDE_SPEED = 21.0  # km/h
+REFRESH_TTL = 30 * 86400
+TOKEN_EXPIRED = min(AUTH_ERROR_STATUSES)
+
+
+@dataclass
+class FleetConfig:
+    """Shape of the simulated fleet and of the service it gets."""
+
+    scooters: int = 1
+    password: str = "niu"
+    # Seconds per response, normally distributed with `jitter`
+    latency: float = 0.0
+    jitter: float = 0.0
+    error_rate: float = 0.0
+    token_ttl: float = 3600
+    # Fraction of every ride cycle a scooter spends riding
+    riding: float = 0.2
+    ride_cycle: float = 600
+    rides: int = 50
+    seed: int = 0
+
+
+@dataclass
+class Ride:
+    index: int
+    start: float
+    end: float
+    origin: tuple[float, float]
+    target: tuple[float, float]
+
+    @property
+    def distance(self) -> int:
+        """Metres."""
+        return int((self.end - self.start) / 3600 * RIDE_SPEED * 1000)
+
+
+class Scooter:
+    """One simulated scooter; its state is a function of the time."""
+
+    def __init__(self, index: int, config: FleetConfig, started: float) -> None:
+        rng = random.Random(f"{config.seed}-{index}")
+        self.index = index
+        self.sn = f"EMU{index:012d}"
+        self.name = f"Emulated {index}"
+        self.config = config
+        self.started = started
+        self.offset = rng.random()
+        self.home = (52.37 + rng.uniform(-0.05, 0.05), 4.89 + rng.uniform(-0.05, 0.05))
+        self.heading = rng.uniform(0, 2 * math.pi)
+        self.total_km = rng.uniform(500, 9000)
+        self.days = rng.randint(30, 1500)
+
+    def _cycle(self, now: float) -> float:
+        """Ride cycles since the fleet started, plus the scooter's offset."""
+        return (now - self.started) / self.config.ride_cycle + self.offset
+
+    def ride(self, index: int) -> Ride:
+        """Ride `index` starts at the beginning of cycle `index`; even rides
+        leave home, odd ones come back."""
+        cycle, riding = self.config.ride_cycle, self.config.riding
+        start = self.started + (index - self.offset) * cycle
+        end = start + riding * cycle
+        km = (end - start) / 3600 * RIDE_SPEED
+        away = (
+            self.home[0] + km * KM_LAT * math.cos(self.heading),
+            self.home[1] + km * KM_LNG * math.sin(self.heading),
+        )
+        origin, target = (self.home, away) if index % 2 == 0 else (away, self.home)
+        return Ride(index, start, end, origin, target)
+
+    def riding_progress(self, now: float) -> float | None:
+        """Return how far along the current ride is, or None when parked."""
+        cycle = self._cycle(now)
+        progress = (cycle - math.floor(cycle)) / self.config.riding
+        return progress if progress < 1 else None
+
+    def last_ride(self, now: float) -> int:
+        """Index of the last finished ride."""
+        return math.floor(self._cycle(now) - self.config.riding)
+
+    def position(self, now: float) -> tuple[float, float]:
+        progress = self.riding_progress(now)
+        if progress is None:
+            return self.ride(self.last_ride(now)).target
+        ride = self.ride(math.floor(self._cycle(now)))
+        return (
+            ride.origin[0] + (ride.target[0] - ride.origin[0]) * progress,
+            ride.origin[1] + (ride.target[1] - ride.origin[1]) * progress,
+        )
+
+    def charge(self, now: float) -> int:
+        """Battery charge: 12% per ride, back to full every 7 rides."""
+        progress = self.riding_progress(now) or 0.0
+        return int(100 - ((self.last_ride(now) + 1) % 7 + progress) * 12)
+
+    def battery_info(self, now: float) -> dict[str, Any]:
+        charge = self.charge(now)
+        return {
+            "batteries": {
+                "compartmentA": {
+                    "items": [],
+                    "totalPoint": 0,
+                    "bmsId": f"BMS{self.sn}",
+                    "isConnected": True,
+                    "batteryCharging": charge,
+                    "chargedTimes": str(200 + self.last_ride(now) // 7),
+                    "temperature": 21,
+                    "temperatureDesc": "normal",
+                    "energyConsumedTody": 3,
+                    "gradeBattery": "92.5",
+                }
+            },
+            "isCharging": 0,
+            "centreCtrlBattery": 100,
+            "batteryDetail": True,
+            "estimatedMileage": charge * 6 // 10,
+        }
+
+    def motor_index(self, now: float) -> dict[str, Any]:
+        progress = self.riding_progress(now)
+        lat, lng = self.position(now)
+        last = self.ride(self.last_ride(now))
+        charge = self.charge(now)
+        return {
+            "isCharging": 0,
+            "lockStatus": 1 if progress is None else 0,
+            "isAccOn": 0 if progress is None else 1,
+            "isConnected": True,
+            "postion": {"lat": round(lat, 6), "lng": round(lng, 6)},
+            "hdop": 1,
+            "time": int(now * 1000),
+            "leftTime": "3.9",
+            "estimatedMileage": charge * 6 // 10,
+            "gpsTimestamp": int(now * 1000),
+            "infoTimestamp": int(now * 1000),
+            "nowSpeed": 0 if progress is None else RIDE_SPEED,
+            "lastTrack": {
+                "ridingTime": int(last.end - last.start),
+                "distance": last.distance,
+                "time": int(last.end * 1000),
+            },
+            "centreCtrlBattery": 100,
+            "gps": 4,
+            "gsm": 22,
+        }
+
+    def overall_tally(self, now: float) -> dict[str, Any]:
+        ridden = sum(self.ride(index).distance for index in range(0, self.last_ride(now) + 1))
+        return {
+            "bindDaysCount": self.days + int((now - self.started) // 86400),
+            "totalMileage": round(self.total_km + ridden / 1000, 1),
+        }
+
+    def track_list(self, now: float, index: int, pagesize: int, base_url: str) -> list[dict[str, Any]]:
+        """One page of the finished rides, newest first."""
+        last = self.last_ride(now)
+        first = last - index
+        items = []
+        # Rides before the emulator started have negative indexes
+        for number in range(first, max(first - pagesize, -self.config.rides - 1), -1):
+            ride = self.ride(number)
+            track_id = f"{int(ride.start * 1000)}{self.sn[-6:]}"
+            items.append(
+                {
+                    "trackId": track_id,
+                    "startTime": int(ride.start * 1000),
+                    "endTime": int(ride.end * 1000),
+                    "distance": ride.distance,
+                    "avespeed": RIDE_SPEED,
+                    "ridingtime": int(ride.end - ride.start),
+                    "type": "1",
+                    "date": datetime.datetime.fromtimestamp(ride.start).strftime("%Y%m%d"),
+                    "startPoint": {"lat": str(round(ride.origin[0], 6)), "lng": str(round(ride.origin[1], 6))},
+                    "lastPoint": {"lat": str(round(ride.target[0], 6)), "lng": str(round(ride.target[1], 6))},
+                    "track_thumb": base_url + THUMB_PATH.format(track_id=track_id),
+                    "power_consumption": 0,
+                    "meet_count": 0,
+                }
+            )
+        return items
+
+
+def _thumbnail() -> bytes:
+    """A 4x4 grey PNG, served for every track thumbnail."""
+
+    def chunk(kind: bytes, data: bytes) -> bytes:
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+
+    rows = b"".join(b"\x00" + b"\x80" * 4 for _ in range(4))
+    return (
+        b"\x89PNG\r\n\x1a\n"
+        + chunk(b"IHDR", struct.pack(">IIBBBBB", 4, 4, 8, 0, 0, 0, 0))
+        + chunk(b"IDAT", zlib.compress(rows))
+        + chunk(b"IEND", b"")
+    )
+
+
+def _ok(data: Any) -> web.Response:
+    return web.json_response({"data": data, "desc": "成功", "trace": "成功", "status": 0})
+
+
+class NiuEmulator:
+    """The emulated account and API servers (one aiohttp application)."""
+
+    def __init__(self, config: FleetConfig) -> None:
+        self.config = config
+        self.started = time.time()
+        self.fleet = [Scooter(index, config, self.started) for index in range(config.scooters)]
+        self._by_sn = {scooter.sn: scooter for scooter in self.fleet}
+        self._password = hashlib.md5(config.password.encode("utf-8")).hexdigest()
+        self._random = random.Random(config.seed)
+        # access token -> expiry, refresh token -> expiry
+        self._tokens: dict[str, float] = {}
+        self._refresh_tokens: dict[str, float] = {}
+        self._thumbnail = _thumbnail()
+        self.requests: dict[str, int] = {}
+        self.errors = 0
+        self.rejected_tokens = 0
+        self.active = 0
+        self.peak = 0
+
+    def create_app(self) -> web.Application:
+        app = web.Application(middlewares=[self._middleware])
+        app.router.add_post(LOGIN_URI, self._login)
+        app.router.add_get(MOTOINFO_LIST_API_URI, self._vehicles)
+        app.router.add_route("*", MOTOR_BATTERY_API_URI, self._battery)
+        app.router.add_route("*", MOTOR_INDEX_API_URI, self._motor_index)
+        app.router.add_route("*", MOTOINFO_ALL_API_URI, self._overall_tally)
+        app.router.add_route("*", TRACK_LIST_API_URI, self._track_list)
+        app.router.add_get(THUMB_PATH, self._thumb)
+        app.router.add_get(STATS_PATH, self._stats)
+        return app
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "requests": dict(self.requests),
+            "errors": self.errors,
+            "rejected_tokens": self.rejected_tokens,
+            "active": self.active,
+            "peak": self.peak,
+        }
+
+    @web.middleware
+    async def _middleware(self, request: web.Request, handler: Any) -> web.StreamResponse:
+        if request.path == STATS_PATH:
+            return await handler(request)
+        route = request.match_info.route.resource
+        name = route.canonical if route is not None else request.path
+        self.requests[name] = self.requests.get(name, 0) + 1
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            if self.config.latency or self.config.jitter:
+                await asyncio.sleep(max(0.0, self._random.gauss(self.config.latency, self.config.jitter)))
+            if self._random.random() < self.config.error_rate:
+                self.errors += 1
+                if self._random.random() < 0.25:
+                    return web.Response(status=429, headers={"Retry-After": "1"})
+                return web.Response(status=500, text="emulated failure")
+            return await handler(request)
+        finally:
+            self.active -= 1
+
+    async def _login(self, request: web.Request) -> web.Response:
+        form = await request.post()
+        now = time.time()
+        grant = form.get("grant_type")
+        if grant == "refresh_token":
+            if self._refresh_tokens.pop(str(form.get("refresh_token")), 0) <= now:
+                return web.json_response({"status": 1, "desc": "invalid refresh token"}, status=400)
+        elif grant != "password" or form.get("password") != self._password:
+            return web.json_response({"status": 1, "desc": "wrong account or password"}, status=400)
+
+        access, refresh = secrets.token_hex(16), secrets.token_hex(16)
+        self._tokens[access] = now + self.config.token_ttl
+        self._refresh_tokens[refresh] = now + REFRESH_TTL
+        return _ok(
+            {
+                "token": {
+                    "access_token": access,
+                    "refresh_token": refresh,
+                    "token_expires_in": int(now + self.config.token_ttl),
+                    "refresh_token_expires_in": int(now + REFRESH_TTL),
+                }
+            }
+        )
+
+    def _authorized(self, request: web.Request) -> bool:
+        if self._tokens.get(request.headers.get("token", ""), 0) > time.time():
+            return True
+        self.rejected_tokens += 1
+        return False
+
+    async def _scooter(self, request: web.Request) -> Scooter | None:
+        """Return the scooter of a request's `sn`, from the query, form or
+        JSON body."""
+        sn = request.query.get("sn")
+        if sn is None and request.body_exists:
+            if request.content_type == "application/json":
+                body = await request.json()
+                sn = body.get("sn") if isinstance(body, dict) else None
+            else:
+                sn = (await request.post()).get("sn")
+        return self._by_sn.get(str(sn))
+
+    async def _scooter_response(self, request: web.Request, payload: Any) -> web.Response:
+        if not self._authorized(request):
+            return web.json_response({"status": TOKEN_EXPIRED, "desc": "token expired"})
+        scooter = await self._scooter(request)
+        if scooter is None:
+            return web.json_response({"status": 1, "desc": "unknown sn"})
+        return _ok(payload(scooter, time.time()))
+
+    async def _vehicles(self, request: web.Request) -> web.Response:
+        if not self._authorized(request):
+            return web.json_response({"status": TOKEN_EXPIRED, "desc": "token expired"})
+        items = [
+            {
+                "sn_id": scooter.sn,
+                "scooter_name": scooter.name,
+                "sku_name": "NQi GTS Sport",
+                "product_type": "native",
+                "carframe_id": f"LNG{scooter.sn}",
+                "is_master": True,
+                "is_double_battery": False,
+            }
+            for scooter in self.fleet
+        ]
+        return _ok({"items": items})
+
+    async def _battery(self, request: web.Request) -> web.Response:
+        return await self._scooter_response(request, Scooter.battery_info)
+
+    async def _motor_index(self, request: web.Request) -> web.Response:
+        return await self._scooter_response(request, Scooter.motor_index)
+
+    async def _overall_tally(self, request: web.Request) -> web.Response:
+        return await self._scooter_response(request, Scooter.overall_tally)
+
+    async def _track_list(self, request: web.Request) -> web.Response:
+        body = await request.json() if request.content_type == "application/json" else {}
+        index, pagesize = int(body.get("index", 0)), int(body.get("pagesize", 10))
+        base_url = f"{request.scheme}://{request.host}"
+        return await self._scooter_response(
+            request, lambda scooter, now: scooter.track_list(now, index, pagesize, base_url)
+        )
+
+    async def _thumb(self, request: web.Request) -> web.Response:
+        return web.Response(body=self._thumbnail, content_type="image/png")
+
+    async def _stats(self, request: web.Request) -> web.Response:
+        return web.json_response(self.stats())
+
+
+def main() -> None:
+    defaults = FleetConfig()
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--scooters", type=int, default=defaults.scooters)
+    parser.add_argument("--password", default=defaults.password, help="password of every account")
+    parser.add_argument("--latency", type=float, default=defaults.latency, help="seconds per response")
+    parser.add_argument("--jitter", type=float, default=defaults.jitter, help="standard deviation of the latency")
+    parser.add_argument("--error-rate", type=float, default=defaults.error_rate, help="fraction of failed requests")
+    parser.add_argument("--token-ttl", type=float, default=defaults.token_ttl, help="access token lifetime (s)")
+    parser.add_argument("--riding", type=float, default=defaults.riding, help="fraction of the time spent riding")
+    parser.add_argument("--ride-cycle", type=float, default=defaults.ride_cycle, help="seconds from ride to ride")
+    parser.add_argument("--rides", type=int, default=defaults.rides, help="older rides in the track list")
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+    args = parser.parse_args()
+
+    config = FleetConfig(
+        scooters=args.scooters,
+        password=args.password,
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        token_ttl=args.token_ttl,
+        riding=args.riding,
+        ride_cycle=args.ride_cycle,
+        rides=args.rides,
+        seed=args.seed,
+    )
+    web.run_app(NiuEmulator(config).create_app(), host=args.host, port=args.port, access_log=None)
+
+
+if __name__ == "__main__":
+    main()